@@ -0,0 +1,98 @@
+"""Measures the speed of headless bot-only play"""
+
+import argparse
+from random import Random
+import sys
+from time import perf_counter
+
+from config import cfg
+import replay
+from replay import (Session, SessionRecorder)
+from simulation import (PlayerSpec, SimulationResult, ResultView, TableSpec)
+
+def tableSpec(num_players=1, chart_filename='cfg/three_chart.txt'):
+    """Returns spec of a table of num_players bots"""
+    return TableSpec([PlayerSpec('Bot %d' % i, chart_filename)
+                      for i in range(num_players)])
+
+def benchmark(num_rounds, num_players=1, chart_filename='cfg/three_chart.txt',
+              seed=0):
+    """Plays num_rounds on a table of num_players bots,
+       Returns rounds played per second"""
+    spec = tableSpec(num_players, chart_filename)
+    table = spec.build(ResultView(SimulationResult()), Random(seed))
+    began = perf_counter()
+    for _ in range(num_rounds):
+        table.play()
+    return num_rounds / (perf_counter() - began)
+
+def record(filename, num_rounds, num_players=1,
+           chart_filename='cfg/three_chart.txt', seed=0):
+    """Records num_rounds on a table of num_players bots to filename"""
+    spec = tableSpec(num_players, chart_filename)
+    recorder = SessionRecorder(spec.build(ResultView(SimulationResult()),
+                                          Random(seed)))
+    recorder.play(num_rounds)
+    recorder.session.save(filename)
+
+def benchmarkReplay(filename, chart_filename='cfg/three_chart.txt', repeat=3):
+    """Replays session recorded to filename by record,
+       Returns best rounds replayed per second"""
+    session = Session.load(filename)
+    spec = tableSpec(len([s for s in session.seats if s is not None]),
+                     chart_filename)
+    table = spec.build(ResultView(SimulationResult()), Random(0))
+    return replay.benchmark(session, table, repeat)
+
+def parseCommandLine():
+    """Parses command line, Returns namespace"""
+    parser = argparse.ArgumentParser(description='Blackjack play benchmark')
+    parser.add_argument('-cfg', '--config_file',
+                        default = 'cfg/default_config.ini',
+                        dest    = 'config_file_name',
+                        metavar = 'CONFIG_FILE',
+                        help    = 'the location of the configuration file')
+    parser.add_argument('-n', '--rounds',
+                        type    = int,
+                        default = 20000,
+                        dest    = 'num_rounds',
+                        metavar = 'NUM_ROUNDS',
+                        help    = 'the number of rounds to play')
+    parser.add_argument('-p', '--players',
+                        type    = int,
+                        default = 1,
+                        dest    = 'num_players',
+                        metavar = 'NUM_PLAYERS',
+                        help    = 'the number of bots at the table')
+    parser.add_argument('-r', '--repeat',
+                        type    = int,
+                        default = 3,
+                        dest    = 'repeat',
+                        metavar = 'REPEAT',
+                        help    = 'the number of runs, the best is reported')
+    parser.add_argument('--record',
+                        default = None,
+                        dest    = 'record',
+                        metavar = 'SESSION_FILE',
+                        help    = 'record the rounds played to SESSION_FILE')
+    parser.add_argument('--replay',
+                        default = None,
+                        dest    = 'replay',
+                        metavar = 'SESSION_FILE',
+                        help    = 'time replays of the rounds in SESSION_FILE')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    nspace = parseCommandLine()
+    cfg.mergeFile(nspace.config_file_name)
+    # Time play, not logging
+    cfg['LOG_LEVEL'] = 'off'
+    if nspace.record is not None:
+        record(nspace.record, nspace.num_rounds, nspace.num_players)
+    if nspace.replay is not None:
+        rate = benchmarkReplay(nspace.replay, repeat=nspace.repeat)
+        print('replay: %.0f rounds/s' % rate)
+        sys.exit(0)
+    rate = max(benchmark(nspace.num_rounds, nspace.num_players)
+               for _ in range(nspace.repeat))
+    print('%d player(s): %.0f rounds/s' % (nspace.num_players, rate))
@@ -6,12 +6,15 @@ import sys
 
 from config import (cfg, SemanticConfigError)
 from game import (InsufficientFundsError, Player)
+import log
 from policies import (BasicStrategyPolicy,
                       CardCount,
                       DeclineInsurancePolicy,
                       FeedbackDecisionPolicy,
                       HumanInputPolicy,
                       MinBettingPolicy)
+import rng
+from simulation import (PlayerSpec, Simulator, TableSpec)
 from table import Table
 
 def parseCommandLine():
@@ -23,8 +26,31 @@ def parseCommandLine():
                         dest    = 'config_file_name',
                         metavar = 'CONFIG_FILE',
                         help    = 'the location of the configuration file')
+    parser.add_argument('-sim', '--simulate',
+                        type    = int,
+                        dest    = 'num_rounds',
+                        metavar = 'NUM_ROUNDS',
+                        help    = 'simulate NUM_ROUNDS of basic strategy play')
+    parser.add_argument('-s', '--seed',
+                        type    = int,
+                        default = None,
+                        dest    = 'seed',
+                        metavar = 'SEED',
+                        help    = 'the master random seed (overrides RANDOM_SEED)')
+    parser.add_argument('-j', '--workers',
+                        type    = int,
+                        default = None,
+                        dest    = 'workers',
+                        metavar = 'NUM_WORKERS',
+                        help    = 'the number of simulation processes')
     return parser.parse_args()
 
+def simulate(nspace):
+    """Runs simulation requested on command line"""
+    spec = TableSpec([PlayerSpec('Bot', 'cfg/three_chart.txt')],
+                     [nspace.config_file_name])
+    print(Simulator(spec, nspace.workers).run(nspace.num_rounds))
+
 if __name__ == '__main__':
     nspace = parseCommandLine()
 
@@ -32,6 +58,13 @@ if __name__ == '__main__':
         cfg.mergeFile(nspace.config_file_name)
     except SemanticConfigError as e:
         print(e)
+    if nspace.seed is not None:
+        cfg['RANDOM_SEED'] = nspace.seed
+    rng.seed()
+
+    if nspace.num_rounds is not None:
+        simulate(nspace)
+        sys.exit(0)
 
     hip1 = HumanInputPolicy()
     strat = BasicStrategyPolicy('cfg/three_chart.txt')
@@ -51,11 +84,11 @@ if __name__ == '__main__':
     table = Table()
     table.register_player(player)
     nRounds = 0
-    counter = CardCount('HiLoCount')
-    table.shoe.registerObserver(counter)
+    counter = CardCount('HiLoCount', shoe=table.shoe)
 
     def handler(_signum, _frame):
         """Handles Ctrl+C signals"""
+        log.shutdown()
         print()
         print(str(nRounds) + ' rounds played')
         print(str(strat1.num_wrong) + ' hands played incorrectly')
@@ -67,7 +100,8 @@ if __name__ == '__main__':
     try:
         while True:
             table.play()
-            print('Count is ' + str(counter.count))
+            print('Count is %s (true count %.1f)' % (counter.count,
+                                                     counter.trueCount()))
             print()
             nRounds += 1
     except InsufficientFundsError as e:
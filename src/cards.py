@@ -3,13 +3,23 @@ Provides classes modelling playing card logic needed for blackjack gameplay
 """
 
 from abc import ABCMeta, abstractmethod
+from array import array
+from collections import deque
+from inspect import signature
 from math import floor
-from random import Random
 
 from config import cfg
+import rng
 
 class Card:
-    """Represents a playing card"""
+    """Represents a playing card
+
+       The 52 cards are interned: constructing a card returns the single
+       instance of its rank and suit, so cards compare by identity and can be
+       stored as their integer code (rank index * 4 + suit index)"""
+
+    __slots__ = ('rank', 'suit', 'index', 'code', 'value', 'valueIndex',
+                 'isAce', 'isFaceCard')
 
     ranks  = [2,3,4,5,6,7,8,9,10,'J','Q','K','A']
     suits  = ['S','H','D','C']
@@ -32,20 +42,62 @@ class Card:
         'C' : '♣'
     }
 
+    # Interned cards indexed by code, filled in below the class
+    deck = []
+    # Maps (rank, suit) arguments as spelled by callers to interned cards
+    _interned = {}
+
     @staticmethod
     def makeDeck():
         """Returns list of 52 cards over all ranks and suits"""
-        return [Card(r,s) for r in Card.ranks for s in Card.suits]
+        return list(Card.deck)
 
-    def __init__(self, rank, suit):
-        """Initializes card's rank and suit to rank and suit respectively"""
-        self.rank = rank if isinstance(rank, int) else rank[0].upper()
-        self.suit = suit[0].upper()
-        if self.rank not in Card.ranks:
+    @staticmethod
+    def fromCode(code):
+        """Returns card with integer code"""
+        return Card.deck[code]
+
+    def __new__(cls, rank, suit):
+        """Returns interned card of rank and suit"""
+        try:
+            return Card._interned[(rank, suit)]
+        except (KeyError, TypeError):
+            pass
+        r = rank if isinstance(rank, int) else rank[0].upper()
+        s = suit[0].upper()
+        if r not in Card.ranks:
             raise TypeError('Rank must be a number 2-10 or J, Q, K, A')
-        if self.suit not in Card.suits:
+        if s not in Card.suits:
             raise TypeError('Suit must be one of S, H, D, C')
-        self.index = Card.ranks.index(self.rank)
+        card = Card.deck[Card.ranks.index(r) * len(Card.suits) + Card.suits.index(s)]
+        Card._interned[(rank, suit)] = card
+        return card
+
+    def __init__(self, rank, suit):
+        """Does nothing, interned cards are initialized once by _intern"""
+        pass
+
+    @staticmethod
+    def _intern(index, suitIndex):
+        """Creates the card of rank index and suit index"""
+        card = object.__new__(Card)
+        card.rank = Card.ranks[index]
+        card.suit = Card.suits[suitIndex]
+        card.index = index
+        card.code = index * len(Card.suits) + suitIndex
+        card.isAce = card.rank == 'A'
+        card.isFaceCard = card.rank in ('J','Q','K','A')
+        if card.isAce:
+            card.value = 11
+            card.valueIndex = 9
+        elif card.isFaceCard:
+            card.value = 10
+            card.valueIndex = 8
+        else:
+            card.value = card.rank
+            card.valueIndex = card.rank - 2
+        Card._interned[(card.rank, card.suit)] = card
+        return card
 
     @property
     def rankName(self):
@@ -57,19 +109,9 @@ class Card:
         """Returns suit of card"""
         return Card.charToNameDict[self.suit]
 
-    @property
-    def isAce(self):
-        """Returns True iff card is an Ace"""
-        return self.rank == 'A'
-
-    @property
-    def isFaceCard(self):
-        """Returns True iff card is a face card"""
-        return self.rank in ('J','Q','K','A')
-
     def rankEquivalent(self, other):
         """Returns True iff other has equivalent rank"""
-        return self.rank == other.rank
+        return self.index == other.index
 
     def __str__(self):
         """Returns formatted representation of card"""
@@ -82,36 +124,104 @@ class Card:
             rank = "'" + rank + "'"
         return "Card(%s, '%s')" % (rank, self.suit)
 
+    def __reduce__(self):
+        """Pickles card as its constructor call, preserving interning"""
+        return (Card, (self.rank, self.suit))
+
     def __eq__(self, other):
         """Returns True if self has equal rank and suit to that of other"""
-        return self.rank == other.rank and self.suit == other.suit
+        return self is other
 
     def __ne__(self, other):
         """Returns True iff self is not equal to other"""
-        return not self == other
+        return self is not other
+
+    def __hash__(self):
+        """Returns card's code"""
+        return self.code
+
+Card.deck.extend(Card._intern(r, s)
+                 for r in range(len(Card.ranks))
+                 for s in range(len(Card.suits)))
+_DECK = Card.deck
+
+class ShoeEvent:
+    """Kinds of events a Shoe publishes to its subscribers, with the argument
+       each subscriber is called with"""
+
+    # A visible card was dealt: the card
+    CARD_DEALT = 1
+    # Shoe was shuffled: None, as observers have always been told
+    SHUFFLE = 2
+    # Cards were burned: list of cards
+    BURN = 3
+    # Dealer's hole card was turned over: the card
+    HOLE_CARD_REVEALED = 4
+    # Round ended: list of cards seen this round since any shuffle
+    ROUND_END = 5
+
+    events = [CARD_DEALT, SHUFFLE, BURN, HOLE_CARD_REVEALED, ROUND_END]
+
+def cut_index(n, cutIndex):
+    """Returns index of the cut card in a shoe of n decks: half a deck from
+       the end if cutIndex is 0 or None, the fraction cutIndex of the shoe if
+       a float, cutIndex cards from the end if negative, else cutIndex"""
+    num_cards = cfg['NUM_CARDS_PER_DECK']
+    if not cutIndex:
+        return int((n - 1/2) * num_cards)
+    if isinstance(cutIndex, float):
+        return int(floor(n * num_cards * cutIndex))
+    if cutIndex < 0:
+        return n * num_cards + cutIndex
+    return cutIndex
 
 class Shoe:
-    """Represents a shoe of decks for dealing purposes"""
+    """Represents a shoe of decks for dealing purposes
 
-    def __init__(self, n, algorithm, cutIndex=None):
+       Cards are stored as their codes in a byte array, and the number of
+       cards of each rank not yet dealt is kept up to date as cards are dealt"""
+
+    def __init__(self, n, algorithm, cutIndex=None, rand=None):
         """Initializes shoe to have n decks,
-               algorithm function for shuffling, and cutIndex"""
-        self.cards = []
+               algorithm function for shuffling, and cutIndex.
+           algorithm is passed the array of card codes and returns it
+           permuted, as card codes or Cards. Algorithms taking a rand keyword
+           are passed rand, a random.Random (a stream of the master seed by
+           default)"""
         self.numDecks = n
         self.algorithm = algorithm
+        self.rand = rand if rand is not None else rng.spawnRandom()
+        try:
+            self._passRand = 'rand' in signature(algorithm).parameters
+        except (TypeError, ValueError):
+            self._passRand = False
         self.index = 0
         self.observers = []
-        num_cards = cfg['NUM_CARDS_PER_DECK']
-        if not cutIndex:
-            self.cutIndex = int((n - 1/2) * num_cards)
-        elif isinstance(cutIndex, float):
-            self.cutIndex = int(floor(n * num_cards * cutIndex))
-        elif cutIndex < 0:
-            self.cutIndex = n * num_cards + cutIndex
-        else:
-            self.cutIndex = cutIndex
-        for _ in range(n):
-            self.cards.extend(Card.makeDeck())
+        self.subscribers = {event : [] for event in ShoeEvent.events}
+        self._onDealt = self.subscribers[ShoeEvent.CARD_DEALT]
+        # Codes seen this round, kept only for ROUND_END subscribers
+        self._seen = None
+        self.cutIndex = cut_index(n, cutIndex)
+        self.codes = array('B', range(len(Card.deck))) * n
+        self.rankCounts = [len(Card.suits) * n] * len(Card.ranks)
+        # Optional tables rebuilt on shuffle, see prefix.PrefixTables
+        self.prefix = None
+        # Index of the dealer's hole card while dealt and not yet shown
+        self.hole = None
+        # True iff the shoe was shuffled since the hole card was dealt
+        self._holeShuffled = False
+
+    @property
+    def cards(self):
+        """Returns list of cards in shoe in dealing order"""
+        return [_DECK[code] for code in self.codes]
+
+    @property
+    def composition(self):
+        """Returns number of cards of each value of BlackjackHand.VALUES
+           remaining in shoe (ten-valued cards counted together)"""
+        counts = self.rankCounts
+        return tuple(counts[:8]) + (sum(counts[8:12]), counts[12])
 
     @property
     def numCardsRemainingToBeDealt(self):
@@ -136,44 +246,271 @@ class Shoe:
 
     def deal(self,n=1,visible=True):
         """Remove and return n cards from beginning of shoe"""
-        c = []
-        for _ in range(n):
-            c.append(self.dealOneCard(visible))
-        return c
+        if self.index + n > self.cutIndex:
+            return [self.dealOneCard(visible) for _ in range(n)]
+        return [_DECK[code] for code in self.dealCodes(n, visible)]
+
+    def dealCodes(self, n=1, visible=True):
+        """Remove and return array of codes of n cards from beginning of shoe,
+           as one slice unless the cut card is reached"""
+        start = self.index
+        stop = start + n
+        if stop > self.cutIndex:
+            return array('B', (self.dealOneCard(visible).code for _ in range(n)))
+        codes = self.codes[start:stop]
+        self.index = stop
+        counts = self.rankCounts
+        for code in codes:
+            counts[code >> 2] -= 1
+        if visible:
+            if self._onDealt:
+                for code in codes:
+                    card = _DECK[code]
+                    for callback in self._onDealt:
+                        callback(card)
+            if self._seen is not None:
+                self._seen.extend(codes)
+        return codes
 
     def burn(self,n=1):
         """Remove, without showing, n cards from beginning of shoe"""
-        self.deal(n, False)
+        codes = self.dealCodes(n, False)
+        if self.subscribers[ShoeEvent.BURN]:
+            self.publish(ShoeEvent.BURN, [_DECK[code] for code in codes])
 
     def dealOneCard(self, visible=True):
         """Remove and return one card from beginning of shoe"""
-        if self.isExhausted:
+        index = self.index
+        if index >= self.cutIndex:
             self.shuffle()
-        c = self.cards[self.index]
+            index = self.index
+        code = self.codes[index]
+        self.index = index + 1
+        self.rankCounts[code >> 2] -= 1
+        c = _DECK[code]
         if visible:
-            self.notifyObservers(c)
-        self.index += 1
+            for callback in self._onDealt:
+                callback(c)
+            if self._seen is not None:
+                self._seen.append(code)
         return c
 
+    def dealHoleCard(self):
+        """Remove and return, without showing, the dealer's hole card"""
+        card = self.dealOneCard(False)
+        self.hole = self.index - 1
+        self._holeShuffled = False
+        return card
+
     def shuffle(self):
         """Shuffles the deck using specified algorithm"""
-        self.cards = self.algorithm(self.cards)
+        if self._passRand:
+            cards = self.algorithm(self.codes, rand=self.rand)
+        else:
+            cards = self.algorithm(self.codes)
+        if not isinstance(cards, array):
+            cards = array('B', (c if isinstance(c, int) else c.code
+                                for c in cards))
+        self.codes = cards
         self.index = 0
-        self.notifyObservers(None)
+        if self.hole is not None:
+            self._holeShuffled = True
+        self.hole = None
+        self.rankCounts = [len(Card.suits) * self.numDecks] * len(Card.ranks)
+        if self.prefix is not None:
+            self.prefix.build(cards)
+        if self._seen is not None:
+            self._seen = array('B')
+        self.publish(ShoeEvent.SHUFFLE, None)
         self.burn(cfg['NUM_CARDS_BURN_ON_SHUFFLE'])
 
+    def restore(self, codes, index):
+        """Puts shoe back at index of order codes, as dealt after a shuffle,
+           and resyncs subscribers"""
+        self.codes = codes
+        self.index = index
+        counts = [0] * len(Card.ranks)
+        for code in codes[index:]:
+            counts[code >> 2] += 1
+        self.rankCounts = counts
+        if self.prefix is not None:
+            self.prefix.build(codes)
+        self.resync()
+
+    def resync(self):
+        """Brings subscribers, such as card counts, to the shoe's position:
+           publishes a shuffle, then the cards seen since those it burned,
+           one at a time and as a round. Any hole card is forgotten"""
+        self.hole = None
+        self._holeShuffled = False
+        if self._seen is not None:
+            self._seen = array('B')
+        self.publish(ShoeEvent.SHUFFLE, None)
+        burned = min(cfg['NUM_CARDS_BURN_ON_SHUFFLE'], self.index)
+        codes = self.codes[burned:self.index]
+        if self._onDealt:
+            for code in codes:
+                card = _DECK[code]
+                for callback in self._onDealt:
+                    callback(card)
+        if self._seen is not None:
+            self._seen.extend(codes)
+            self.collect()
+
+    def revealHoleCard(self, card):
+        """Shows card, the dealer's hole card dealt unseen, unless it was
+           dealt from the order before a shuffle, which counts start afresh"""
+        self.hole = None
+        if self._holeShuffled:
+            self._holeShuffled = False
+            return
+        self.publish(ShoeEvent.HOLE_CARD_REVEALED, card)
+        if self._seen is not None:
+            self._seen.append(card.code)
+
+    def collect(self):
+        """Collects the cards dealt this round, a shoe keeps its discards
+           until the next shuffle. Publishes the round's cards"""
+        if self._seen is not None:
+            cards = [_DECK[code] for code in self._seen]
+            self._seen = array('B')
+            self.publish(ShoeEvent.ROUND_END, cards)
+
+    def subscribe(self, event, callback):
+        """Calls callback with the argument of each event of kind event
+           (a ShoeEvent)"""
+        self.subscribers[event].append(callback)
+        if event == ShoeEvent.ROUND_END and self._seen is None:
+            self._seen = array('B')
+
+    def unsubscribe(self, event, callback):
+        """Stops calling callback on events of kind event"""
+        self.subscribers[event].remove(callback)
+        if event == ShoeEvent.ROUND_END and not self.subscribers[event]:
+            self._seen = None
+
+    def publish(self, event, arg):
+        """Calls subscribers to event with arg"""
+        for callback in self.subscribers[event]:
+            callback(arg)
+
     def registerObserver(self, observer):
-        """Registers observers wishing to subscribe to events"""
+        """Registers observers wishing to subscribe to events,
+           observer.update is passed each card seen and None on shuffle"""
         self.observers.append(observer)
+        for event in (ShoeEvent.CARD_DEALT,
+                      ShoeEvent.SHUFFLE,
+                      ShoeEvent.HOLE_CARD_REVEALED):
+            self.subscribe(event, observer.update)
 
     def unregisterObserver(self, observer):
         """Registers observers wishing to unsubscribe to events"""
         self.observers.remove(observer)
+        for event in (ShoeEvent.CARD_DEALT,
+                      ShoeEvent.SHUFFLE,
+                      ShoeEvent.HOLE_CARD_REVEALED):
+            self.unsubscribe(event, observer.update)
 
     def notifyObservers(self, card):
-        """Notifies subscribed observers of an event"""
-        for o in self.observers:
-            o.update(card)
+        """Notifies subscribers of card dealt, or of shuffle if None"""
+        if card is None:
+            self.publish(ShoeEvent.SHUFFLE, None)
+        else:
+            self.publish(ShoeEvent.CARD_DEALT, card)
+
+class ContinuousShuffler(Shoe):
+    """Represents a continuous shuffling machine
+
+       Each card is drawn at random from the cards in the machine. The cards
+       dealt in a round are collected at its end and returned to the machine
+       after delay more rounds, so the machine never needs a full shuffle
+       and never burns cards. codes and rankCounts describe the machine"""
+
+    def __init__(self, n, delay=0, rand=None):
+        """Initializes machine to hold n decks, returning discards after
+           delay rounds, drawing from rand (a stream of the master seed
+           by default)"""
+        super().__init__(n, None, None, rand)
+        self.delay = delay
+        self.dealt = array('B')
+        self.held = deque()
+
+    @property
+    def numCardsRemainingToBeDealt(self):
+        """Returns number of cards in machine"""
+        return len(self.codes)
+
+    @property
+    def numCardsRemainingInShoe(self):
+        """Returns number of cards in machine"""
+        return len(self.codes)
+
+    @property
+    def isExhausted(self):
+        """Returns False, a machine is never reshuffled"""
+        return False
+
+    @property
+    def isEmpty(self):
+        """Returns True iff machine holds no cards"""
+        return len(self.codes) == 0
+
+    def dealCodes(self, n=1, visible=True):
+        """Remove and return array of codes of n cards drawn from machine"""
+        return array('B', (self.dealOneCard(visible).code for _ in range(n)))
+
+    def deal(self, n=1, visible=True):
+        """Remove and return n cards drawn from machine"""
+        return [self.dealOneCard(visible) for _ in range(n)]
+
+    def dealOneCard(self, visible=True):
+        """Remove and return one card drawn at random from machine"""
+        pool = self.codes
+        if not pool:
+            self._release(0)
+            if not pool:
+                raise ValueError('Continuous shuffler has no cards left')
+        j = self.rand.randrange(len(pool))
+        code = pool[j]
+        pool[j] = pool[-1]
+        pool.pop()
+        self.dealt.append(code)
+        self.rankCounts[code >> 2] -= 1
+        c = _DECK[code]
+        if visible:
+            for callback in self._onDealt:
+                callback(c)
+            if self._seen is not None:
+                self._seen.append(code)
+        return c
+
+    def shuffle(self):
+        """Loads every card into machine"""
+        self.codes = array('B', range(len(Card.deck))) * self.numDecks
+        self.rankCounts = [len(Card.suits) * self.numDecks] * len(Card.ranks)
+        self.dealt = array('B')
+        self.held.clear()
+        if self._seen is not None:
+            self._seen = array('B')
+        self.publish(ShoeEvent.SHUFFLE, None)
+
+    def collect(self):
+        """Collects the cards dealt this round, returning to the machine
+           those collected more than delay rounds ago"""
+        super().collect()
+        self.held.append(self.dealt)
+        self.dealt = array('B')
+        self._release(self.delay)
+
+    def _release(self, keep):
+        """Returns held discards to machine, oldest first,
+           until at most keep rounds are held"""
+        counts = self.rankCounts
+        while len(self.held) > keep:
+            discards = self.held.popleft()
+            self.codes.extend(discards)
+            for code in discards:
+                counts[code >> 2] += 1
 
 def faro_shuffle(deck):
     """Performs Faro shuffle on a given deck"""
@@ -184,10 +521,13 @@ def faro_shuffle(deck):
         ret.append(b)
     return ret
 
-def fisher_yates_shuffle(deck):
-    """Performs Fisher-Yates shuffle on a given deck"""
-    rand = Random()
-    for i in range(len(deck) - 1, 1, -1):
+def fisher_yates_shuffle(deck, rand=None):
+    """Performs Fisher-Yates shuffle on a given deck,
+       drawing from rand (a random.Random, a stream of the master seed
+       by default)"""
+    if rand is None:
+        rand = rng.spawnRandom()
+    for i in range(len(deck) - 1, 0, -1):
         j = rand.randint(0, i)
         temp = deck[i]
         deck[i] = deck[j]
@@ -197,6 +537,8 @@ def fisher_yates_shuffle(deck):
 class Hand(metaclass=ABCMeta):
     """Abstract base class for card hands"""
 
+    __slots__ = ()
+
     @abstractmethod
     def value(self):
         """Returns largest value of hand"""
@@ -228,12 +570,18 @@ class Hand(metaclass=ABCMeta):
             'Hand implementations must implement the __str__ method')
 
 class BlackjackHand(Hand):
-    """Represents Blackjack hand"""
+    """Represents Blackjack hand
+
+       Hard total, number of aces, value and softness are kept up to date as
+       cards are added, against the BLACKJACK_VALUE in effect when they were"""
 
     HARD_ACE_VALUE = 11
     SOFT_ACE_VALUE = 1
     VALUES = [2,3,4,5,6,7,8,9,10,'A']
 
+    __slots__ = ('_cards', '_hard', '_numAces', '_value', '_soft',
+                 '_blackjackValue', 'wasSplit')
+
     def __init__(self):
         """Initializes hand to have no cards"""
         self.reset()
@@ -241,72 +589,72 @@ class BlackjackHand(Hand):
     @staticmethod
     def card_value(card):
         """Returns integer value of card"""
-        if card.isAce:
-            return BlackjackHand.HARD_ACE_VALUE
-        elif card.isFaceCard:
-            return 10
-        return card.rank
+        return card.value
+
+    @property
+    def cards(self):
+        """Returns list of cards in hand"""
+        return self._cards
+
+    @cards.setter
+    def cards(self, cards):
+        """Replaces cards in hand by cards"""
+        self._cards = []
+        self._hard = 0
+        self._numAces = 0
+        self.addCards(*cards)
 
     @property
     def value(self):
         """Returns largest non-bust value if possible, else largest value"""
-        val = sum(BlackjackHand.card_value(c) for c in self.cards if not c.isAce)
-        nAces = self.numAces
-        if nAces > 0:
-            val += (nAces - 1) * BlackjackHand.SOFT_ACE_VALUE
-            if val + BlackjackHand.HARD_ACE_VALUE <= cfg['BLACKJACK_VALUE']:
-                val += BlackjackHand.HARD_ACE_VALUE
-            else:
-                val += BlackjackHand.SOFT_ACE_VALUE
-        return val
+        return self._value
+
+    @property
+    def hardValue(self):
+        """Returns value of hand counting every ace as one"""
+        return self._hard
 
     @property
     def ranks(self):
         """Returns list of ranks in hand"""
-        return [c.rank for c in self.cards]
+        return [c.rank for c in self._cards]
 
     @property
     def isAcePair(self):
         """Return True iff hand is pair of Aces"""
-        return self.numCards == 2 and self.numAces == 2
+        return self._numAces == 2 and len(self._cards) == 2
 
     @property
     def isSoft17(self):
         """Return True iff hand is soft 17"""
-        return self.value == 17 and self.isSoft
+        return self._soft and self._value == 17
 
     @property
     def isSoft(self):
         """Return True iff hand is soft (i.e. contains hard-valued ace)"""
-        val = sum(BlackjackHand.card_value(c) for c in self.cards if not c.isAce)
-        numAces = self.numAces
-        if numAces > 0:
-            val += (numAces - 1) * BlackjackHand.SOFT_ACE_VALUE
-            if val + BlackjackHand.HARD_ACE_VALUE <= cfg['BLACKJACK_VALUE']:
-                return True
-        return False
+        return self._soft
 
     @property
     def numCards(self):
         """Returns number of cards in hand"""
-        return len(self.cards)
+        return len(self._cards)
 
     @property
     def numAces(self):
         """Returns number of ace cards in hand"""
-        return sum(1 for c in self.cards if c.isAce)
+        return self._numAces
 
     @property
     def isBlackjackValued(self):
         """Returns True iff hand has value equal to Blackjack value"""
-        return self.value == cfg['BLACKJACK_VALUE']
+        return self._value == self._blackjackValue
 
     @property
     def isNaturalBlackjack(self):
         """Returns True iff hand is natural blackjack
         Note a blackjack after split is NOT considered natural"""
-        return (self.numCards == 2 and
-                self.value == cfg['BLACKJACK_VALUE'] and
+        return (self._value == self._blackjackValue and
+                len(self._cards) == 2 and
                 not self.wasSplit)
 
     @property
@@ -318,9 +666,8 @@ class BlackjackHand(Hand):
     @property
     def isPairByValue(self):
         """Returns True iff initial two cards are equal in rank"""
-        v1 = BlackjackHand.card_value(self.cards[0])
-        v2 = BlackjackHand.card_value(self.cards[1])
-        return self.numCards == 2 and v1 == v2
+        return (self.numCards == 2 and
+                self._cards[0].value == self._cards[1].value)
 
     @property
     def isPair(self):
@@ -332,12 +679,12 @@ class BlackjackHand(Hand):
     @property
     def isBust(self):
         """Returns True iff hand value is greater than blackjack value"""
-        return self.value > cfg['BLACKJACK_VALUE']
+        return self._value > self._blackjackValue
 
     @property
     def hasAce(self):
         """Returns True iff hand has at least one ace"""
-        return self.numAces >= 1
+        return self._numAces > 0
 
     @property
     def splitCards(self):
@@ -358,12 +705,31 @@ class BlackjackHand(Hand):
 
     def addCards(self, *cards):
         """Adds args to hand"""
-        self.cards.extend(cards)
+        for c in cards:
+            if c.isAce:
+                self._numAces += 1
+                self._hard += BlackjackHand.SOFT_ACE_VALUE
+            else:
+                self._hard += c.value
+        self._cards.extend(cards)
+        self._update()
+
+    def _update(self):
+        """Updates value and softness from hard total and number of aces"""
+        bj = cfg['BLACKJACK_VALUE']
+        soft_value = (self._hard + BlackjackHand.HARD_ACE_VALUE -
+                      BlackjackHand.SOFT_ACE_VALUE)
+        self._soft = self._numAces > 0 and soft_value <= bj
+        self._value = soft_value if self._soft else self._hard
+        self._blackjackValue = bj
 
     def reset(self):
         """Removes all cards from hand"""
-        self.cards = []
+        self._cards = []
+        self._hard = 0
+        self._numAces = 0
         self.wasSplit = False
+        self._update()
 
     def __eq__(self, other):
         """Returns True iff cards in self are same as in other"""
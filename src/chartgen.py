@@ -0,0 +1,127 @@
+"""
+Generates basic strategy charts from exact expected values
+
+Every entry is the best action for the two-card hand of its row against the
+upcard of its column, under the configuration in effect. Hard and soft rows
+ignore splitting, pair rows consider it.
+"""
+
+import argparse
+import glob
+import os
+
+from cards import (BlackjackHand, Card)
+from commands import Command
+from config import (cfg, SemanticConfigError)
+from expectation import expectedValues
+from policies import StrategyChart
+
+HARD_TOTALS = range(20, 3, -1)
+SOFT_TOTALS = range(20, 11, -1)
+PAIRS = list(reversed(BlackjackHand.VALUES))
+PAIRS.insert(0, PAIRS.pop())
+
+def twoCardHand(rank1, rank2):
+    """Returns hand of cards of rank1 and rank2"""
+    hand = BlackjackHand()
+    hand.addCards(Card(rank1, 'S'), Card(rank2, 'H'))
+    return hand
+
+def hardHand(total):
+    """Returns two-card hard hand of total, avoiding pairs where possible"""
+    if total > 11:
+        return twoCardHand(10, total - 10)
+    if total > 4:
+        return twoCardHand(2, total - 2)
+    return twoCardHand(2, 2)
+
+def softHand(total):
+    """Returns two-card soft hand of total"""
+    if total == 12:
+        return twoCardHand('A', 'A')
+    return twoCardHand('A', total - 11)
+
+def action(evs):
+    """Returns chart action best among EVs of commands in evs"""
+    best = max(evs, key=evs.get)
+    if best == Command.DOUBLE:
+        return 'Dh' if evs[Command.HIT] >= evs[Command.STAND] else 'Ds'
+    if best == Command.SURRENDER:
+        # Surrender is often unavailable, so say what to do instead
+        fallback = dict(evs)
+        del fallback[Command.SURRENDER]
+        return {'H': 'Su', 'Dh': 'Su', 'S': 'Rs', 'Ds': 'Rs',
+                'Sp': 'Rp'}[action(fallback)]
+    return {Command.HIT: 'H', Command.STAND: 'S', Command.SPLIT: 'Sp'}[best]
+
+def _row(hand, split):
+    """Returns dict mapping each upcard to the best action on hand"""
+    row = {}
+    for up in BlackjackHand.VALUES:
+        evs = expectedValues(hand, up)
+        if not split:
+            evs.pop(Command.SPLIT, None)
+        row[up] = action(evs)
+    return row
+
+def generateChart():
+    """Returns StrategyChart of the best actions under the configuration"""
+    charts = []
+    for (rows, makeHand, split) in ((HARD_TOTALS, hardHand, False),
+                                    (SOFT_TOTALS, softHand, False),
+                                    (PAIRS, lambda r: twoCardHand(r, r), True)):
+        chart = {}
+        for value in rows:
+            for (up, act) in _row(makeHand(value), split).items():
+                chart[(value, up)] = act
+        charts.append(StrategyChart.Chart(chart))
+    return StrategyChart(*charts)
+
+def header(config_file_names):
+    """Returns comment lines describing the configuration of a chart"""
+    lines = ['# Generated from exact expected values',
+             '# Configuration: %s' % ', '.join(config_file_names or
+                                               ['default']),
+             '# %d decks, dealer %s soft 17, double after split %s,' %
+             (cfg['NUM_DECKS'],
+              'hits' if cfg['DEALER_HITS_ON_SOFT_17'] else 'stands on',
+              'allowed' if cfg['DOUBLE_AFTER_SPLIT_ALLOWED'] else 'not allowed'),
+             '# late surrender %s' %
+             ('allowed' if cfg['LATE_SURRENDER'] else 'not allowed')]
+    return '\n'.join(lines) + '\n\n'
+
+def writeChart(config_file_names, filename):
+    """Writes chart for config files merged over the defaults to filename"""
+    cfg.reset()
+    for name in config_file_names:
+        cfg.mergeFile(name)
+    generateChart().toFile(filename, header(config_file_names))
+
+def parseCommandLine():
+    """Parses command line, Returns namespace"""
+    parser = argparse.ArgumentParser(description='Basic strategy chart generator')
+    parser.add_argument('config_files',
+                        nargs   = '*',
+                        metavar = 'CONFIG_FILE',
+                        help    = 'configuration variants to generate charts for '
+                                  '(every cfg/*.ini by default)')
+    parser.add_argument('-o', '--output_dir',
+                        default = '.',
+                        dest    = 'output_dir',
+                        metavar = 'OUTPUT_DIR',
+                        help    = 'the directory charts are written to')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    nspace = parseCommandLine()
+    config_files = nspace.config_files or sorted(glob.glob('cfg/*.ini'))
+    for config_file in config_files:
+        name = os.path.splitext(os.path.basename(config_file))[0]
+        filename = os.path.join(nspace.output_dir, name + '_chart.txt')
+        variants = [] if config_file == cfg.default_filename else [config_file]
+        try:
+            writeChart(variants, filename)
+        except SemanticConfigError as e:
+            print('Skipped %s: %s' % (config_file, e))
+            continue
+        print('Wrote %s' % filename)
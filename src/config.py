@@ -61,6 +61,12 @@ def verifyInfiniteInt(conf, value):
         return parsed, None
     return None, "to be either '*' or a non-negative integer"
 
+def verifyLogLevel(_, value):
+    """Parses and verifies a log level"""
+    if str(value).lower() in Config.LOG_LEVELS:
+        return str(value).lower(), None
+    return None, 'to be one of %s' % ', '.join(Config.LOG_LEVELS)
+
 def verifyMaxBet(conf, value):
     """Parses and verifies a maximum bet"""
     min_bet = conf['MINIMUM_BET']
@@ -174,6 +180,9 @@ class Config:
 
     UNRESTRICTED = -1
 
+    # Log levels, each logging the messages of those before it
+    LOG_LEVELS = ['off', 'round', 'hand', 'decision', 'debug']
+
     default_filename  = 'cfg/default_config.ini'
 
     _deps = {
@@ -190,6 +199,10 @@ class Config:
         'PUSH_ON_BLACKJACK': verifyBool,
         'CUT_INDEX': verifyCutIndex,
         'NUM_CARDS_BURN_ON_SHUFFLE': verifyNumCardsBurn,
+        'RANDOM_SEED': verifyInfiniteInt,
+        'CONTINUOUS_SHUFFLE': verifyBool,
+        'CSM_DELAY_ROUNDS': verifyNonNegativeInt,
+        'TRUE_COUNT_RESOLUTION': verifyRatio,
         'MINIMUM_BET': verifyPositiveInt,
         'MAXIMUM_BET': verifyMaxBet,
         'NUM_SEATS': verifyPositiveInt,
@@ -212,6 +225,10 @@ class Config:
         'EARLY_SURRENDER_RATIO': verifyRatio,
         'OFFER_INSURANCE': verifyBool,
         'INSURANCE_RATIO': verifyRatio,
+        'LOG_LEVEL': verifyLogLevel,
+        'LOG_MAX_BYTES': verifyNonNegativeInt,
+        'LOG_BACKUPS': verifyNonNegativeInt,
+        'LOG_COMPRESS': verifyBool,
     }
 
     def __init__(self):
@@ -0,0 +1,249 @@
+"""
+Provides a table view recording play as a stream of typed events
+
+Each event is a dict holding its kind (an Event), the round number and the
+seat it concerns (-1 for the dealer), plus fields of its kind. Cards are
+recorded as their codes (see Card.fromCode) and commands as Command ints.
+A round's events are handed to an EventStream when the round ends, and
+written by a background thread in one of the encodings below.
+"""
+
+import json
+import queue
+import struct
+import threading
+
+from view import NullView
+
+class Event:
+    """Kinds of events, with the fields each adds"""
+
+    # Initial hand: upcard, cards
+    DEAL = 1
+    # Player chose command: hand, upcard, cards, available, command
+    DECISION = 2
+    # Hand settled: hand, amount (negative for a loss)
+    SETTLE = 3
+    # Insurance settled: amount (negative if the stake was lost)
+    INSURANCE = 4
+    # Natural blackjack: no fields
+    BLACKJACK = 5
+    # Round over, events of the next round follow: no fields
+    ROUND_END = 6
+
+    names = {
+        DEAL      : 'deal',
+        DECISION  : 'decision',
+        SETTLE    : 'settle',
+        INSURANCE : 'insurance',
+        BLACKJACK : 'blackjack',
+        ROUND_END : 'round_end'
+    }
+
+    kinds = {name : kind for (kind, name) in names.items()}
+
+class JsonLinesEncoding:
+    """Encodes each event as a line of JSON, its kind named"""
+
+    def encode(self, event):
+        """Returns bytes encoding event"""
+        event = dict(event, event=Event.names[event['event']])
+        return (json.dumps(event, separators=(',', ':')) + '\n').encode()
+
+    def decode(self, stream):
+        """Yields events read from binary file stream"""
+        for line in stream:
+            event = json.loads(line)
+            event['event'] = Event.kinds[event['event']]
+            yield event
+
+class BinaryEncoding:
+    """Encodes each event as its length (4 bytes) followed by a fixed
+       layout of its fields, cards and commands as single bytes"""
+
+    _length = struct.Struct('<I')
+    _header = struct.Struct('<BIb')
+    _amount = struct.Struct('<Bd')
+
+    def encode(self, event):
+        """Returns bytes encoding event"""
+        kind = event['event']
+        data = self._header.pack(kind, event['round'], event['seat'])
+        if kind == Event.DEAL:
+            data += bytes([event['upcard']]) + bytes(event['cards'])
+        elif kind == Event.DECISION:
+            commands = 0
+            for command in event['available']:
+                commands |= 1 << command
+            data += bytes([event['hand'], event['upcard'], commands,
+                           event['command']]) + bytes(event['cards'])
+        elif kind == Event.SETTLE:
+            data += self._amount.pack(event['hand'], event['amount'])
+        elif kind == Event.INSURANCE:
+            data += struct.pack('<d', event['amount'])
+        return self._length.pack(len(data)) + data
+
+    def decode(self, stream):
+        """Yields events read from binary file stream"""
+        while True:
+            prefix = stream.read(self._length.size)
+            if len(prefix) < self._length.size:
+                return
+            data = stream.read(self._length.unpack(prefix)[0])
+            kind, rnd, seat = self._header.unpack_from(data)
+            event = {'event' : kind, 'round' : rnd, 'seat' : seat}
+            body = data[self._header.size:]
+            if kind == Event.DEAL:
+                event['upcard'] = body[0]
+                event['cards'] = list(body[1:])
+            elif kind == Event.DECISION:
+                event['hand'] = body[0]
+                event['upcard'] = body[1]
+                event['available'] = [c for c in range(8) if body[2] >> c & 1]
+                event['command'] = body[3]
+                event['cards'] = list(body[4:])
+            elif kind == Event.SETTLE:
+                event['hand'], event['amount'] = self._amount.unpack(body)
+            elif kind == Event.INSURANCE:
+                event['amount'] = struct.unpack('<d', body)[0]
+            yield event
+
+def encodingFor(filename):
+    """Returns encoding of filename, JSON lines if it ends in .jsonl"""
+    if filename.endswith('.jsonl'):
+        return JsonLinesEncoding()
+    return BinaryEncoding()
+
+def readEvents(filename, encoding=None):
+    """Yields events of file (encoding by default chosen by encodingFor)"""
+    if encoding is None:
+        encoding = encodingFor(filename)
+    with open(filename, 'rb') as stream:
+        yield from encoding.decode(stream)
+
+class EventStream:
+    """Buffered file of events, encoded and written by a background thread
+
+       At most maxsize batches wait to be written; write blocks once
+       that many are waiting, holding the table back until the writer
+       catches up. If encoding or writing a batch fails, the thread keeps
+       draining the queue and write and close raise the error"""
+
+    def __init__(self, filename, encoding=None, maxsize=64,
+                 buffering=1 << 20):
+        """Initializes members, encoding by default chosen by encodingFor"""
+        self.encoding = encoding if encoding is not None else encodingFor(filename)
+        self.file = open(filename, 'wb', buffering=buffering)
+        self.queue = queue.Queue(maxsize)
+        # First exception raised encoding or writing, None if none was
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True,
+                                       name='EventStream')
+        self.thread.start()
+
+    def write(self, events):
+        """Queues list of events to be written, blocking while full,
+           Raises the error writing an earlier batch failed with"""
+        if self.error is not None:
+            raise self.error
+        self.queue.put(events)
+
+    def close(self):
+        """Writes queued events, stops thread and closes file,
+           Raises the error writing failed with"""
+        if self.file is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+        self.file = None
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        """Writes queued batches until closed, after an error only
+           draining them so write and close never block on a dead thread"""
+        encode = self.encoding.encode
+        while True:
+            events = self.queue.get()
+            if events is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                self.file.write(b''.join([encode(e) for e in events]))
+            except Exception as e:
+                self.error = e
+
+    def __enter__(self):
+        """Returns stream"""
+        return self
+
+    def __exit__(self, *_):
+        """Closes stream"""
+        self.close()
+
+class EventView(NullView):
+    """View recording the table's events to stream (an EventStream),
+       a round at a time"""
+
+    def __init__(self, stream):
+        """Initializes members"""
+        self.stream = stream
+        self.table = None
+        self.round = 0
+        self.events = []
+
+    def _seat(self, slot):
+        """Returns seat of slot, -1 for the dealer"""
+        if slot.player.isDealer:
+            return -1
+        return self.table.slots.index(slot)
+
+    def _event(self, kind, slot, **fields):
+        """Records event of kind concerning slot (None for the round)"""
+        fields['event'] = kind
+        fields['round'] = self.round
+        fields['seat'] = -1 if slot is None else self._seat(slot)
+        self.events.append(fields)
+
+    def beginRound(self, table):
+        """Records table"""
+        self.table = table
+
+    def dealerShows(self, upcard):
+        """Records every player's initial hand"""
+        for slot in self.table.active_slots:
+            self._event(Event.DEAL, slot, upcard=upcard.code,
+                        cards=[c.code for c in slot.hand.cards])
+
+    def dealerBlackjack(self):
+        """Records dealer's blackjack"""
+        self._event(Event.BLACKJACK, None)
+
+    def playerBlackjack(self, slot):
+        """Records player's blackjack"""
+        self._event(Event.BLACKJACK, slot)
+
+    def insured(self, slot, amount):
+        """Records insurance settled"""
+        self._event(Event.INSURANCE, slot, amount=amount)
+
+    def decision(self, slot, upcard, availableCommands, command):
+        """Records player's decision"""
+        self._event(Event.DECISION, slot, hand=slot.index,
+                    upcard=upcard.code,
+                    cards=[c.code for c in slot.hand.cards],
+                    available=list(availableCommands),
+                    command=command)
+
+    def settle(self, slot, amount):
+        """Records hand settled"""
+        self._event(Event.SETTLE, slot, hand=slot.index, amount=amount)
+
+    def endRound(self, table):
+        """Writes the round's events"""
+        self._event(Event.ROUND_END, None)
+        self.stream.write(self.events)
+        self.events = []
+        self.round += 1
@@ -0,0 +1,321 @@
+"""
+Provides composition-dependent expected values of player decisions
+
+Expected values are in units of the hand's original bet. The dealer always
+checks for a natural before players act (as the Table does), so values are
+conditioned on the dealer not having one.
+
+Splits are evaluated by recursion over the number of hands created, the
+number of hands still awaiting their second card and the number of cards of
+the pair's value drawn so far. Each hand's own play depends only on the
+latter, so the values of the hands are cached per resplit depth and shared
+across every sequence of resplits reaching it.
+"""
+
+from functools import lru_cache
+
+from commands import Command
+from config import (cfg, Config)
+from probability import (ACE,
+                         DEALER_STANDS_ON,
+                         TEN,
+                         dealerOutcomes,
+                         fullComposition,
+                         hardValue,
+                         removeCards,
+                         valueIndex)
+
+def rules():
+    """Returns the configuration options expected values depend on"""
+    return (cfg['BLACKJACK_VALUE'],
+            cfg['PAYOUT_RATIO'],
+            cfg['DEALER_HITS_ON_SOFT_17'])
+
+def handValue(hard, hasAce, bj):
+    """Returns best value of hand with hard total"""
+    if hasAce and hard + 10 <= bj:
+        return hard + 10
+    return hard
+
+@lru_cache(maxsize=None)
+def _standTable(dealer, composition, rules):
+    """Returns tuple of EVs of standing on each value 0..bj against dealer
+       starting state (hard, hasAce, numCards) drawing from composition"""
+    bj, payout, hitsSoft17 = rules
+    hard, hasAce, numCards = dealer
+    dist = dealerOutcomes(hard, hasAce, numCards, composition, bj, hitsSoft17)
+    natural = dist[-1]
+    if natural == 1.0:
+        raise ValueError('Dealer has a natural')
+    totals = [p / (1 - natural) for p in dist[:-2]]
+    bust = dist[-2] / (1 - natural)
+    evs = []
+    for value in range(bj + 1):
+        win = bust + sum(p for (t, p) in enumerate(totals, DEALER_STANDS_ON)
+                         if t < value)
+        lose = sum(p for (t, p) in enumerate(totals, DEALER_STANDS_ON)
+                   if t > value)
+        evs.append(win * payout - lose)
+    return tuple(evs)
+
+def _standEV(value, composition, dealer, dealerComposition, rules):
+    """Returns EV of standing on value, the dealer drawing from
+       dealerComposition if given, else from composition"""
+    if value > rules[0]:
+        return -1.0
+    if dealerComposition is None:
+        dealerComposition = composition
+    return _standTable(dealer, dealerComposition, rules)[value]
+
+@lru_cache(maxsize=None)
+def _hitEV(hard, hasAce, composition, dealer, dealerComposition, rules):
+    """Returns EV of hitting hand with hard total, then playing optimally"""
+    total = sum(composition)
+    ev = 0.0
+    comp = list(composition)
+    for i, count in enumerate(composition):
+        if count == 0:
+            continue
+        comp[i] -= 1
+        ev += count / total * _bestEV(hard + hardValue(i),
+                                      hasAce or i == ACE,
+                                      tuple(comp),
+                                      dealer,
+                                      dealerComposition,
+                                      rules)
+        comp[i] += 1
+    return ev
+
+def _bestEV(hard, hasAce, composition, dealer, dealerComposition, rules):
+    """Returns EV of hand with hard total played optimally by hitting or standing"""
+    bj = rules[0]
+    value = handValue(hard, hasAce, bj)
+    if value > bj:
+        return -1.0
+    stand = _standEV(value, composition, dealer, dealerComposition, rules)
+    if value == bj:
+        return stand
+    return max(stand, _hitEV(hard, hasAce, composition, dealer,
+                             dealerComposition, rules))
+
+def _doubleEV(hard, hasAce, composition, dealer, dealerComposition, rules):
+    """Returns EV per original bet of doubling hand with hard total"""
+    total = sum(composition)
+    ev = 0.0
+    comp = list(composition)
+    for i, count in enumerate(composition):
+        if count == 0:
+            continue
+        comp[i] -= 1
+        value = handValue(hard + hardValue(i), hasAce or i == ACE, rules[0])
+        ev += count / total * _standEV(value, tuple(comp), dealer,
+                                       dealerComposition, rules)
+        comp[i] += 1
+    return (1 + cfg['DOUBLE_RATIO']) * ev
+
+def splitRules():
+    """Returns the configuration options split expected values depend on:
+       (maximum hands, aces may be resplit, split aces may be hit,
+        double after split, totals allowed for double or None if unrestricted,
+        surrender ratio or None, split ratio, pairs split by rank)"""
+    maxSplits = cfg['RESPLIT_UP_TO']
+    totals = cfg['TOTALS_ALLOWED_FOR_DOUBLE']
+    return (None if maxSplits == Config.UNRESTRICTED else maxSplits + 1,
+            cfg['RESPLIT_ACES'],
+            cfg['HIT_SPLIT_ACES'],
+            cfg['DOUBLE_AFTER_SPLIT_ALLOWED'],
+            None if totals == Config.UNRESTRICTED else tuple(totals),
+            cfg['LATE_SURRENDER_RATIO'] if cfg['LATE_SURRENDER'] else None,
+            cfg['SPLIT_RATIO'],
+            not cfg['SPLIT_BY_VALUE'])
+
+def _pairCount(pair, composition, splitRules):
+    """Returns expected number of cards in composition pairing with pair,
+       ten-valued cards split by rank pair with a quarter of the tens"""
+    if pair == TEN and splitRules[-1]:
+        return composition[TEN] / 4
+    return composition[pair]
+
+def _splitHandEV(pair, second, composition, dealer, dealerComposition,
+                 rules, splitRules):
+    """Returns EV of split hand of pair and second that may not be split,
+       played optimally drawing from composition"""
+    _, _, hitAces, das, totals, surrender, _, _ = splitRules
+    bj = rules[0]
+    hard = hardValue(pair) + hardValue(second)
+    hasAce = pair == ACE or second == ACE
+    value = handValue(hard, hasAce, bj)
+    ev = _standEV(value, composition, dealer, dealerComposition, rules)
+    if value == bj or (pair == ACE and not hitAces):
+        return ev
+    ev = max(ev, _hitEV(hard, hasAce, composition, dealer,
+                        dealerComposition, rules))
+    if das and (totals is None or value in totals):
+        ev = max(ev, _doubleEV(hard, hasAce, composition, dealer,
+                               dealerComposition, rules))
+    if surrender is not None:
+        ev = max(ev, -surrender)
+    return ev
+
+@lru_cache(maxsize=None)
+def _splitHands(pair, composition, dealer, dealerComposition, rules, splitRules):
+    """Returns (probability of drawing another card of the pair,
+                EV of a split hand drawing any other card,
+                EV of a split hand drawing the pair that may not be resplit)
+       for split hands drawing their second card from composition"""
+    total = sum(composition)
+    paired = _pairCount(pair, composition, splitRules)
+    other = 0.0
+    comp = list(composition)
+    for i, count in enumerate(composition):
+        if i == pair:
+            count -= paired
+        if count <= 0:
+            continue
+        comp[i] -= 1
+        other += count * _splitHandEV(pair, i, tuple(comp), dealer,
+                                      dealerComposition, rules, splitRules)
+        comp[i] += 1
+    if total > paired:
+        other /= total - paired
+    same = 0.0
+    if paired > 0:
+        same = _splitHandEV(pair, pair, removeCards(composition, pair), dealer,
+                            dealerComposition, rules, splitRules)
+    return paired / total, other, same
+
+def _splitEV(pair, composition, dealer, dealerComposition, rules, splitRules):
+    """Returns EV per original bet of splitting pair drawing from composition,
+       then either resplitting whenever allowed or never, whichever is best"""
+    maxHands, resplitAces = splitRules[:2]
+    ev = _resplitEV(pair, 2, composition, dealer, dealerComposition,
+                    rules, splitRules)
+    if (maxHands is None or maxHands > 2) and (pair != ACE or resplitAces):
+        ev = max(ev, _resplitEV(pair, maxHands, composition, dealer,
+                                dealerComposition, rules, splitRules))
+    return ev
+
+def _resplitEV(pair, maxHands, composition, dealer, dealerComposition,
+               rules, splitRules):
+    """Returns EV per original bet of splitting pair drawing from composition,
+       then resplitting whenever fewer than maxHands (None if unlimited)"""
+    ratio = splitRules[6]
+    # States keyed by (hands, hands awaiting their second card,
+    # cards of the pair drawn) mapping to (probability, probability weighted
+    # sum of EVs of the hands done). Every transition draws one card, so
+    # states are advanced one draw at a time
+    states = {(2, 2, 0): (1.0, 0.0)}
+    ev = 0.0
+    while states:
+        following = {}
+
+        def advance(key, prob, evSum):
+            """Adds probability prob and weighted EVs evSum to state key"""
+            q, s = following.get(key, (0.0, 0.0))
+            following[key] = (q + prob, s + evSum)
+
+        for (hands, awaiting, drawn), (prob, evSum) in states.items():
+            if awaiting == 0:
+                ev += evSum / hands * (1 + (hands - 1) * ratio)
+                continue
+            comp = composition
+            for _ in range(drawn):
+                comp = removeCards(comp, pair)
+            pPair, other, same = _splitHands(pair, comp, dealer,
+                                             dealerComposition, rules,
+                                             splitRules)
+            if pPair > 0:
+                if maxHands is None or hands < maxHands:
+                    advance((hands + 1, awaiting + 1, drawn + 1),
+                            prob * pPair, evSum * pPair)
+                else:
+                    advance((hands, awaiting - 1, drawn + 1),
+                            prob * pPair, (evSum + prob * same) * pPair)
+            if pPair < 1:
+                advance((hands, awaiting - 1, drawn),
+                        prob * (1 - pPair), (evSum + prob * other) * (1 - pPair))
+        states = following
+    return ev
+
+def availableCommands(hand):
+    """Returns commands available on hand under the current configuration,
+       assuming the player can afford them"""
+    if hand.value >= cfg['BLACKJACK_VALUE']:
+        return [Command.STAND]
+    commands = [Command.HIT, Command.STAND]
+    if hand.numCards == 2:
+        range_ = cfg['TOTALS_ALLOWED_FOR_DOUBLE']
+        if ((range_ == Config.UNRESTRICTED or hand.value in range_) and
+                (not hand.wasSplit or cfg['DOUBLE_AFTER_SPLIT_ALLOWED'])):
+            commands.append(Command.DOUBLE)
+        if cfg['LATE_SURRENDER']:
+            commands.append(Command.SURRENDER)
+    return commands
+
+def canSplit(hand):
+    """Returns True iff hand may be split under the current configuration,
+       assuming the player can afford it"""
+    if not hand.isPair or cfg['RESPLIT_UP_TO'] == 0:
+        return False
+    return not (hand.wasSplit and hand.isAcePair and not cfg['RESPLIT_ACES'])
+
+def handComposition(hand, upcard, composition=None):
+    """Returns composition remaining after hand and upcard are dealt,
+       composition being the shoe before they were (a full shoe by default)"""
+    if composition is None:
+        composition = fullComposition()
+    return removeCards(composition, valueIndex(upcard),
+                       *(valueIndex(c) for c in hand.cards))
+
+def expectedValues(hand, upcard, composition=None, exact=False):
+    """Returns dict mapping each command available on hand to its EV.
+       composition counts the cards remaining in the shoe, i.e. excluding
+       hand and upcard (the rest of a full shoe by default).
+       The player's draws always depend on composition; the dealer's outcomes
+       are computed once from composition unless exact, in which case they
+       are recomputed without the cards of every final player hand (slower).
+       The player's draws are not conditioned on the dealer's hole card"""
+    if hand.isBust:
+        raise ValueError('Hand %s is bust' % hand)
+    if composition is None:
+        composition = handComposition(hand, upcard)
+    composition = tuple(composition)
+    rules_ = rules()
+    up = valueIndex(upcard)
+    dealer = (hardValue(up), up == ACE, 1)
+    dealerComp = None if exact else composition
+    hard = hand.hardValue
+    hasAce = hand.hasAce
+    evs = {}
+    for cmd in availableCommands(hand):
+        if cmd == Command.STAND:
+            evs[cmd] = _standEV(hand.value, composition, dealer,
+                                dealerComp, rules_)
+        elif cmd == Command.HIT:
+            evs[cmd] = _hitEV(hard, hasAce, composition, dealer,
+                              dealerComp, rules_)
+        elif cmd == Command.DOUBLE:
+            evs[cmd] = _doubleEV(hard, hasAce, composition, dealer,
+                                 dealerComp, rules_)
+        elif cmd == Command.SURRENDER:
+            evs[cmd] = -cfg['LATE_SURRENDER_RATIO']
+    if canSplit(hand):
+        evs[Command.SPLIT] = _splitEV(valueIndex(hand.cards[0]), composition,
+                                      dealer, dealerComp, rules_, splitRules())
+    return evs
+
+def splitEV(pair, upcard, composition=None, exact=False):
+    """Returns EV per original bet of splitting a pair of pair (a Card or
+       a value in BlackjackHand.VALUES) against upcard, then resplitting
+       whenever allowed and playing each hand optimally.
+       composition excludes the pair and upcard as in expectedValues"""
+    index = valueIndex(pair)
+    up = valueIndex(upcard)
+    if composition is None:
+        composition = removeCards(fullComposition(), up, index, index)
+    return _splitEV(index, tuple(composition), (hardValue(up), up == ACE, 1),
+                    None if exact else tuple(composition), rules(), splitRules())
+
+def bestCommand(evs):
+    """Returns command of greatest EV in dict evs"""
+    return max(evs, key=evs.get)
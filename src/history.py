@@ -0,0 +1,542 @@
+"""
+Provides a compact binary hand history and a memory-mapped reader
+
+A history file is a short header followed by fixed-layout records, one per
+player hand played, of RECORD's dtype. Cards are stored as their codes
+(see Card.fromCode, the rank index is code >> 2) and decisions as Command
+ints. The reader maps the file and views it as a NumPy structured array
+without copying, so histories larger than memory can be scanned.
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from cards import Card
+from commands import Command
+from config import cfg
+from view import NullView
+
+MAGIC = b'BJHIST\x00\x01'
+HEADER = struct.Struct('<8sII')
+
+# Cards and decisions kept per hand, longer hands keep their first ones
+MAX_CARDS = 12
+MAX_ACTIONS = 8
+
+# Records read at a time scanning a column
+CHUNK_RECORDS = 1 << 16
+
+class Flag:
+    """Bits of a record's flags"""
+
+    NATURAL = 1
+    BUST = 2
+    DOUBLED = 4
+    SPLIT = 8
+    SURRENDERED = 16
+    INSURED = 32
+    SOFT = 64
+    DEALER_BLACKJACK = 128
+
+RECORD = np.dtype([
+    ('round',        '<u4'),
+    ('seat',         'i1'),
+    # Index of hand among those split from the seat's first hand
+    ('hand',         'u1'),
+    ('upcard',       'u1'),
+    ('dealer_total', 'u1'),
+    ('total',        'u1'),
+    ('flags',        'u1'),
+    # Numbers of cards and decisions, which may exceed those kept
+    ('num_cards',    'u1'),
+    ('num_actions',  'u1'),
+    ('cards',        'u1', (MAX_CARDS,)),
+    ('actions',      'u1', (MAX_ACTIONS,)),
+    ('bet',          '<u4'),
+    # Amount won (negative if lost) settling hand, and insurance won
+    # (negative if its stake was lost)
+    ('result',       '<f4'),
+    ('insurance',    '<f4'),
+    # True count before the round was dealt, NaN if not counted
+    ('true_count',   '<f4'),
+])
+
+class HandClass:
+    """Kinds of hand a decision is taken on"""
+
+    HARD = 0
+    SOFT = 1
+    PAIR = 2
+
+# Blackjack value of each rank index, counting aces as one
+_HARD_VALUES = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 1], dtype=np.int16)
+# Index in BlackjackHand.VALUES of each rank index
+_VALUE_INDEX = np.array([0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 8, 8, 9], dtype=np.int16)
+
+# Count buckets range over -COUNT_BUCKETS..COUNT_BUCKETS, NO_COUNT if not counted
+COUNT_BUCKETS = 20
+NO_COUNT = -128
+
+def cardsOf(record):
+    """Returns list of cards kept by record"""
+    return [Card.fromCode(int(code))
+            for code in record['cards'][:min(record['num_cards'], MAX_CARDS)]]
+
+def actionsOf(record):
+    """Returns list of Command ints kept by record"""
+    return record['actions'][:min(record['num_actions'], MAX_ACTIONS)].tolist()
+
+def indexFilename(filename):
+    """Returns name of the index of history file filename"""
+    return filename + '.idx.npz'
+
+def decisionKeys(records, bucket_width=1):
+    """Returns (keys, rows, steps) of every decision kept by array of records:
+       the decision's key (see HistoryIndex.key), the record taking it and
+       its position among the record's decisions. A decision's hand is the
+       record's first two cards and those drawn by earlier decisions, a split
+       being taken on a pair of the record's first card. Two cards are a pair
+       if their ranks match, or their values if SPLIT_BY_VALUE"""
+    n = len(records)
+    ranks = records['cards'].astype(np.int16) >> 2
+    hard = np.cumsum(_HARD_VALUES[ranks], axis=1)
+    aces = np.cumsum(ranks == len(Card.ranks) - 1, axis=1)
+    actions = records['actions']
+    taken = np.minimum(records['num_actions'], MAX_ACTIONS)
+    kept = np.minimum(records['num_cards'], MAX_CARDS)
+    first = ranks[:, 0]
+    if cfg['SPLIT_BY_VALUE']:
+        pairs = _VALUE_INDEX[first] == _VALUE_INDEX[ranks[:, 1]]
+    else:
+        pairs = first == ranks[:, 1]
+    upcards = _VALUE_INDEX[records['upcard'] >> 2]
+    counts = records['true_count']
+    buckets = np.full(n, NO_COUNT, dtype=np.int16)
+    counted = ~np.isnan(counts)
+    buckets[counted] = np.clip(np.floor(counts[counted] / bucket_width),
+                               -COUNT_BUCKETS, COUNT_BUCKETS)
+    drawn = np.zeros(n, dtype=np.int16)
+    keys = []
+    rows = []
+    steps = []
+    for j in range(MAX_ACTIONS):
+        size = 2 + drawn
+        valid = (j < taken) & (size <= kept)
+        if not valid.any():
+            break
+        command = actions[:, j].astype(np.int16)
+        size = np.minimum(size, MAX_CARDS)
+        total = hard[np.arange(n), size - 1]
+        soft = ((aces[np.arange(n), size - 1] > 0) &
+                (total + 10 <= cfg['BLACKJACK_VALUE']))
+        total = np.where(soft, total + 10, total)
+        cls = np.where(soft, HandClass.SOFT, HandClass.HARD)
+        cls = np.where(pairs & (size == 2), HandClass.PAIR, cls)
+        split = command == Command.SPLIT
+        pairTotal = 2 * _HARD_VALUES[first]
+        pairSoft = first == len(Card.ranks) - 1
+        total = np.where(split, np.where(pairSoft, pairTotal + 10, pairTotal), total)
+        cls = np.where(split, HandClass.PAIR, cls)
+        key = HistoryIndex.key(cls, total, upcards, command, buckets)
+        keys.append(key[valid])
+        rows.append(np.nonzero(valid)[0])
+        steps.append(np.full(valid.sum(), j, dtype=np.uint8))
+        drawn += (command == Command.HIT) | (command == Command.DOUBLE)
+    if not keys:
+        return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                np.zeros(0, dtype=np.uint8))
+    return np.concatenate(keys), np.concatenate(rows), np.concatenate(steps)
+
+def _splitBlocks(splits):
+    """Returns, for the hands of a seat's round in order, each taking
+       splits[i] splits, the sizes of the blocks of hands each split of
+       hand i produced, latest split first as the table inserts them"""
+    blocks = [[] for _ in splits]
+
+    def parse(i):
+        """Returns number of hands from hand i and its splits"""
+        j = i + 1
+        for _ in range(splits[i]):
+            if j >= len(splits):
+                break
+            size = parse(j)
+            blocks[i].append(size)
+            j += size
+        return j - i
+
+    i = 0
+    while i < len(splits):
+        i += parse(i)
+    return blocks
+
+def decisionResults(records, rows, steps):
+    """Returns result (with insurance) of each decision taken by
+       records[rows] at steps (as returned by decisionKeys). A split's
+       result sums the hand taking it and every hand split from it by that
+       split and those following, so it measures the whole split"""
+    won = records['result'].astype(np.float64) + records['insurance']
+    results = won[rows]
+    split = records['actions'][rows, steps] == Command.SPLIT
+    if not split.any():
+        return results
+    group = records['round'].astype(np.int64) * 256 + records['seat'].astype(np.int64)
+    wanted = np.isin(group, np.unique(group[rows[split]]))
+    actions = records['actions']
+    taken = np.minimum(records['num_actions'], MAX_ACTIONS)
+    hands = {}
+    for row in np.nonzero(wanted)[0].tolist():
+        hands.setdefault(group[row], []).append(row)
+    # Result of each split decision by (row, step)
+    sums = {}
+    for members in hands.values():
+        members.sort(key=lambda row: records['hand'][row])
+        splitSteps = [[j for j in range(taken[row])
+                       if actions[row, j] == Command.SPLIT]
+                      for row in members]
+        blocks = _splitBlocks([len(js) for js in splitSteps])
+        for (i, row) in enumerate(members):
+            for (m, step) in enumerate(splitSteps[i]):
+                # This split and later ones produced the first blocks
+                size = 1 + sum(blocks[i][:len(blocks[i]) - m])
+                sums[(row, step)] = won[members[i:i + size]].sum()
+    for k in np.nonzero(split)[0].tolist():
+        results[k] = sums.get((rows[k], steps[k]), results[k])
+    return results
+
+class HistoryIndex:
+    """Index of the decisions of a history by the key (hand class, total,
+       upcard value index, Command, true count bucket), holding the records
+       taking each and the aggregates (count, sums of results and of their
+       squares) of the results of those records"""
+
+    def __init__(self, bucket_width=1):
+        """Initializes members, true counts are bucketed by
+           floor(true count / bucket_width)"""
+        self.bucket_width = bucket_width
+        self._keys = []
+        self._rows = []
+        self._results = []
+        self.keys = None
+        self.offsets = None
+        self.rows = None
+        self.results = None
+        self.count = None
+        self.total = None
+        self.squares = None
+
+    @staticmethod
+    def key(handClass, total, upcard, command, bucket):
+        """Returns integer key (or array of keys) of decision"""
+        return ((((np.asarray(handClass, dtype=np.int64) * 32 + total) * 10
+                  + upcard) * 8 + command) * 256 + (np.asarray(bucket) + 128))
+
+    @staticmethod
+    def unpack(key):
+        """Returns (hand class, total, upcard, command, bucket) of key(s)"""
+        key = np.asarray(key, dtype=np.int64)
+        bucket = key % 256 - 128
+        key = key // 256
+        command = key % 8
+        key = key // 8
+        upcard = key % 10
+        key = key // 10
+        return key // 32, key % 32, upcard, command, bucket
+
+    def add(self, records, start):
+        """Indexes array of records, the first being record start"""
+        keys, rows, steps = decisionKeys(records, self.bucket_width)
+        results = decisionResults(records, rows, steps)
+        self._keys.append(keys)
+        self._rows.append(rows + start)
+        self._results.append(results)
+
+    def build(self):
+        """Sorts indexed decisions by key and computes aggregates"""
+        if not self._keys:
+            return self
+        keys = self._keys
+        rows = self._rows
+        results = self._results
+        if self.keys is not None:
+            keys = [np.repeat(self.keys, self.count)] + keys
+            rows = [self.rows] + rows
+            results = [self.results] + results
+        keys = np.concatenate(keys)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        self.rows = np.concatenate(rows)[order]
+        self.results = np.concatenate(results)[order]
+        self.keys, starts, self.count = np.unique(keys, return_index=True,
+                                                  return_counts=True)
+        self.offsets = np.append(starts, len(keys))
+        if len(keys):
+            self.total = np.add.reduceat(self.results, starts)
+            self.squares = np.add.reduceat(self.results ** 2, starts)
+        else:
+            self.total = np.zeros(0)
+            self.squares = np.zeros(0)
+        self._keys = []
+        self._rows = []
+        self._results = []
+        return self
+
+    def select(self, handClass=None, total=None, upcard=None, command=None,
+               minBucket=None, maxBucket=None):
+        """Returns array of positions in keys of keys matching the given
+           parts, None matching any"""
+        cls, tot, up, cmd, bucket = HistoryIndex.unpack(self.keys)
+        mask = np.ones(len(self.keys), dtype=bool)
+        for (part, value) in ((cls, handClass), (tot, total),
+                              (up, upcard), (cmd, command)):
+            if value is not None:
+                mask &= part == value
+        if minBucket is not None:
+            mask &= (bucket >= minBucket) & (bucket != NO_COUNT)
+        if maxBucket is not None:
+            mask &= (bucket <= maxBucket) & (bucket != NO_COUNT)
+        return np.nonzero(mask)[0]
+
+    def lookup(self, **parts):
+        """Returns sorted array of the records taking a decision matching
+           parts (as for select)"""
+        matches = self.select(**parts)
+        if len(matches) == 0:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.concatenate([self.rows[self.offsets[i]:self.offsets[i + 1]]
+                               for i in matches])
+        return np.unique(rows)
+
+    def aggregate(self, **parts):
+        """Returns (number, mean result, variance of results) of decisions
+           matching parts (as for select)"""
+        matches = self.select(**parts)
+        n = int(self.count[matches].sum())
+        if n == 0:
+            return 0, 0.0, 0.0
+        mean = float(self.total[matches].sum()) / n
+        variance = max(0.0, float(self.squares[matches].sum()) / n - mean * mean)
+        return n, mean, variance
+
+    def save(self, filename):
+        """Writes index to filename (an .npz file)"""
+        self.build()
+        if self.keys is None:
+            self._keys = [np.zeros(0, dtype=np.int64)]
+            self._rows = [np.zeros(0, dtype=np.int64)]
+            self._results = [np.zeros(0)]
+            self.build()
+        np.savez(filename, bucket_width=self.bucket_width, keys=self.keys,
+                 offsets=self.offsets, rows=self.rows, results=self.results,
+                 count=self.count, total=self.total, squares=self.squares)
+
+    @staticmethod
+    def load(filename):
+        """Returns index read from filename"""
+        with np.load(filename) as data:
+            index = HistoryIndex(float(data['bucket_width']))
+            for name in ('keys', 'offsets', 'rows', 'results',
+                         'count', 'total', 'squares'):
+                setattr(index, name, data[name])
+        return index
+
+class HistoryWriter:
+    """Appends records to a history file, indexing them if index"""
+
+    def __init__(self, filename, buffering=1 << 20, index=False,
+                 bucket_width=1):
+        """Initializes members, writing header of a new file. The index
+           (bucketing true counts by bucket_width) is written alongside
+           the file on close"""
+        self.filename = filename
+        self.file = open(filename, 'wb', buffering=buffering)
+        self.file.write(HEADER.pack(MAGIC, RECORD.itemsize, 0))
+        self.count = 0
+        self.index = HistoryIndex(bucket_width) if index else None
+
+    def write(self, records):
+        """Appends array of records"""
+        records = np.ascontiguousarray(records, dtype=RECORD)
+        self.file.write(records.tobytes())
+        if self.index is not None:
+            self.index.add(records, self.count)
+        self.count += len(records)
+
+    def close(self):
+        """Closes file, writing index"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            if self.index is not None:
+                self.index.save(indexFilename(self.filename))
+
+class History:
+    """Read-only view of a history file as a structured array of records"""
+
+    def __init__(self, filename):
+        """Maps filename, which must hold records of RECORD's layout"""
+        with open(filename, 'rb') as File:
+            header = File.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError('%s is not a hand history' % filename)
+            magic, size, _ = HEADER.unpack(header)
+            if magic != MAGIC or size != RECORD.itemsize:
+                raise ValueError('%s is not a hand history of this version' % filename)
+            File.seek(0, 2)
+            length = File.tell()
+            self.map = None
+            if length > HEADER.size:
+                self.map = mmap.mmap(File.fileno(), 0, access=mmap.ACCESS_READ)
+        count = (length - HEADER.size) // RECORD.itemsize
+        if self.map is None:
+            self.records = np.zeros(0, dtype=RECORD)
+        else:
+            self.records = np.frombuffer(self.map, dtype=RECORD, count=count,
+                                         offset=HEADER.size)
+        self.index = None
+        if os.path.exists(indexFilename(filename)):
+            self.index = HistoryIndex.load(indexFilename(filename))
+
+    def query(self, **parts):
+        """Returns array of the records taking a decision matching parts
+           (as for HistoryIndex.select), found by the history's index"""
+        if self.index is None:
+            raise ValueError('History has no index')
+        return self.records[self.index.lookup(**parts)]
+
+    def chunks(self, field, size=CHUNK_RECORDS):
+        """Yields field of the records size records at a time,
+           each chunk a view of the file"""
+        column = self.records[field]
+        for start in range(0, len(column), size):
+            yield column[start:start + size]
+
+    def __len__(self):
+        """Returns number of records"""
+        return len(self.records)
+
+    def __getitem__(self, key):
+        """Returns record(s) or field key of every record"""
+        return self.records[key]
+
+    def close(self):
+        """Unmaps file, or leaves it to be unmapped once views of its
+           records taken from this history are freed"""
+        self.records = None
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                pass
+            self.map = None
+
+    def __enter__(self):
+        """Returns history"""
+        return self
+
+    def __exit__(self, *_):
+        """Closes history"""
+        self.close()
+
+class HistoryView(NullView):
+    """View recording a record of every player hand to writer (a
+       HistoryWriter), with the true count of counter (a CardCount)
+       if given, flushing every flush rounds"""
+
+    def __init__(self, writer, counter=None, flush=1024):
+        """Initializes members"""
+        self.writer = writer
+        self.counter = counter
+        self.flush = flush
+        self.table = None
+        self.round = 0
+        self.trueCount = np.nan
+        self.actions = {}
+        # Insurance settled by seat, and the dealer's final total
+        self.insurance = {}
+        self.dealerTotal = None
+        # Index in rows of the round's first record
+        self.start = 0
+        self.rows = []
+
+    def beginRound(self, table):
+        """Records table and count before the deal"""
+        self.table = table
+        self.actions = {}
+        self.insurance = {}
+        self.dealerTotal = None
+        self.start = len(self.rows)
+        if self.counter is not None:
+            self.trueCount = self.counter.trueCount()
+
+    def decision(self, slot, upcard, availableCommands, command):
+        """Records player's decision"""
+        if not slot.player.isDealer:
+            key = (self.table.slots.index(slot), slot.index)
+            self.actions.setdefault(key, []).append(command)
+
+    def settle(self, slot, amount):
+        """Records hand settled"""
+        seat = self.table.slots.index(slot)
+        hand = slot.hand
+        dealer = self.table.dealer_slot.hand
+        actions = self.actions.get((seat, slot.index), [])
+        flags = 0
+        if hand.isNaturalBlackjack and not hand.wasSplit:
+            flags |= Flag.NATURAL
+        if hand.isBust:
+            flags |= Flag.BUST
+        if actions and actions[-1] == Command.DOUBLE:
+            flags |= Flag.DOUBLED
+        if hand.wasSplit:
+            flags |= Flag.SPLIT
+        if slot.surrendered or (actions and actions[-1] == Command.SURRENDER):
+            flags |= Flag.SURRENDERED
+        if hand.isSoft:
+            flags |= Flag.SOFT
+        if dealer.isNaturalBlackjack:
+            flags |= Flag.DEALER_BLACKJACK
+        codes = [c.code for c in hand.cards]
+        self.rows.append((self.round, seat, slot.index,
+                          dealer.cards[1].code, min(dealer.value, 255),
+                          min(hand.value, 255), flags,
+                          len(codes), len(actions),
+                          (codes + [0] * MAX_CARDS)[:MAX_CARDS],
+                          (actions + [0] * MAX_ACTIONS)[:MAX_ACTIONS],
+                          slot.pot - amount, amount, 0, self.trueCount))
+
+    def insured(self, slot, amount):
+        """Records insurance won (negative if lost) for slot's first hand"""
+        self.insurance[self.table.slots.index(slot)] = amount
+
+    def endTurn(self, slot):
+        """Records dealer's final total"""
+        if slot.player.isDealer:
+            self.dealerTotal = min(slot.hand.value, 255)
+
+    def endRound(self, table):
+        """Completes the round's records with the dealer's final total and
+           insurance, which may be known only after hands settle, and counts
+           round, writing records every flush rounds"""
+        if self.dealerTotal is not None or self.insurance:
+            for row in range(self.start, len(self.rows)):
+                record = list(self.rows[row])
+                if self.dealerTotal is not None:
+                    record[4] = self.dealerTotal
+                if record[2] == 0 and record[1] in self.insurance:
+                    record[6] |= Flag.INSURED
+                    record[13] = self.insurance[record[1]]
+                self.rows[row] = tuple(record)
+        self.round += 1
+        if self.round % self.flush == 0:
+            self.close(False)
+
+    def close(self, closeWriter=True):
+        """Writes recorded hands, closing writer if closeWriter"""
+        if self.rows:
+            self.writer.write(np.array(self.rows, dtype=RECORD))
+            self.rows = []
+        if closeWriter:
+            self.writer.close()
@@ -0,0 +1,231 @@
+"""
+Provides a vectorized engine playing many bot-only tables in lockstep
+
+Supported rules are the subset bots use on a single seat: one player per
+table betting the minimum, basic strategy without splitting (pairs are
+played by their total), insurance declined and no early surrender.
+"""
+
+from itertools import combinations_with_replacement
+
+import numpy as np
+
+from cards import (BlackjackHand, Card, cut_index)
+from commands import Command
+from config import (cfg, Config)
+import rng
+from simulation import SimulationResult
+
+# Blackjack value of each rank index in Card.ranks, counting aces as one
+HARD_VALUES = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 1], dtype=np.int8)
+# Column of each rank index in BlackjackHand.VALUES
+VALUE_INDEX = np.array([0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 8, 8, 9], dtype=np.int8)
+ACE = len(Card.ranks) - 1
+MAX_TOTAL = 32
+
+def firstActionCommands(hand):
+    """Returns commands available to bot on first action on hand"""
+    commands = [Command.HIT, Command.STAND]
+    range_ = cfg['TOTALS_ALLOWED_FOR_DOUBLE']
+    if range_ == Config.UNRESTRICTED or hand.value in range_:
+        commands.append(Command.DOUBLE)
+    if cfg['LATE_SURRENDER']:
+        commands.append(Command.SURRENDER)
+    return commands
+
+def representativeHand(total, soft):
+    """Returns hand of three or more cards with value total and softness soft,
+       or None if there is no such hand"""
+    for n in (3, 4):
+        for ranks in combinations_with_replacement(Card.ranks, n):
+            hand = BlackjackHand()
+            hand.addCards(*(Card(r, 'S') for r in ranks))
+            if hand.value == total and hand.isSoft == soft:
+                return hand
+    return None
+
+class CompiledStrategy:
+    """StrategyChart flattened into lookup tables of Command codes"""
+
+    def __init__(self, chart):
+        """Compiles chart under the current configuration"""
+        nranks = len(Card.ranks)
+        nups = len(BlackjackHand.VALUES)
+        self.first = np.full((nranks, nranks, nups), Command.STAND, dtype=np.int8)
+        self.later = np.full((2, MAX_TOTAL, nups), Command.STAND, dtype=np.int8)
+        laterHands = [(soft, total, representativeHand(total, soft))
+                      for soft in (False, True)
+                      for total in range(4, cfg['BLACKJACK_VALUE'])]
+        for up, upvalue in enumerate(BlackjackHand.VALUES):
+            for r1 in range(nranks):
+                for r2 in range(nranks):
+                    hand = BlackjackHand()
+                    hand.addCards(Card(Card.ranks[r1], 'S'),
+                                  Card(Card.ranks[r2], 'H'))
+                    if hand.isBlackjackValued:
+                        continue
+                    commands = firstActionCommands(hand)
+                    self.first[r1, r2, up] = self._advise(chart, hand,
+                                                          upvalue, commands)
+            for soft, total, hand in laterHands:
+                if hand is not None:
+                    self.later[int(soft), total, up] = self._advise(
+                        chart, hand, upvalue, [Command.HIT, Command.STAND])
+
+    @staticmethod
+    def _advise(chart, hand, upvalue, commands):
+        """Returns chart's advice, which must be among commands"""
+        advice = chart.advise(hand, upvalue, commands)
+        if advice not in commands:
+            raise ValueError('Chart advises unavailable %s for %s vs %s' %
+                             (advice, hand, upvalue))
+        return advice
+
+class LockstepEngine:
+    """Plays rounds on many single-seat tables at once,
+       holding each table's state in parallel NumPy arrays"""
+
+    def __init__(self, chart, num_tables, seed=None):
+        """Initializes num_tables freshly shuffled shoes shuffled from the
+           stream of seed (the master seed by default),
+           bots follow StrategyChart chart"""
+        self.strategy = CompiledStrategy(chart)
+        self.num_tables = num_tables
+        if seed is None:
+            seed = rng.root().entropy
+        self.rng = rng.SeedSequence(seed).generator()
+        self.cutIndex = cut_index(cfg['NUM_DECKS'], cfg['CUT_INDEX'])
+        self.deck = np.tile(np.repeat(np.arange(len(Card.ranks), dtype=np.int8),
+                                      len(Card.suits)),
+                            cfg['NUM_DECKS'])
+        self.shoes = np.empty((num_tables, len(self.deck)), dtype=np.int8)
+        self.positions = np.zeros(num_tables, dtype=np.intp)
+        self.rows = np.arange(num_tables)
+        self.shuffle(self.rows)
+        self.result = SimulationResult(seed)
+        self.lastNet = None
+
+    def shuffle(self, rows):
+        """Shuffles shoes of tables at rows and burns their first cards"""
+        self.shoes[rows] = self.rng.permuted(
+            np.broadcast_to(self.deck, (len(rows), len(self.deck))), axis=1)
+        self.positions[rows] = cfg['NUM_CARDS_BURN_ON_SHUFFLE']
+
+    def loadShoe(self, table, ranks, position):
+        """Sets table's shoe to rank indices ranks, next dealing at position"""
+        self.shoes[table] = ranks
+        self.positions[table] = position
+
+    def draw(self, rows):
+        """Deals next card to tables at rows, Returns their rank indices"""
+        positions = self.positions[rows]
+        cards = self.shoes[rows, positions]
+        self.positions[rows] = positions + 1
+        return cards
+
+    def play(self, num_rounds):
+        """Plays num_rounds on every table, Returns SimulationResult"""
+        for _ in range(num_rounds):
+            self.playRound()
+        return self.result
+
+    def playRound(self):
+        """Plays one round on every table"""
+        bj = cfg['BLACKJACK_VALUE']
+        bet = cfg['MINIMUM_BET']
+        result = self.result
+        rows = self.rows
+        exhausted = np.flatnonzero(self.positions >= self.cutIndex)
+        if len(exhausted) > 0:
+            self.shuffle(exhausted)
+
+        c1 = self.draw(rows)
+        hole = self.draw(rows)
+        c2 = self.draw(rows)
+        up = self.draw(rows)
+        upIndex = VALUE_INDEX[up]
+
+        hard = HARD_VALUES[c1].astype(np.int16) + HARD_VALUES[c2]
+        aces = (c1 == ACE) | (c2 == ACE)
+        dhard = HARD_VALUES[hole].astype(np.int16) + HARD_VALUES[up]
+        daces = (hole == ACE) | (up == ACE)
+
+        def total(hard, aces):
+            """Returns best totals of hands"""
+            return np.where(aces & (hard + 10 <= bj), hard + 10, hard)
+
+        playerNatural = total(hard, aces) == bj
+        dealerNatural = total(dhard, daces) == bj
+        net = np.zeros(self.num_tables, dtype=np.int64)
+        net[dealerNatural & ~playerNatural] = -bet
+        net[playerNatural & ~dealerNatural] = int(bet * cfg['BLACKJACK_PAYOUT_RATIO'])
+        result.blackjacks += int(np.count_nonzero(playerNatural & ~dealerNatural))
+
+        pots = np.full(self.num_tables, bet, dtype=np.int64)
+        settled = dealerNatural | playerNatural
+        acting = ~settled
+
+        # First action
+        decision = self.strategy.first[c1, c2, upIndex]
+        decision[~acting] = 0
+        for cmd in (Command.HIT, Command.STAND, Command.DOUBLE, Command.SURRENDER):
+            result.decisions[cmd] += int(np.count_nonzero(decision == cmd))
+        surrender = decision == Command.SURRENDER
+        net[surrender] = -int(bet * cfg['LATE_SURRENDER_RATIO'])
+        settled |= surrender
+        double = decision == Command.DOUBLE
+        pots[double] += int(bet * cfg['DOUBLE_RATIO'])
+        hitting = (decision == Command.HIT) | double
+        acting = decision == Command.HIT
+
+        while True:
+            drawing = np.flatnonzero(hitting)
+            if len(drawing) == 0:
+                break
+            card = self.draw(drawing)
+            hard[drawing] += HARD_VALUES[card]
+            aces[drawing] |= card == ACE
+            value = total(hard, aces)
+            bust = hitting & (value > bj)
+            net[bust] = -pots[bust]
+            settled |= bust
+            acting &= ~bust & (value != bj)
+            soft = aces & (hard + 10 <= bj)
+            decision = self.strategy.later[soft.astype(np.intp),
+                                           np.minimum(value, MAX_TOTAL - 1),
+                                           upIndex]
+            decision[~acting] = 0
+            for cmd in (Command.HIT, Command.STAND):
+                result.decisions[cmd] += int(np.count_nonzero(decision == cmd))
+            hitting = decision == Command.HIT
+            acting = hitting
+
+        # Dealer acts unless the round ended on a natural
+        dealing = ~(dealerNatural | playerNatural)
+        h17 = cfg['DEALER_HITS_ON_SOFT_17']
+        while True:
+            value = total(dhard, daces)
+            soft = daces & (dhard + 10 <= bj)
+            hits = dealing & ((value < 17) | (h17 & soft & (value == 17)))
+            drawing = np.flatnonzero(hits)
+            if len(drawing) == 0:
+                break
+            card = self.draw(drawing)
+            dhard[drawing] += HARD_VALUES[card]
+            daces[drawing] |= card == ACE
+
+        pvalue = total(hard, aces)
+        dvalue = total(dhard, daces)
+        open_ = ~settled
+        win = open_ & ((pvalue > dvalue) | (dvalue > bj))
+        lose = open_ & ~win & (pvalue < dvalue)
+        net[win] = np.floor(pots[win] * cfg['PAYOUT_RATIO']).astype(np.int64)
+        net[lose] = -pots[lose]
+
+        result.rounds += self.num_tables
+        result.hands += self.num_tables
+        result.wins += int(np.count_nonzero(net > 0))
+        result.losses += int(np.count_nonzero(net < 0))
+        result.pushes += int(np.count_nonzero(net == 0))
+        result.net += int(net.sum())
+        self.lastNet = net
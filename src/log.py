@@ -1,15 +1,242 @@
 """
 Provide simple logging mechanism
+
+logger logs at levels round, hand, decision and debug, each level a method
+taking a format string and its arguments. Arguments are only formatted if
+the level is enabled (LOG_LEVEL and those before it), and a disabled level
+is bound to a function doing nothing, so it costs a call. Hot paths skip
+even that, and building the arguments, by testing the level's Enabled
+attribute (e.g. logger.handEnabled) first.
+
+Messages are queued in memory and written by a background thread, so
+logging a message costs an append rather than an open, write and close.
+Each process writes its own file, the main process FNAME and any other
+process FNAME with its pid before the extension. A file growing past
+LOG_MAX_BYTES is rotated to FNAME.1 through FNAME.LOG_BACKUPS, gzipped
+if LOG_COMPRESS.
 """
 
+from collections import deque
+import atexit
+import gzip
+import multiprocessing
+from multiprocessing import util
 import os
+import shutil
+import threading
+
+from config import (cfg, Config)
 
 FNAME = 'log.txt'
 
-if os.path.exists(FNAME):
+# Seconds the background thread waits between writes
+FLUSH_INTERVAL = 0.5
+
+# Queued messages waking the background thread before FLUSH_INTERVAL
+FLUSH_MESSAGES = 10000
+
+_MAIN_PID = os.getpid()
+
+def _isMainProcess():
+    """Returns True iff this is the process that started the program"""
+    return (multiprocessing.parent_process() is None and
+            os.getpid() == _MAIN_PID)
+
+if _isMainProcess() and os.path.exists(FNAME):
     os.remove(FNAME)
 
+def logFilename():
+    """Returns name of this process's log file"""
+    if _isMainProcess():
+        return FNAME
+    root, ext = os.path.splitext(FNAME)
+    return '%s.%d%s' % (root, os.getpid(), ext)
+
+class LogWriter:
+    """Log file written from a queue of messages by a background thread"""
+
+    # Files this process has written, appended to if written again
+    _opened = set()
+
+    def __init__(self, filename, max_bytes=0, backups=0, compress=False,
+                 interval=FLUSH_INTERVAL):
+        """Initializes members, filename is rotated once it holds max_bytes
+           (never if 0), keeping backups rotated files, gzipped if compress.
+           Queued messages are written every interval seconds"""
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.interval = interval
+        self.queue = deque()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.file = None
+        self.size = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True,
+                                       name='LogWriter')
+        self.thread.start()
+
+    def write(self, msg):
+        """Queues msg to be written"""
+        queue = self.queue
+        queue.append(msg)
+        if len(queue) >= FLUSH_MESSAGES:
+            self.wakeup.set()
+
+    def flush(self):
+        """Writes every queued message"""
+        with self.lock:
+            self._drain()
+
+    def close(self):
+        """Writes every queued message, stops thread and closes file"""
+        if self.closed:
+            return
+        self.closed = True
+        self.wakeup.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+        with self.lock:
+            self._drain()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def _run(self):
+        """Writes queued messages until closed"""
+        while not self.closed:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def _drain(self):
+        """Writes queued messages, lock must be held"""
+        queue = self.queue
+        n = len(queue)
+        if n == 0:
+            return
+        text = ''.join([queue.popleft() for _ in range(n)])
+        if self.file is None:
+            mode = 'a' if self.filename in LogWriter._opened else 'w'
+            LogWriter._opened.add(self.filename)
+            self.file = open(self.filename, mode)
+            self.size = self.file.tell()
+        self.file.write(text)
+        self.file.flush()
+        self.size += len(text)
+        if self.max_bytes and self.size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """Moves full file to first backup, shifting older backups"""
+        self.file.close()
+        self.file = None
+        ext = '.gz' if self.compress else ''
+        for i in range(self.backups - 1, 0, -1):
+            older = '%s.%d%s' % (self.filename, i, ext)
+            if os.path.exists(older):
+                os.replace(older, '%s.%d%s' % (self.filename, i + 1, ext))
+        if self.backups == 0:
+            os.remove(self.filename)
+        elif self.compress:
+            with open(self.filename, 'rb') as src:
+                with gzip.open(self.filename + '.1.gz', 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+            os.remove(self.filename)
+        else:
+            os.replace(self.filename, self.filename + '.1')
+
+_writer = None
+
+def _open():
+    """Returns this process's writer, starting it if need be"""
+    global _writer
+    if _writer is None:
+        _writer = LogWriter(logFilename(),
+                            cfg['LOG_MAX_BYTES'],
+                            cfg['LOG_BACKUPS'],
+                            cfg['LOG_COMPRESS'])
+        if not _isMainProcess():
+            # Worker processes exit without running atexit handlers
+            util.Finalize(_writer, _writer.close, exitpriority=10)
+    return _writer
+
 def log(msg):
     """Logs message to log file"""
-    with open('log.txt', 'a') as fp:
-        fp.write(msg)
+    writer = _writer
+    if writer is None:
+        writer = _open()
+    writer.write(msg)
+
+def _emit(fmt, *args):
+    """Logs fmt formatted with args"""
+    log(fmt % args if args else fmt)
+
+def _noop(*_):
+    """Logs nothing"""
+    pass
+
+class Logger:
+    """Leveled log, with a method per level of Config.LOG_LEVELS"""
+
+    def __init__(self, level=None):
+        """Initializes members, enabling levels up to level
+           (LOG_LEVEL by default)"""
+        self.configure(level)
+
+    def configure(self, level=None):
+        """Enables levels up to level (LOG_LEVEL by default),
+           disabling the rest, and sets each level's Enabled attribute"""
+        if level is None:
+            level = cfg['LOG_LEVEL']
+        self.level = level
+        enabled = Config.LOG_LEVELS.index(level)
+        for (i, name) in enumerate(Config.LOG_LEVELS):
+            if i > 0:
+                setattr(self, name, _emit if i <= enabled else _noop)
+                setattr(self, name + 'Enabled', i <= enabled)
+
+    def isEnabled(self, level):
+        """Returns True iff messages at level are logged,
+           never for level off"""
+        if level not in Config.LOG_LEVELS:
+            raise ValueError('Unknown log level %s' % level)
+        return level != 'off' and getattr(self, level + 'Enabled')
+
+# Tables reconfigure logger from LOG_LEVEL as they are built
+logger = Logger('decision')
+
+def flush():
+    """Writes every logged message to log file"""
+    if _writer is not None:
+        _writer.flush()
+
+def shutdown():
+    """Writes every logged message and stops writing"""
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+def _beforeFork():
+    """Writes queued messages and holds writer, so a child copies neither"""
+    if _writer is not None:
+        _writer.lock.acquire()
+        _writer._drain()
+
+def _afterForkInParent():
+    """Releases writer held for fork"""
+    if _writer is not None:
+        _writer.lock.release()
+
+def _afterForkInChild():
+    """Abandons parent's writer, whose thread was not copied"""
+    global _writer
+    _writer = None
+
+atexit.register(shutdown)
+os.register_at_fork(before=_beforeFork,
+                    after_in_parent=_afterForkInParent,
+                    after_in_child=_afterForkInChild)
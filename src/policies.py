@@ -6,8 +6,13 @@ action, betting, and insurance
 from abc import ABCMeta, abstractmethod
 import re
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from commands import Command
-from cards import BlackjackHand
+from cards import (BlackjackHand, Card, ShoeEvent)
 from config import cfg
 
 class DecisionPolicy(metaclass=ABCMeta):
@@ -102,6 +107,8 @@ class StrategyChart:
 # Ds - Double,    stand if not allowed
 # Dh - Double,    hit   if not allowed
 # Su - Surrender, hit   if not allowed
+# Rs - Surrender, stand if not allowed
+# Rp - Surrender, split if not allowed
 
     class Chart:
         """Representation of advice chart"""
@@ -205,6 +212,8 @@ class StrategyChart:
         if player_hand.isPair and self.pair_chart:
             arg = 'A' if player_hand.hasAce else int(value/2)
             advice = self.pair_chart.access(arg, dealer_up_card)
+            if advice == 'Rp' and Command.SURRENDER not in availableCommands:
+                advice = 'Sp'
             if advice == 'Sp' and Command.SPLIT not in availableCommands:
                 # defer iff split advised but unavailable
                 advice = None
@@ -222,28 +231,28 @@ class StrategyChart:
                     return Command.HIT
                 elif advice[1].upper() == 'S':
                     return Command.STAND
-            elif ( advice.upper() == 'SU' and
-                   Command.SURRENDER not in availableCommands):
-                return Command.HIT
+            elif advice.upper() in ('SU', 'RS', 'RP'):
+                if Command.SURRENDER in availableCommands:
+                    return Command.SURRENDER
+                return Command.STAND if advice.upper() == 'RS' else Command.HIT
             return Command.string_to_command[advice.upper()]
         return None
 
-    def toFile(self, filename):
-        """Writes chart(s) to file in parse-expected format"""
-        pass
+    def toFile(self, filename, header=''):
+        """Writes chart(s) to file in parse-expected format,
+           preceded by header, comment lines starting with '#'"""
+        with open(filename, 'w') as File:
+            File.write(header)
+            File.write(repr(self))
 
     def __repr__(self):
-        result = ''
-        if len(self.hard_chart) > 0:
-            result += '> Hard totals' + '\n'
-            result += repr(self.hard_chart)
-        if len(self.soft_chart) > 0:
-            result += '\n\n> Soft totals\n'
-            result += repr(self.soft_chart)
-        if len(self.pair_chart) > 0:
-            result += '\n\n> Pairs\n'
-            result += repr(self.pair_chart)
-        return result
+        sections = []
+        for (title, chart) in (('Hard totals', self.hard_chart),
+                               ('Soft totals', self.soft_chart),
+                               ('Pairs', self.pair_chart)):
+            if chart and len(chart) > 0:
+                sections.append('> %s\n%s' % (title, repr(chart)))
+        return '\n\n'.join(sections)
 
 class BettingPolicy(metaclass=ABCMeta):
     """Base class for betting policies"""
@@ -273,7 +282,10 @@ class MinBettingPolicy(BettingPolicy):
         return cfg['MINIMUM_BET']
 
 class CardCount():
-    """Mechanism for card counting"""
+    """Mechanism for card counting
+
+       Tracks the running counts of selected systems, each weighting the
+       ranks of Card.ranks, as an observer of a shoe"""
 
     systems = {
         'HiLoCount':     [1, 1, 1, 1, 1,   0, 0,  0, -1, -1, -1, -1, -1],
@@ -285,26 +297,137 @@ class CardCount():
         'ZenCount':      [1, 1, 2, 2, 2,   1, 0,  0, -2, -2, -2, -2, -1]
     }
 
-    def __init__(self):
-        """Initializes members"""
+    def __init__(self, *systems, shoe=None, vectorized=False, batched=False):
+        """Initializes members, counting systems (every known system by
+           default), registered with shoe if given. If vectorized, all
+           systems are updated by one NumPy vector add per card. If batched,
+           cards are counted when each round ends rather than as dealt"""
+        if not systems:
+            systems = sorted(CardCount.systems)
+        for name in systems:
+            if name not in CardCount.systems:
+                raise ValueError('Unknown count system %s' % name)
+        self.names = list(systems)
+        self.vectorized = vectorized
+        self.batched = batched
+        if vectorized:
+            if np is None:
+                raise ImportError('Vectorized counting requires numpy')
+            self._matrix = np.array([CardCount.systems[name] for name in systems],
+                                    dtype=float).T
+        else:
+            self._weights = [CardCount.systems[name] for name in systems]
+        self.shoe = None
+        if shoe is not None:
+            self.attach(shoe)
         self.reset()
 
+    @staticmethod
+    def loadSystems(filename):
+        """Registers count systems read from file, Returns their names.
+           Each line holds a name followed by the weights of either every
+           rank 2..A or every value 2..10, A; '#' starts a comment"""
+        names = []
+        with open(filename, 'r') as File:
+            for line in File:
+                toks = re.split(r'[ :|,\t]+', line.split('#')[0].strip())
+                toks = [t for t in toks if len(t) > 0]
+                if not toks:
+                    continue
+                name = toks[0]
+                try:
+                    weights = [float(t) for t in toks[1:]]
+                except ValueError:
+                    raise ValueError('Count system %s has non-numeric weights' % name)
+                weights = [int(w) if w == int(w) else w for w in weights]
+                if len(weights) == len(BlackjackHand.VALUES):
+                    weights = weights[:-1] + weights[-2:-1] * 3 + weights[-1:]
+                if len(weights) != len(Card.ranks):
+                    raise ValueError('Count system %s should weight %d ranks or %d values'
+                                     % (name, len(Card.ranks), len(BlackjackHand.VALUES)))
+                CardCount.systems[name] = weights
+                names.append(name)
+        return names
+
+    def attach(self, shoe):
+        """Registers with shoe, whose remaining cards true counts use"""
+        self.shoe = shoe
+        if self.batched:
+            shoe.subscribe(ShoeEvent.SHUFFLE, self.update)
+            shoe.subscribe(ShoeEvent.ROUND_END, self.updateCards)
+        else:
+            shoe.registerObserver(self)
+
     def reset(self):
-        self.counts = {k : 0 for k in CardCount.systems.keys()}
+        """Resets counts to zero"""
+        if self.vectorized:
+            self._values = np.zeros(len(self.names))
+        else:
+            self._values = [0] * len(self.names)
 
     def update(self, card):
         """Updates count based on card"""
         if card is None:
             self.reset()
+        elif self.vectorized:
+            self._values += self._matrix[card.index]
         else:
-            for k, v in CardCount.systems.items():
-                self.counts[k] += v[card.index]
+            i = card.index
+            values = self._values
+            for j, weights in enumerate(self._weights):
+                values[j] += weights[i]
+
+    def updateCards(self, cards):
+        """Updates count based on list of cards"""
+        if self.vectorized:
+            if cards:
+                self._values += self._matrix[[c.index for c in cards]].sum(axis=0)
+            return
+        values = self._values
+        for j, weights in enumerate(self._weights):
+            values[j] += sum(weights[c.index] for c in cards)
+
+    @property
+    def counts(self):
+        """Returns dict mapping each system counted to its running count"""
+        return {name : self.runningCount(name) for name in self.names}
+
+    @property
+    def count(self):
+        """Returns running count of the first system counted"""
+        return self.runningCount()
+
+    def runningCount(self, system=None):
+        """Returns running count of system (the first system by default)"""
+        j = 0 if system is None else self.names.index(system)
+        value = self._values[j]
+        if self.vectorized:
+            value = float(value)
+            if value == int(value):
+                value = int(value)
+        return value
+
+    def decksRemaining(self, resolution=None):
+        """Returns decks remaining in shoe, estimated to the nearest multiple
+           of resolution decks (TRUE_COUNT_RESOLUTION by default)"""
+        if self.shoe is None:
+            raise ValueError('Counting needs a shoe to estimate decks remaining')
+        if resolution is None:
+            resolution = cfg['TRUE_COUNT_RESOLUTION']
+        decks = self.shoe.numCardsRemainingInShoe / cfg['NUM_CARDS_PER_DECK']
+        return max(resolution, round(decks / resolution) * resolution)
+
+    def trueCount(self, system=None, resolution=None):
+        """Returns running count of system (the first system by default)
+           per estimated deck remaining"""
+        return self.runningCount(system) / self.decksRemaining(resolution)
 
     def __str__(self):
         '''Returns string representation of counts '''
         s = ''
-        for k in sorted(self.counts.keys()):
-            s += '{:<13}    {:<4}\n'.format(k, self.counts[k])
+        counts = self.counts
+        for k in sorted(counts.keys()):
+            s += '{:<13}    {:<4}\n'.format(k, counts[k])
         return s
 
     def __repr__(self):
@@ -0,0 +1,127 @@
+"""
+Provides running counts and remaining compositions of a shuffled shoe
+at every deal index, computed once per shuffle
+
+Once a shoe is shuffled its order is fixed, so the count and the cards left
+after index cards are dealt are prefix sums over the order. Burned cards are
+not counted, as a counter would not see them, and neither is the dealer's
+hole card until the shoe reveals it.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from cards import (Card, ContinuousShuffler)
+from config import cfg
+from policies import CardCount
+
+# Composition column of each rank index in Card.ranks
+_VALUE_COLUMNS = [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 8, 8, 9]
+
+class PrefixTables:
+    """Prefix-sum tables of a shoe's order, rebuilt by the shoe on shuffle"""
+
+    def __init__(self, *systems):
+        """Initializes members for count systems (Hi-Lo by default)"""
+        if np is None:
+            raise ImportError('PrefixTables requires numpy')
+        if not systems:
+            systems = ('HiLoCount',)
+        for name in systems:
+            if name not in CardCount.systems:
+                raise ValueError('Unknown count system %s' % name)
+        self.names = list(systems)
+        self.weights = np.array([CardCount.systems[name] for name in systems],
+                                dtype=float).T
+        # Weight of each rank index by system, to discount the hole card
+        self._weights = [[float(w) if not w.is_integer() else int(w)
+                          for w in column] for column in self.weights.T]
+        self._integral = (self.weights == np.round(self.weights)).all(axis=0)
+        self.shoe = None
+        self.counts = None
+        self.dealt = None
+        self.total = None
+        self._columns = None
+        self._tens = None
+
+    def attach(self, shoe):
+        """Makes shoe rebuild these tables whenever it is shuffled"""
+        if isinstance(shoe, ContinuousShuffler):
+            raise ValueError('A continuous shuffler has no fixed order')
+        self.shoe = shoe
+        shoe.prefix = self
+        self.build(shoe.codes)
+
+    def build(self, codes):
+        """Computes tables of shoe order codes (an array of card codes)"""
+        ranks = np.frombuffer(codes, dtype=np.uint8) >> 2
+        n = len(ranks)
+        weights = self.weights[ranks]
+        weights[:min(cfg['NUM_CARDS_BURN_ON_SHUFFLE'], n)] = 0
+        self.counts = np.zeros((n + 1, len(self.names)))
+        np.cumsum(weights, axis=0, out=self.counts[1:])
+        # Lists index faster than arrays for the single lookups of a round
+        self._columns = [column.astype(int).tolist() if integral
+                         else column.tolist()
+                         for (column, integral) in zip(self.counts.T,
+                                                       self._integral)]
+        onehot = np.zeros((n + 1, len(Card.ranks)), dtype=np.int16)
+        onehot[np.arange(1, n + 1), ranks] = 1
+        self.dealt = np.cumsum(onehot, axis=0, dtype=np.int16)
+        self.total = self.dealt[-1]
+        tens = self.dealt[:, 8:12].sum(axis=1)
+        self._tens = (tens[-1] - tens).tolist()
+
+    def _index(self, index):
+        """Returns index, or the attached shoe's index if None"""
+        return self.shoe.index if index is None else index
+
+    def _hole(self, index):
+        """Returns rank index of the attached shoe's unrevealed hole card
+           if dealt among the first index cards, else None"""
+        shoe = self.shoe
+        if shoe is None or shoe.hole is None or shoe.hole >= index:
+            return None
+        return shoe.codes[shoe.hole] >> 2
+
+    def runningCount(self, system=None, index=None):
+        """Returns count of system (the first by default) once index cards
+           (the attached shoe's index by default) are dealt"""
+        j = 0 if system is None else self.names.index(system)
+        index = self._index(index)
+        count = self._columns[j][index]
+        hole = self._hole(index)
+        if hole is not None:
+            count -= self._weights[j][hole]
+        return count
+
+    def rankCounts(self, index=None):
+        """Returns array counting cards of each rank remaining once index
+           cards (the attached shoe's index by default) are dealt"""
+        index = self._index(index)
+        remaining = self.total - self.dealt[index]
+        hole = self._hole(index)
+        if hole is not None:
+            remaining[hole] += 1
+        return remaining
+
+    def composition(self, index=None):
+        """Returns composition (as in probability) remaining once index
+           cards (the attached shoe's index by default) are dealt"""
+        remaining = self.rankCounts(index)
+        comp = [0] * 10
+        for rank, column in enumerate(_VALUE_COLUMNS):
+            comp[column] += int(remaining[rank])
+        return tuple(comp)
+
+    def tensRemaining(self, index=None):
+        """Returns number of ten-valued cards remaining once index cards
+           (the attached shoe's index by default) are dealt"""
+        index = self._index(index)
+        tens = self._tens[index]
+        hole = self._hole(index)
+        if hole is not None and _VALUE_COLUMNS[hole] == 8:
+            tens += 1
+        return tens
@@ -0,0 +1,117 @@
+"""
+Provides exact probabilities of dealer outcomes by recursion over shoe
+composition
+
+A composition is a tuple counting the cards remaining in the shoe for each
+value of BlackjackHand.VALUES, i.e. (2s, 3s, ..., 9s, ten-valued cards, aces)
+"""
+
+from functools import lru_cache
+
+from cards import (BlackjackHand, Card)
+from config import cfg
+
+ACE = len(BlackjackHand.VALUES) - 1
+TEN = ACE - 1
+DEALER_STANDS_ON = 17
+
+BUST = 'bust'
+NATURAL = 'blackjack'
+
+def fullComposition(numDecks=None):
+    """Returns composition of a full shoe of numDecks (NUM_DECKS by default)"""
+    if numDecks is None:
+        numDecks = cfg['NUM_DECKS']
+    suits = len(Card.suits)
+    comp = [suits * numDecks] * len(BlackjackHand.VALUES)
+    comp[TEN] *= 4
+    return tuple(comp)
+
+def valueIndex(card):
+    """Returns index in a composition of card, a Card or a value in
+       BlackjackHand.VALUES"""
+    if isinstance(card, Card):
+        return card.valueIndex
+    return BlackjackHand.VALUES.index(card)
+
+def compositionOf(cards):
+    """Returns composition of iterable of cards"""
+    comp = [0] * len(BlackjackHand.VALUES)
+    for card in cards:
+        comp[valueIndex(card)] += 1
+    return tuple(comp)
+
+def removeCards(composition, *indices):
+    """Returns composition less one card at each of indices"""
+    comp = list(composition)
+    for i in indices:
+        if comp[i] <= 0:
+            raise ValueError('No %s left to remove' % BlackjackHand.VALUES[i])
+        comp[i] -= 1
+    return tuple(comp)
+
+def hardValue(index):
+    """Returns value of card at composition index, counting aces as one"""
+    return 1 if index == ACE else index + 2
+
+def outcomes():
+    """Returns outcomes of a dealer hand in the order of distributions"""
+    return list(range(DEALER_STANDS_ON, cfg['BLACKJACK_VALUE'] + 1)) + [BUST, NATURAL]
+
+@lru_cache(maxsize=None)
+def dealerOutcomes(hard, hasAce, numCards, composition, bj, hitsSoft17):
+    """Returns distribution (ordered as outcomes()) of dealer hand with
+       hard total, drawing from composition"""
+    soft = hasAce and hard + 10 <= bj
+    value = hard + 10 if soft else hard
+    nstand = bj - DEALER_STANDS_ON + 1
+    if numCards == 2 and value == bj:
+        return (0.0,) * (nstand + 1) + (1.0,)
+    if value > bj:
+        return (0.0,) * nstand + (1.0, 0.0)
+    if value >= bj or (value >= DEALER_STANDS_ON and
+                       not (hitsSoft17 and soft and value == DEALER_STANDS_ON)):
+        dist = [0.0] * (nstand + 2)
+        dist[value - DEALER_STANDS_ON] = 1.0
+        return tuple(dist)
+    total = sum(composition)
+    dist = [0.0] * (nstand + 2)
+    comp = list(composition)
+    for i, count in enumerate(composition):
+        if count == 0:
+            continue
+        comp[i] -= 1
+        sub = dealerOutcomes(hard + hardValue(i), hasAce or i == ACE,
+                             numCards + 1, tuple(comp), bj, hitsSoft17)
+        comp[i] += 1
+        p = count / total
+        for j, q in enumerate(sub):
+            dist[j] += p * q
+    return tuple(dist)
+
+def dealerDistribution(upcard, composition=None, peek=False):
+    """Returns dict mapping each outcome to its probability for a dealer
+       showing upcard and drawing from composition, the cards remaining
+       besides upcard (the rest of a full shoe by default).
+       If peek, probabilities are conditioned on the dealer not having
+       a natural, which is checked before players act"""
+    up = valueIndex(upcard)
+    if composition is None:
+        composition = removeCards(fullComposition(), up)
+    dist = dealerOutcomes(hardValue(up), up == ACE, 1, tuple(composition),
+                          cfg['BLACKJACK_VALUE'], cfg['DEALER_HITS_ON_SOFT_17'])
+    if peek:
+        scale = 1 - dist[-1]
+        dist = [p / scale for p in dist[:-1]] + [0.0]
+    return dict(zip(outcomes(), dist))
+
+def dealerTable(composition=None, peek=False):
+    """Returns dict mapping each upcard value to its dealerDistribution,
+       for a dealer drawing from composition (a full shoe by default)"""
+    if composition is None:
+        composition = fullComposition()
+    return {up : dealerDistribution(up,
+                                    removeCards(composition, valueIndex(up)),
+                                    peek)
+            for up in BlackjackHand.VALUES
+            if composition[valueIndex(up)] > 0}
@@ -0,0 +1,360 @@
+"""
+Provides recording and deterministic replay of play at a table
+
+A Session holds every shoe order dealt, each player's bets, insurance and
+playing decisions, and a checkpoint of the shoe position and stacks at the
+start of each round. Replaying a session deals the recorded orders and
+makes the recorded decisions, so a table reproduces the recorded rounds
+exactly, and can seek to any round from its checkpoint without playing
+the rounds before it. Anything the replayed table does differently from
+the recording is reported as a Divergence.
+"""
+
+from array import array
+from collections import deque
+import pickle
+from time import perf_counter
+
+from cards import (ContinuousShuffler, ShoeEvent)
+from policies import (BettingPolicy, DecisionPolicy, InsurancePolicy)
+
+class Kind:
+    """Kinds of recorded decisions"""
+
+    BET = 1
+    ACTION = 2
+    INSURANCE = 3
+
+    names = {BET : 'bet', ACTION : 'action', INSURANCE : 'insurance'}
+
+def context(hand, upcard=None, availableCommands=None):
+    """Returns what a decision was taken on: codes of hand's cards, code of
+       upcard and tuple of available commands"""
+    return (tuple(c.code for c in hand.cards),
+            None if upcard is None else upcard.code,
+            None if availableCommands is None else tuple(availableCommands))
+
+class Session:
+    """Recorded play at a table"""
+
+    def __init__(self, seats):
+        """Initializes members, seats lists each seat's player name
+           (None if vacant)"""
+        self.seats = list(seats)
+        # Codes of each shoe order dealt, in the order they were shuffled
+        self.orders = []
+        # (order, shoe index, stacks by seat, bank) at each round start
+        self.checkpoints = []
+        # (seat, Kind, value, context) of each round's decisions
+        self.decisions = []
+
+    @property
+    def numRounds(self):
+        """Returns number of rounds recorded"""
+        return len(self.decisions)
+
+    def save(self, filename):
+        """Writes session to filename"""
+        with open(filename, 'wb') as File:
+            pickle.dump(self, File, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(filename):
+        """Returns session read from filename"""
+        with open(filename, 'rb') as File:
+            return pickle.load(File)
+
+def _seats(table):
+    """Returns name of each seat's player at table (None if vacant)"""
+    return [slot.player.name if slot.isOccupied else None
+            for slot in table.slots]
+
+def _checkShoe(table):
+    """Raises ValueError unless table's shoe deals recordable orders"""
+    if isinstance(table.shoe, ContinuousShuffler):
+        raise ValueError('A continuous shuffler deals no order to record')
+
+class RecordingDecisionPolicy(DecisionPolicy):
+    """Decision policy recording the decisions of policy"""
+
+    def __init__(self, policy, recorder, seat):
+        """Initializes members"""
+        self.policy = policy
+        self.recorder = recorder
+        self.seat = seat
+
+    def decide(self, hand, upcard, availableCommands, **kwargs):
+        """Returns and records decision of policy"""
+        command = self.policy.decide(hand, upcard, availableCommands, **kwargs)
+        self.recorder.record(self.seat, Kind.ACTION, command,
+                             context(hand, upcard, availableCommands))
+        return command
+
+class RecordingBettingPolicy(BettingPolicy):
+    """Betting policy recording the bets of policy"""
+
+    def __init__(self, policy, recorder, seat):
+        """Initializes members"""
+        self.policy = policy
+        self.recorder = recorder
+        self.seat = seat
+
+    def bet(self, **kwargs):
+        """Returns and records bet of policy"""
+        amount = self.policy.bet(**kwargs)
+        self.recorder.record(self.seat, Kind.BET, amount, None)
+        return amount
+
+class RecordingInsurancePolicy(InsurancePolicy):
+    """Insurance policy recording the insurance decisions of policy"""
+
+    def __init__(self, policy, recorder, seat):
+        """Initializes members"""
+        self.policy = policy
+        self.recorder = recorder
+        self.seat = seat
+
+    def insure(self, hand, **kwargs):
+        """Returns and records insurance decision of policy"""
+        insured = self.policy.insure(hand, **kwargs)
+        self.recorder.record(self.seat, Kind.INSURANCE, insured, context(hand))
+        return insured
+
+class SessionRecorder:
+    """Records play at table, whose players' policies it wraps"""
+
+    def __init__(self, table):
+        """Initializes members, recording the shoe's current order"""
+        _checkShoe(table)
+        self.table = table
+        self.session = Session(_seats(table))
+        table.shoe.subscribe(ShoeEvent.SHUFFLE, self._shuffled)
+        self._shuffled(None)
+        for (seat, slot) in enumerate(table.slots):
+            if slot.isOccupied:
+                player = slot.player
+                player.decision_policy = RecordingDecisionPolicy(
+                    player.decision_policy, self, seat)
+                player.bet_policy = RecordingBettingPolicy(
+                    player.bet_policy, self, seat)
+                player.insurance_policy = RecordingInsurancePolicy(
+                    player.insurance_policy, self, seat)
+
+    def _shuffled(self, _):
+        """Records order shuffled"""
+        self.session.orders.append(self.table.shoe.codes.tobytes())
+
+    def record(self, seat, kind, value, ctx):
+        """Records decision of the current round"""
+        self.session.decisions[-1].append((seat, kind, value, ctx))
+
+    def play(self, rounds=1):
+        """Plays and records rounds"""
+        table = self.table
+        session = self.session
+        for _ in range(rounds):
+            session.checkpoints.append((len(session.orders) - 1,
+                                        table.shoe.index,
+                                        _stacks(table),
+                                        table.bank.amount))
+            session.decisions.append([])
+            table.play()
+
+def _stacks(table):
+    """Returns tuple of each seat's stack (None if vacant)"""
+    return tuple(slot.player.stack.amount if slot.isOccupied else None
+                 for slot in table.slots)
+
+class Divergence:
+    """Difference between a replayed round and its recording"""
+
+    def __init__(self, round, seat, what, expected, actual):
+        """Initializes members"""
+        self.round = round
+        self.seat = seat
+        self.what = what
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self):
+        """Returns description of divergence"""
+        return 'Round %d seat %s: %s expected %r, got %r' % (
+            self.round, self.seat, self.what, self.expected, self.actual)
+
+    def __repr__(self):
+        """Returns description of divergence"""
+        return 'Divergence(%s)' % self
+
+class DivergenceError(Exception):
+    """Raised when a replay can no longer follow its recording"""
+
+    def __init__(self, divergence):
+        """Initializes members"""
+        super().__init__(str(divergence))
+        self.divergence = divergence
+
+class RecordedOrders:
+    """Shuffle algorithm dealing the recorded orders of a session in turn"""
+
+    def __init__(self, orders):
+        """Initializes members"""
+        self.orders = orders
+        self.next = 0
+
+    def __call__(self, deck, rand=None):
+        """Returns the next recorded order"""
+        if self.next >= len(self.orders):
+            raise DivergenceError(Divergence(-1, None, 'shuffle',
+                                             'no more shoes', 'a shuffle'))
+        order = array('B', self.orders[self.next])
+        self.next += 1
+        return order
+
+class ReplayDecisionPolicy(DecisionPolicy):
+    """Decision policy making the recorded decisions of a seat,
+       checked against policy if given"""
+
+    def __init__(self, replayer, seat, policy=None):
+        """Initializes members"""
+        self.replayer = replayer
+        self.seat = seat
+        self.policy = policy
+
+    def decide(self, hand, upcard, availableCommands, **kwargs):
+        """Returns recorded decision"""
+        command = self.replayer.recorded(self.seat, Kind.ACTION,
+                                         context(hand, upcard, availableCommands))
+        if command not in availableCommands:
+            raise DivergenceError(self.replayer.diverge(self.seat, 'command',
+                                                        command, availableCommands))
+        if self.policy is not None:
+            decided = self.policy.decide(hand, upcard, availableCommands, **kwargs)
+            if decided != command:
+                self.replayer.diverge(self.seat, 'decision', command, decided)
+        return command
+
+class ReplayBettingPolicy(BettingPolicy):
+    """Betting policy making the recorded bets of a seat"""
+
+    def __init__(self, replayer, seat):
+        """Initializes members"""
+        self.replayer = replayer
+        self.seat = seat
+
+    def bet(self, **kwargs):
+        """Returns recorded bet"""
+        return self.replayer.recorded(self.seat, Kind.BET, None)
+
+class ReplayInsurancePolicy(InsurancePolicy):
+    """Insurance policy making the recorded insurance decisions of a seat"""
+
+    def __init__(self, replayer, seat):
+        """Initializes members"""
+        self.replayer = replayer
+        self.seat = seat
+
+    def insure(self, hand, **kwargs):
+        """Returns recorded insurance decision"""
+        return self.replayer.recorded(self.seat, Kind.INSURANCE, context(hand))
+
+class Replayer:
+    """Replays session at table, which must seat players as recorded.
+       The players' policies are replaced by the recorded decisions; if
+       verify, their decision policies are still consulted and any decision
+       differing from the recording is reported"""
+
+    def __init__(self, session, table, verify=False):
+        """Initializes members, seeking to the first round"""
+        _checkShoe(table)
+        if _seats(table) != session.seats:
+            raise ValueError('Table should seat %s' % session.seats)
+        self.session = session
+        self.table = table
+        self.orders = RecordedOrders(session.orders)
+        table.shoe.algorithm = self.orders
+        self.divergences = []
+        self.round = 0
+        self.pending = {}
+        for (seat, slot) in enumerate(table.slots):
+            if slot.isOccupied:
+                player = slot.player
+                policy = player.decision_policy if verify else None
+                while isinstance(policy, (RecordingDecisionPolicy,
+                                          ReplayDecisionPolicy)):
+                    policy = policy.policy
+                player.decision_policy = ReplayDecisionPolicy(self, seat, policy)
+                player.bet_policy = ReplayBettingPolicy(self, seat)
+                player.insurance_policy = ReplayInsurancePolicy(self, seat)
+        self.seek(0)
+
+    def seek(self, n):
+        """Restores table to its state at the start of round n, replaying
+           the cards seen since the shuffle to the shoe's subscribers"""
+        if not 0 <= n <= self.session.numRounds:
+            raise ValueError('Session has %d rounds' % self.session.numRounds)
+        self.round = n
+        if n == self.session.numRounds:
+            return
+        order, index, stacks, bank = self.session.checkpoints[n]
+        self.table.shoe.restore(array('B', self.session.orders[order]), index)
+        self.orders.next = order + 1
+        for (slot, amount) in zip(self.table.slots, stacks):
+            if slot.isOccupied:
+                slot.player.stack.amount = amount
+        self.table.bank.amount = bank
+
+    def recorded(self, seat, kind, ctx):
+        """Returns next recorded decision of kind for seat,
+           reporting any difference in what it is taken on"""
+        queue = self.pending.get(seat)
+        if not queue:
+            raise DivergenceError(self.diverge(seat, Kind.names[kind],
+                                               'no decision', ctx))
+        (recordedKind, value, recordedCtx) = queue.popleft()
+        if recordedKind != kind:
+            raise DivergenceError(self.diverge(seat, 'decision kind',
+                                               Kind.names[recordedKind],
+                                               Kind.names[kind]))
+        if recordedCtx != ctx:
+            self.diverge(seat, Kind.names[kind] + ' context', recordedCtx, ctx)
+        return value
+
+    def diverge(self, seat, what, expected, actual):
+        """Reports and returns divergence of current round"""
+        divergence = Divergence(self.round, seat, what, expected, actual)
+        self.divergences.append(divergence)
+        return divergence
+
+    def play(self, rounds=None):
+        """Replays rounds (every remaining round by default),
+           Returns list of divergences found"""
+        session = self.session
+        found = len(self.divergences)
+        if rounds is None:
+            rounds = session.numRounds - self.round
+        for _ in range(min(rounds, session.numRounds - self.round)):
+            self.pending = {}
+            for (seat, kind, value, ctx) in session.decisions[self.round]:
+                self.pending.setdefault(seat, deque()).append((kind, value, ctx))
+            self.table.play()
+            for (seat, queue) in self.pending.items():
+                if queue:
+                    self.diverge(seat, 'decisions left', len(queue), 0)
+            self.round += 1
+            if self.round < session.numRounds:
+                _, _, stacks, _ = session.checkpoints[self.round]
+                if _stacks(self.table) != stacks:
+                    self.diverge(None, 'stacks', stacks, _stacks(self.table))
+        return self.divergences[found:]
+
+def benchmark(session, table, repeat=3):
+    """Replays every round of session at table repeat times,
+       Returns best rounds replayed per second"""
+    replayer = Replayer(session, table)
+    best = 0
+    for _ in range(repeat):
+        replayer.seek(0)
+        began = perf_counter()
+        replayer.play()
+        best = max(best, session.numRounds / (perf_counter() - began))
+    return best
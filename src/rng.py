@@ -0,0 +1,83 @@
+"""
+Provides reproducible, independent random number streams
+
+Every stream derives from a master seed (RANDOM_SEED, '*' for fresh entropy)
+through a tree of SeedSequences, modelled on NumPy's: a child is identified
+by its parent's entropy and the path of spawn keys leading to it, so the
+streams handed to tables and simulation blocks depend only on the master seed
+and their position in the tree, never on which process draws them.
+"""
+
+from hashlib import sha256
+from random import (Random, SystemRandom)
+
+from config import (cfg, Config)
+
+class SeedSequence:
+    """Node of a tree of seeds, hashing entropy and spawn key into a state"""
+
+    def __init__(self, entropy=None, spawn_key=()):
+        """Initializes members, drawing 128 bits of entropy if none given"""
+        if entropy is None:
+            entropy = SystemRandom().getrandbits(128)
+        self.entropy = entropy
+        self.spawn_key = tuple(spawn_key)
+        self.n_children_spawned = 0
+
+    def child(self, *key):
+        """Returns the child at key, independently of spawned children"""
+        return SeedSequence(self.entropy, self.spawn_key + key)
+
+    def spawn(self, n):
+        """Returns list of the next n children of this sequence"""
+        start = self.n_children_spawned
+        self.n_children_spawned += n
+        return [self.child(i) for i in range(start, start + n)]
+
+    def state(self, bits=256):
+        """Returns integer of bits derived from entropy and spawn key"""
+        words = []
+        counter = 0
+        while 256 * len(words) < bits:
+            material = repr((self.entropy, self.spawn_key, counter)).encode()
+            words.append(int.from_bytes(sha256(material).digest(), 'big'))
+            counter += 1
+        state = 0
+        for word in words:
+            state = (state << 256) | word
+        return state >> (256 * len(words) - bits)
+
+    def random(self):
+        """Returns random.Random seeded from this sequence"""
+        return Random(self.state())
+
+    def generator(self):
+        """Returns numpy.random.Generator seeded from this sequence"""
+        import numpy as np
+        seq = np.random.SeedSequence(self.state(128))
+        return np.random.Generator(np.random.PCG64(seq))
+
+    def __repr__(self):
+        """Returns canonical representation of sequence"""
+        return 'SeedSequence(%d, %r)' % (self.entropy, self.spawn_key)
+
+_root = None
+
+def seed(value=None):
+    """Resets the master sequence to value (RANDOM_SEED by default),
+       Returns it"""
+    global _root
+    if value is None:
+        value = cfg['RANDOM_SEED']
+    _root = SeedSequence(None if value == Config.UNRESTRICTED else value)
+    return _root
+
+def root():
+    """Returns the master sequence, seeding it on first use"""
+    if _root is None:
+        seed()
+    return _root
+
+def spawnRandom():
+    """Returns random.Random of the next child of the master sequence"""
+    return root().spawn(1)[0].random()
@@ -0,0 +1,145 @@
+"""
+Provides shuffle algorithms for Shoe, from a batched NumPy permutation
+backend to models of the imperfect shuffles dealt by hand in casinos
+
+Every algorithm takes the deck and a rand keyword (a random.Random, a stream
+of the master seed by default), as Shoe expects, and returns the deck
+permuted in the same kind of sequence it was given.
+"""
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import rng
+
+def _like(deck, cards):
+    """Returns list of cards as the kind of sequence deck is"""
+    if isinstance(deck, array):
+        return array(deck.typecode, cards)
+    return list(cards)
+
+def _random(rand):
+    """Returns rand, or the next stream of the master seed if None"""
+    return rand if rand is not None else rng.spawnRandom()
+
+class NumpyShuffler:
+    """Uniform shuffles drawing permutations from NumPy a batch at a time
+
+       An instance keeps its own generator, seeded from the first rand it is
+       passed, so each shoe should be given its own instance"""
+
+    def __init__(self, batch=64):
+        """Initializes members, batch permutations are generated at once"""
+        if np is None:
+            raise ImportError('NumpyShuffler requires numpy')
+        self.batch = batch
+        self.generator = None
+        self.permutations = None
+        self.next = 0
+
+    def permutation(self, n, rand=None):
+        """Returns next permutation of range(n) as a NumPy array"""
+        if self.generator is None:
+            self.generator = np.random.default_rng(_random(rand).getrandbits(128))
+        if (self.permutations is None or self.next == self.batch or
+                self.permutations.shape[1] != n):
+            ranks = np.broadcast_to(np.arange(n, dtype=np.intp), (self.batch, n))
+            self.permutations = self.generator.permuted(ranks, axis=1)
+            self.next = 0
+        perm = self.permutations[self.next]
+        self.next += 1
+        return perm
+
+    def __call__(self, deck, rand=None):
+        """Returns deck uniformly shuffled"""
+        perm = self.permutation(len(deck), rand)
+        if isinstance(deck, array) and deck.typecode == 'B':
+            codes = np.frombuffer(deck, dtype=np.uint8)[perm]
+            return array('B', codes.tobytes())
+        return _like(deck, (deck[i] for i in perm.tolist()))
+
+def riffle_shuffle(deck, rand=None, clumping=1.5, cut_spread=0.05):
+    """Returns deck riffled once: cut near the middle, halves interleaved
+       dropping packets of on average clumping cards, each packet falling
+       from either half with probability proportional to its size
+       (clumping 1 is the Gilbert-Shannon-Reeds model)"""
+    rand = _random(rand)
+    n = len(deck)
+    cut = int(round(rand.gauss(n / 2, cut_spread * n)))
+    cut = min(max(cut, 0), n)
+    left = list(deck[:cut])
+    right = list(deck[cut:])
+    # Packets are dropped from the bottom of each half onto the pile
+    riffled = []
+    i = len(left)
+    j = len(right)
+    extra = 1 - 1 / clumping
+    while i > 0 and j > 0:
+        if rand.random() * (i + j) < i:
+            size = 1
+            while size < i and rand.random() < extra:
+                size += 1
+            riffled.extend(reversed(left[i - size:i]))
+            i -= size
+        else:
+            size = 1
+            while size < j and rand.random() < extra:
+                size += 1
+            riffled.extend(reversed(right[j - size:j]))
+            j -= size
+    riffled.extend(reversed(left[:i]))
+    riffled.extend(reversed(right[:j]))
+    riffled.reverse()
+    return _like(deck, riffled)
+
+def strip_cut(deck, rand=None, packets=(5, 10)):
+    """Returns deck strip cut: packets of between packets[0] and packets[1]
+       cards pulled off the top one at a time onto a new pile,
+       reversing the order of the packets"""
+    rand = _random(rand)
+    low, high = packets
+    stripped = []
+    start = 0
+    while start < len(deck):
+        stop = min(start + rand.randint(low, high), len(deck))
+        stripped[:0] = deck[start:stop]
+        start = stop
+    return _like(deck, stripped)
+
+def cut(deck, rand=None, low=0.25, high=0.75):
+    """Returns deck cut at a random fraction of it between low and high,
+       the cards above the cut moving to the bottom"""
+    rand = _random(rand)
+    position = rand.randint(int(low * len(deck)), int(high * len(deck)))
+    return _like(deck, list(deck[position:]) + list(deck[:position]))
+
+def plug(deck, rand=None, fraction=0.2):
+    """Returns deck plugged: a grab of about fraction of the deck taken off
+       the top (the last cards dealt) and inserted at a random depth
+       of the rest"""
+    rand = _random(rand)
+    size = min(len(deck), max(0, int(round(rand.gauss(fraction, fraction / 4) *
+                                           len(deck)))))
+    grab = list(deck[:size])
+    rest = list(deck[size:])
+    position = rand.randint(0, len(rest))
+    return _like(deck, rest[:position] + grab + rest[position:])
+
+def shuffle_procedure(*steps):
+    """Returns algorithm applying steps in order, each drawing from the
+       same stream, e.g. shuffle_procedure(plug, riffle_shuffle, strip_cut,
+       riffle_shuffle, cut)"""
+    def procedure(deck, rand=None):
+        """Applies shuffle procedure to deck"""
+        rand = _random(rand)
+        for step in steps:
+            deck = step(deck, rand=rand)
+        return deck
+    return procedure
+
+casino_shuffle = shuffle_procedure(plug, riffle_shuffle, riffle_shuffle,
+                                   strip_cut, riffle_shuffle, cut)
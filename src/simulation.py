@@ -0,0 +1,266 @@
+"""
+Provides parallel Monte Carlo simulation of bot-only blackjack tables
+"""
+
+from concurrent.futures import (FIRST_COMPLETED,
+                                ProcessPoolExecutor,
+                                wait)
+from math import ceil
+import os
+from time import perf_counter
+
+from commands import Command
+from config import cfg
+from game import Player
+from policies import (BasicStrategyPolicy,
+                      DeclineInsurancePolicy,
+                      MinBettingPolicy)
+import rng
+from stats import Moments
+from table import Table
+from view import NullView
+
+class PlayerSpec:
+    """Picklable description of a bot player"""
+
+    def __init__(self, name, chart_filename, bankroll=10**9):
+        """Initializes members"""
+        self.name = name
+        self.chart_filename = chart_filename
+        self.bankroll = bankroll
+
+    def build(self):
+        """Returns new Player described by this spec"""
+        player = Player(self.name,
+                        BasicStrategyPolicy(self.chart_filename),
+                        DeclineInsurancePolicy(),
+                        MinBettingPolicy())
+        player.receive_payment(self.bankroll)
+        return player
+
+class TableSpec:
+    """Picklable description of a bot-only table and its configuration"""
+
+    def __init__(self, players, config_files=(), num_slots=None,
+                 log_level='off'):
+        """Initializes members, config_files are merged over the defaults,
+           log_level overrides their LOG_LEVEL unless None"""
+        self.players = list(players)
+        self.config_files = list(config_files)
+        self.num_slots = num_slots
+        self.log_level = log_level
+
+    def configure(self):
+        """Loads the configuration the table plays under"""
+        cfg.reset()
+        for filename in self.config_files:
+            cfg.mergeFile(filename)
+        if self.log_level is not None:
+            cfg['LOG_LEVEL'] = self.log_level
+
+    def build(self, view, rand):
+        """Returns new Table seating new players described by this spec,
+           the table's shoe is shuffled using rand"""
+        table = Table(self.num_slots, view, rand=rand)
+        for spec in self.players:
+            table.register_player(spec.build())
+        return table
+
+class SimulationResult:
+    """Mergeable totals of a simulation"""
+
+    def __init__(self, seed=None):
+        """Initializes members"""
+        self.seed = seed
+        self.rounds = 0
+        self.hands = 0
+        self.net = 0
+        self.wins = 0
+        self.losses = 0
+        self.pushes = 0
+        self.blackjacks = 0
+        self.decisions = {cmd : 0 for cmd in Command.commands}
+        # Amount won (negative if lost) on each hand
+        self.outcomes = Moments()
+        self.elapsed = 0.0
+
+    @property
+    def units(self):
+        """Returns net result in units of the minimum bet"""
+        return self.net / cfg['MINIMUM_BET']
+
+    @property
+    def unitsPerHand(self):
+        """Returns average net result per hand in units of the minimum bet"""
+        if self.hands == 0:
+            return None
+        return self.units / self.hands
+
+    def merge(self, other):
+        """Adds other's totals into this instance, returns this instance"""
+        self.rounds += other.rounds
+        self.hands += other.hands
+        self.net += other.net
+        self.wins += other.wins
+        self.losses += other.losses
+        self.pushes += other.pushes
+        self.blackjacks += other.blackjacks
+        for cmd, count in other.decisions.items():
+            self.decisions[cmd] += count
+        self.outcomes.merge(other.outcomes)
+        self.elapsed += other.elapsed
+        return self
+
+    def __eq__(self, other):
+        """Returns True iff other has the same totals"""
+        return (self.rounds == other.rounds and
+                self.hands == other.hands and
+                self.net == other.net and
+                self.wins == other.wins and
+                self.losses == other.losses and
+                self.pushes == other.pushes and
+                self.blackjacks == other.blackjacks and
+                self.decisions == other.decisions)
+
+    def __str__(self):
+        """Returns report of totals"""
+        lines = ['Seed:        %s' % self.seed,
+                 'Rounds:      %d' % self.rounds,
+                 'Hands:       %d' % self.hands,
+                 'Won:         %d' % self.wins,
+                 'Lost:        %d' % self.losses,
+                 'Pushed:      %d' % self.pushes,
+                 'Blackjacks:  %d' % self.blackjacks,
+                 'Net:         $%d (%.2f units)' % (self.net, self.units)]
+        if self.hands > 0:
+            lines.append('Per hand:    %+.5f units' % self.unitsPerHand)
+            lines.append('Std dev:     %.5f units' %
+                         (self.outcomes.stddev / cfg['MINIMUM_BET']))
+        for cmd in Command.commands:
+            lines.append('%-12s %d' % (Command.command_to_past_tense[cmd].title() + ':',
+                                       self.decisions[cmd]))
+        return '\n'.join(lines)
+
+class ResultView(NullView):
+    """View tallying table events into a SimulationResult"""
+
+    def __init__(self, result):
+        """Initializes members"""
+        self.result = result
+
+    def playerBlackjack(self, slot):
+        """Tallies natural blackjack"""
+        self.result.blackjacks += 1
+
+    def decision(self, slot, upcard, availableCommands, command):
+        """Tallies player's decision"""
+        if not slot.player.isDealer:
+            self.result.decisions[command] += 1
+
+    def settle(self, slot, amount):
+        """Tallies hand outcome"""
+        self.result.hands += 1
+        self.result.outcomes.add(amount)
+        if amount > 0:
+            self.result.wins += 1
+        elif amount < 0:
+            self.result.losses += 1
+        else:
+            self.result.pushes += 1
+
+    def endRound(self, table):
+        """Tallies round"""
+        self.result.rounds += 1
+
+def blockSeed(seed, block):
+    """Returns SeedSequence of the stream used by block of a simulation
+       seeded by seed"""
+    return rng.SeedSequence(seed, (block,))
+
+def simulateBlock(spec, seq, num_rounds):
+    """Plays num_rounds on a fresh table described by spec, shuffling
+       from the stream of SeedSequence seq, Returns SimulationResult"""
+    result = SimulationResult()
+    table = spec.build(ResultView(result), seq.random())
+    players = [slot.player for slot in table.occupied_slots]
+    for _ in range(num_rounds):
+        table.play()
+    result.net = sum(p.stack.amount - s.bankroll
+                     for (p, s) in zip(players, spec.players))
+    return result
+
+def simulateBlocks(spec, seed, start, stop, rounds_per_block, num_rounds):
+    """Plays blocks start through stop - 1 of a simulation,
+       Returns their merged SimulationResult"""
+    began = perf_counter()
+    spec.configure()
+    result = SimulationResult(seed)
+    for block in range(start, stop):
+        rounds = min(rounds_per_block, num_rounds - block * rounds_per_block)
+        result.merge(simulateBlock(spec, blockSeed(seed, block), rounds))
+    result.elapsed = perf_counter() - began
+    return result
+
+class Simulator:
+    """Spreads the rounds of a simulation across a pool of processes
+
+       Rounds are grouped in fixed-size blocks, each played on its own table
+       shuffling from its own child stream of the seed, so results depend
+       only on the seed and never on the number of workers or how blocks
+       were grouped into chunks"""
+
+    def __init__(self,
+                 spec,
+                 workers=None,
+                 seed=None,
+                 rounds_per_block=1000,
+                 chunk_seconds=0.5):
+        """Initializes members, seed defaults to the master seed's,
+           chunk_seconds is the targeted running time of one chunk"""
+        self.spec = spec
+        self.workers = workers if workers else os.cpu_count()
+        self.seed = seed if seed is not None else rng.root().entropy
+        self.rounds_per_block = rounds_per_block
+        self.chunk_seconds = chunk_seconds
+
+    def run(self, num_rounds):
+        """Plays num_rounds, Returns merged SimulationResult"""
+        num_blocks = ceil(num_rounds / self.rounds_per_block)
+        result = SimulationResult(self.seed)
+        next_block = 0
+        rate = None
+        pending = {}
+        with ProcessPoolExecutor(self.workers) as pool:
+
+            def submit():
+                """Submits next chunk of blocks, sized by observed rate"""
+                nonlocal next_block
+                remaining = num_blocks - next_block
+                size = 1
+                if rate is not None:
+                    size = max(1, int(rate * self.chunk_seconds))
+                # Shrink chunks near the end so workers finish together
+                size = min(size, max(1, remaining // (2 * self.workers)))
+                future = pool.submit(simulateBlocks,
+                                     self.spec,
+                                     self.seed,
+                                     next_block,
+                                     next_block + size,
+                                     self.rounds_per_block,
+                                     num_rounds)
+                pending[future] = size
+                next_block += size
+
+            while next_block < num_blocks and len(pending) < 2 * self.workers:
+                submit()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    size = pending.pop(future)
+                    chunk = future.result()
+                    result.merge(chunk)
+                    observed = size / max(chunk.elapsed, 1e-9)
+                    rate = observed if rate is None else (rate + observed) / 2
+                    if next_block < num_blocks:
+                        submit()
+        return result
@@ -1,20 +1,101 @@
-"""Functions to gather statistics on various data structures"""
+"""Functions to gather statistics on various data structures
 
-from math import sqrt
+Functions also accept NumPy arrays, including np.memmap columns and views
+of a History, which they scan CHUNK_SIZE items at a time with vectorized
+operations, so memory use does not grow with the array's length. Exact
+quantiles, median, mode and frequencies of an array count its distinct
+values, of which there may be at most MAX_DISTINCT_VALUES; a
+QuantileSketch or FrequencyCounter summarizes any array.
+"""
+
+from math import (ceil, floor, log, sqrt)
 from operator import (le, lt, ge, gt)
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Items of an array processed at a time
+CHUNK_SIZE = 1 << 20
+# Distinct values of an array counted for exact quantiles and frequencies
+MAX_DISTINCT_VALUES = 1 << 20
+
+def _isArray(sequence):
+    """Returns True iff sequence is a NumPy array"""
+    return np is not None and isinstance(sequence, np.ndarray)
+
+def _chunks(array, size=None):
+    """Yields array size (default CHUNK_SIZE) items at a time"""
+    if size is None:
+        size = CHUNK_SIZE
+    for start in range(0, len(array), size):
+        yield array[start:start + size]
+
+def _accumulator(array):
+    """Returns dtype summing items of array without loss"""
+    if array.dtype.kind in 'biu':
+        return np.int64
+    return np.float64
+
+def _value_counts(array):
+    """Returns (sorted distinct values, their counts) of array,
+       in memory proportional to the number of distinct values,
+       Raises ValueError if there are more than MAX_DISTINCT_VALUES"""
+    values = np.zeros(0, dtype=array.dtype)
+    counts = np.zeros(0, dtype=np.int64)
+    for chunk in _chunks(array):
+        v, c = np.unique(chunk, return_counts=True)
+        values, inverse = np.unique(np.concatenate((values, v)),
+                                    return_inverse=True)
+        counts = np.bincount(inverse, np.concatenate((counts, c)),
+                             len(values)).astype(np.int64)
+        if len(values) > MAX_DISTINCT_VALUES:
+            raise ValueError('Array has more than %d distinct values, '
+                             'summarize it with a QuantileSketch or '
+                             'FrequencyCounter' % MAX_DISTINCT_VALUES)
+    return (values, counts)
+
 def mean(sequence):
     """Computes the mean of the sequence"""
     n = len(sequence)
     if n == 0:
         return None
+    if _isArray(sequence):
+        dtype = _accumulator(sequence)
+        total = sum(chunk.sum(dtype=dtype) for chunk in _chunks(sequence))
+        return total.item()/n
     return sum(sequence)/n
 
+def quantile(sequence, q):
+    """Computes the q quantile (0 <= q <= 1) of the sequence,
+       interpolating between the items around it"""
+    if not 0 <= q <= 1:
+        raise ValueError('Quantile should be between 0 and 1')
+    n = len(sequence)
+    if n == 0:
+        return None
+    pos = q * (n - 1)
+    lo = floor(pos)
+    hi = min(lo + 1, n - 1)
+    if _isArray(sequence):
+        values, counts = _value_counts(sequence)
+        (low, high) = values[np.searchsorted(np.cumsum(counts), [lo, hi],
+                                             side='right')].tolist()
+    else:
+        sseq = sorted(sequence)
+        (low, high) = (sseq[lo], sseq[hi])
+    if pos == lo:
+        return low
+    return low + (high - low) * (pos - lo)
+
 def median(sequence):
     """Computes the median of the sequence"""
     n = len(sequence)
     if n == 0:
         return None
+    if _isArray(sequence):
+        return quantile(sequence, 0.5)
     mid = n//2
     sseq = sorted(sequence)
     if n % 2 == 1:
@@ -34,6 +115,9 @@ def mode(sequence):
 
 def frequency_dict(sequence):
     """Computes the frequency of each element in sequence"""
+    if _isArray(sequence):
+        values, counts = _value_counts(sequence)
+        return dict(zip(values.tolist(), counts.tolist()))
     d = {}
     for e in sequence:
         if e in d:
@@ -44,10 +128,7 @@ def frequency_dict(sequence):
 
 def variance(sequence):
     """Computes the variance of the sequence"""
-    n = len(sequence)
-    if n == 0:
-        return None
-    return sum(map(lambda x: x * x, sequence))/n - (mean(sequence) ** 2)
+    return Moments(sequence).variance
 
 def stddev(sequence):
     """Computes the standard deviation of the sequence"""
@@ -59,8 +140,358 @@ def delta(sequence):
     """Computes difference between max and min of sequence"""
     if len(sequence) == 0:
         return None
+    if _isArray(sequence):
+        return (max(chunk.max() for chunk in _chunks(sequence)) -
+                min(chunk.min() for chunk in _chunks(sequence))).item()
     return max(sequence) - min(sequence)
 
+# STREAMING STATISTICS
+
+class Moments:
+    """Count, mean and variance of values added one at a time,
+       by Welford's algorithm"""
+
+    def __init__(self, sequence=()):
+        """Initializes members, adding each item of sequence"""
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.update(sequence)
+
+    def add(self, x):
+        """Adds value x"""
+        self.count += 1
+        d = x - self._mean
+        self._mean += d / self.count
+        self._m2 += d * (x - self._mean)
+
+    def update(self, sequence):
+        """Adds each item of sequence"""
+        if _isArray(sequence):
+            for chunk in _chunks(sequence):
+                moments = Moments()
+                moments.count = len(chunk)
+                moments._mean = chunk.mean(dtype=np.float64).item()
+                moments._m2 = np.square(chunk.astype(np.float64) -
+                                         moments._mean).sum().item()
+                self.merge(moments)
+            return
+        for x in sequence:
+            self.add(x)
+
+    def merge(self, other):
+        """Adds other's values into this instance (Chan et al.),
+           Returns this instance"""
+        n = self.count + other.count
+        if other.count == 0:
+            return self
+        d = other._mean - self._mean
+        self._mean += d * other.count / n
+        self._m2 += other._m2 + d * d * self.count * other.count / n
+        self.count = n
+        return self
+
+    @property
+    def mean(self):
+        """Returns mean of values added"""
+        if self.count == 0:
+            return None
+        return self._mean
+
+    @property
+    def variance(self):
+        """Returns (population) variance of values added"""
+        if self.count == 0:
+            return None
+        return self._m2 / self.count
+
+    @property
+    def stddev(self):
+        """Returns standard deviation of values added"""
+        if self.count == 0:
+            return None
+        return sqrt(self.variance)
+
+class QuantileSketch:
+    """Quantiles of values added one at a time, within a relative accuracy
+
+       Values are counted in buckets whose bounds grow geometrically, so
+       any quantile is estimated within relative_accuracy of its value.
+       Sketches with the same accuracy merge by adding bucket counts, so
+       merging gives the sketch of every value added to either. Once a
+       sign holds max_buckets buckets, those of the smallest magnitudes
+       are collapsed into one"""
+
+    def __init__(self, sequence=(), relative_accuracy=0.01, max_buckets=2048):
+        """Initializes members, adding each item of sequence"""
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.update(sequence)
+
+    def _key(self, x):
+        """Returns key of bucket counting magnitude x"""
+        return ceil(log(x) / self._log_gamma)
+
+    def _value(self, key):
+        """Returns estimate of magnitudes counted by bucket key"""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, x):
+        """Adds value x"""
+        if x > 0:
+            key = self._key(x)
+            self.positive[key] = self.positive.get(key, 0) + 1
+            if len(self.positive) > self.max_buckets:
+                self._collapse(self.positive)
+        elif x < 0:
+            key = self._key(-x)
+            self.negative[key] = self.negative.get(key, 0) + 1
+            if len(self.negative) > self.max_buckets:
+                self._collapse(self.negative)
+        else:
+            self.zeros += 1
+        self.count += 1
+        if self.min is None or x < self.min:
+            self.min = x
+        if self.max is None or x > self.max:
+            self.max = x
+
+    def update(self, sequence):
+        """Adds each item of sequence"""
+        if _isArray(sequence):
+            for chunk in _chunks(sequence):
+                self._updateArray(chunk)
+            return
+        for x in sequence:
+            self.add(x)
+
+    def _updateArray(self, array):
+        """Adds each item of non-empty array, bucketing them together"""
+        for (buckets, magnitudes) in ((self.positive, array[array > 0]),
+                                      (self.negative, -array[array < 0])):
+            if len(magnitudes) == 0:
+                continue
+            keys, counts = np.unique(
+                np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64),
+                return_counts=True)
+            for (key, count) in zip(keys.tolist(), counts.tolist()):
+                buckets[key] = buckets.get(key, 0) + count
+            if len(buckets) > self.max_buckets:
+                self._collapse(buckets)
+        self.zeros += int(np.count_nonzero(array == 0))
+        self.count += len(array)
+        low, high = array.min().item(), array.max().item()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def _collapse(self, buckets):
+        """Collapses buckets of the smallest magnitudes into one,
+           leaving max_buckets buckets"""
+        keys = sorted(buckets)
+        excess = len(keys) - self.max_buckets
+        into = keys[excess]
+        for key in keys[:excess]:
+            buckets[into] += buckets.pop(key)
+
+    def merge(self, other):
+        """Adds other's values into this instance, Returns this instance"""
+        if other.gamma != self.gamma:
+            raise ValueError('Sketches should have the same relative accuracy')
+        for (mine, theirs) in ((self.positive, other.positive),
+                               (self.negative, other.negative)):
+            for (key, count) in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+            if len(mine) > self.max_buckets:
+                self._collapse(mine)
+        self.zeros += other.zeros
+        self.count += other.count
+        if other.count > 0:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Returns estimate of the q quantile (0 <= q <= 1) of values added"""
+        if not 0 <= q <= 1:
+            raise ValueError('Quantile should be between 0 and 1')
+        if self.count == 0:
+            return None
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(-self._value(key), self.min)
+        seen += self.zeros
+        if seen > rank:
+            return 0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self._value(key), self.max)
+        return self.max
+
+    @property
+    def median(self):
+        """Returns estimate of the median of values added"""
+        return self.quantile(0.5)
+
+class FrequencyCounter:
+    """Frequencies of values added one at a time, keeping at most
+       capacity counters (Misra-Gries)
+
+       Counts are exact until more than capacity distinct values are
+       seen; from then on each count is short by at most error, and any
+       value occurring more than count / (capacity + 1) times is kept.
+       Counters merge by adding counts, exactly while within capacity"""
+
+    def __init__(self, sequence=(), capacity=64):
+        """Initializes members, adding each item of sequence"""
+        self.capacity = capacity
+        self.counts = {}
+        self.count = 0
+        self.error = 0
+        self.update(sequence)
+
+    def add(self, x):
+        """Adds value x"""
+        counts = self.counts
+        counts[x] = counts.get(x, 0) + 1
+        self.count += 1
+        if len(counts) > self.capacity:
+            self._reduce()
+
+    def update(self, sequence):
+        """Adds each item of sequence"""
+        if _isArray(sequence):
+            for chunk in _chunks(sequence):
+                values, counts = np.unique(chunk, return_counts=True)
+                other = FrequencyCounter(capacity=self.capacity)
+                other.counts = dict(zip(values.tolist(), counts.tolist()))
+                other.count = len(chunk)
+                self.merge(other)
+            return
+        for x in sequence:
+            self.add(x)
+
+    def _reduce(self):
+        """Decrements every counter by the (capacity + 1)th largest count,
+           dropping those reaching zero"""
+        cut = sorted(self.counts.values(), reverse=True)[self.capacity]
+        self.counts = {x : c - cut for (x, c) in self.counts.items() if c > cut}
+        self.error += cut
+
+    def merge(self, other):
+        """Adds other's values into this instance, Returns this instance"""
+        counts = self.counts
+        for (x, c) in other.counts.items():
+            counts[x] = counts.get(x, 0) + c
+        self.count += other.count
+        self.error += other.error
+        if len(counts) > self.capacity:
+            self._reduce()
+        return self
+
+    @property
+    def isExact(self):
+        """Returns True iff every count is exact"""
+        return self.error == 0
+
+    def frequency_dict(self):
+        """Returns the (estimated) frequency of each value kept"""
+        return dict(self.counts)
+
+    @property
+    def mode(self):
+        """Returns the most frequent value, or list of them if tied"""
+        if not self.counts:
+            return None
+        m = max(self.counts.values())
+        mode_ = [key for (key, val) in self.counts.items() if val == m]
+        if len(mode_) == 1:
+            return mode_[0]
+        return mode_
+
+class Summary:
+    """Moments, quantiles and mode of values added one at a time,
+       merging with the summaries of other workers"""
+
+    def __init__(self, sequence=(), relative_accuracy=0.01, capacity=64):
+        """Initializes members, adding each item of sequence"""
+        self.moments = Moments()
+        self.sketch = QuantileSketch(relative_accuracy=relative_accuracy)
+        self.frequencies = FrequencyCounter(capacity=capacity)
+        self.update(sequence)
+
+    def add(self, x):
+        """Adds value x"""
+        self.moments.add(x)
+        self.sketch.add(x)
+        self.frequencies.add(x)
+
+    def update(self, sequence):
+        """Adds each item of sequence"""
+        if _isArray(sequence):
+            self.moments.update(sequence)
+            self.sketch.update(sequence)
+            self.frequencies.update(sequence)
+            return
+        for x in sequence:
+            self.add(x)
+
+    def merge(self, other):
+        """Adds other's values into this instance, Returns this instance"""
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self.frequencies.merge(other.frequencies)
+        return self
+
+    @property
+    def count(self):
+        """Returns number of values added"""
+        return self.moments.count
+
+    @property
+    def mean(self):
+        """Returns mean of values added"""
+        return self.moments.mean
+
+    @property
+    def variance(self):
+        """Returns variance of values added"""
+        return self.moments.variance
+
+    @property
+    def stddev(self):
+        """Returns standard deviation of values added"""
+        return self.moments.stddev
+
+    @property
+    def median(self):
+        """Returns estimate of the median of values added"""
+        return self.sketch.median
+
+    def quantile(self, q):
+        """Returns estimate of the q quantile of values added"""
+        return self.sketch.quantile(q)
+
+    @property
+    def mode(self):
+        """Returns the most frequent value, or list of them if tied"""
+        return self.frequencies.mode
+
 # RUN STATISTICS
 
 def length_longest_non_decreasing_run(sequence):
@@ -82,29 +513,61 @@ def length_longest_decreasing_run(sequence):
 def length_longest_run(sequence, predicate):
     """Computes the length of the longest run in sequence
        such that each pair of adjacent items satisfies binary predicate"""
-    n = len(sequence)
-    if n == 0:
+    if _isArray(sequence):
+        return _length_longest_run_array(sequence, predicate)
+    best = run = 0
+    prev = None
+    for item in sequence:
+        if run > 0 and predicate(prev, item):
+            run += 1
+        else:
+            run = 1
+        if run > best:
+            best = run
+        prev = item
+    if best == 0:
+        return None
+    return best
+
+def _length_longest_run_array(array, predicate):
+    """length_longest_run of an array, predicate applied to whole chunks"""
+    if len(array) == 0:
         return None
     best = 1
-    for start in range(0, n-1):
-        index = start
-        while index < n - 1 and predicate(sequence[index], sequence[index+1]):
-            index += 1
-        res = index - start + 1
-        if res > best:
-            best = res
+    # Adjacent pairs satisfying predicate up to the end of the last chunk
+    run = 0
+    prev = None
+    for chunk in _chunks(array):
+        pairs = np.asarray(predicate(chunk[:-1], chunk[1:]), dtype=bool)
+        if prev is not None:
+            pairs = np.concatenate(([bool(predicate(prev, chunk[0]))], pairs))
+        prev = chunk[-1]
+        breaks = np.flatnonzero(~pairs)
+        if len(breaks) == 0:
+            run += len(pairs)
+        else:
+            best = max(best, run + breaks[0].item() + 1)
+            if len(breaks) > 1:
+                best = max(best, np.diff(breaks).max().item())
+            run = len(pairs) - breaks[-1].item() - 1
+        best = max(best, run + 1)
     return best
 
 
 def maximum_subarray(sequence):
     """Computes the maximum subarray of sequence,
        Returns (maximum sum, length of maximum subarray"""
+    if _isArray(sequence):
+        return _maximum_subarray_array(sequence)
     # Kadane's algorithm adapted from wikipedia
-    if len(sequence) == 0:
+    items = iter(sequence)
+    for first in items:
+        break
+    else:
         return (None, 0)
-    local_max = global_max = sequence[0]
+    local_max = global_max = first
     local_count = global_count = 1
-    for item in sequence[1:]:
+    for item in items:
         if item > local_max + item:
             local_max = item
             local_count = 1
@@ -115,3 +578,174 @@ def maximum_subarray(sequence):
             global_max = local_max
             global_count = local_count
     return (global_max, global_count)
+
+def _maximum_subarray_array(array):
+    """maximum_subarray of an array, from prefix sums of whole chunks
+
+       A subarray ending at item j sums to the prefix sum through j less
+       the least prefix sum before it, choosing the first such as Kadane's
+       algorithm does"""
+    if len(array) == 0:
+        return (None, 0)
+    dtype = _accumulator(array)
+    # Sum of items before the chunk, least prefix sum and its position
+    offset = dtype(0)
+    least, leastPos = dtype(0), 0
+    best, bestLength = None, 0
+    start = 0
+    for chunk in _chunks(array):
+        sums = offset + np.cumsum(chunk, dtype=dtype)
+        before = np.concatenate(([offset], sums[:-1]))
+        runningLeast = np.minimum(np.minimum.accumulate(before), least)
+        # Positions where the prefix sum before an item reaches a new least
+        lower = np.empty(len(chunk), dtype=bool)
+        lower[0] = before[0] < least
+        lower[1:] = before[1:] < runningLeast[:-1]
+        positions = np.where(lower, np.arange(start, start + len(chunk)), -1)
+        positions = np.maximum(np.maximum.accumulate(positions), leastPos)
+        gains = sums - runningLeast
+        j = int(np.argmax(gains))
+        if best is None or gains[j] > best:
+            best = gains[j]
+            bestLength = start + j + 1 - positions[j].item()
+        offset = sums[-1]
+        least, leastPos = runningLeast[-1], positions[-1].item()
+        start += len(chunk)
+    return (best.item(), bestLength)
+
+class StreakAnalyzer:
+    """Streaks, drawdown and maximum subarray of a series of outcomes
+       (amounts won, negative if lost) added a chunk at a time
+
+       Positive outcomes are wins and negative ones losses, a push ends
+       any streak. Positions of outcomes count from 0; positions of the
+       bankroll count outcomes played, 0 being the start"""
+
+    def __init__(self, sequence=(), bankroll=0):
+        """Initializes members, adding each item of sequence to a
+           bankroll starting at bankroll"""
+        self.count = 0
+        self.bankroll = bankroll
+        # Sign, length and start of the current streak
+        self._sign = 0
+        self._length = 0
+        self._start = 0
+        # Histograms of the lengths of ended streaks
+        self._wins = {}
+        self._losses = {}
+        # (length, start) of the longest ended streaks
+        self._longestWin = (0, None)
+        self._longestLoss = (0, None)
+        # Highest and lowest bankroll and their positions
+        self._peak = (bankroll, 0)
+        self._trough = (bankroll, 0)
+        # (amount, peak position, trough position) and reverse
+        self.max_drawdown = (0, 0, 0)
+        self.max_runup = (0, 0, 0)
+        # Kadane's sum and start of the current subarray and
+        # (sum, start, length) of the best
+        self._local = None
+        self._localStart = 0
+        self._best = (None, 0, 0)
+        self.update(sequence)
+
+    def add(self, x):
+        """Adds outcome x"""
+        self.update((x,))
+
+    def update(self, sequence):
+        """Adds each outcome of sequence, converting arrays (e.g. a NumPy
+           column) to lists a chunk at a time"""
+        if _isArray(sequence):
+            for chunk in _chunks(sequence):
+                self._updateList(chunk.tolist())
+            return
+        self._updateList(sequence)
+
+    def _updateList(self, sequence):
+        """Adds each outcome of sequence of Python numbers"""
+        pos = self.count
+        sign, length, start = self._sign, self._length, self._start
+        wins, losses = self._wins, self._losses
+        longestWin, longestLoss = self._longestWin, self._longestLoss
+        bankroll = self.bankroll
+        peak, peakPos = self._peak
+        trough, troughPos = self._trough
+        drawdown, runup = self.max_drawdown, self.max_runup
+        local, localStart = self._local, self._localStart
+        best = self._best
+        for x in sequence:
+            # Streaks
+            s = (x > 0) - (x < 0)
+            if s == sign:
+                length += 1
+            else:
+                if sign > 0:
+                    wins[length] = wins.get(length, 0) + 1
+                    if length > longestWin[0]:
+                        longestWin = (length, start)
+                elif sign < 0:
+                    losses[length] = losses.get(length, 0) + 1
+                    if length > longestLoss[0]:
+                        longestLoss = (length, start)
+                sign, length, start = s, 1, pos
+            # Drawdown and run-up of the bankroll after this outcome
+            bankroll += x
+            pos += 1
+            if bankroll > peak:
+                peak, peakPos = bankroll, pos
+            elif peak - bankroll > drawdown[0]:
+                drawdown = (peak - bankroll, peakPos, pos)
+            if bankroll < trough:
+                trough, troughPos = bankroll, pos
+            elif bankroll - trough > runup[0]:
+                runup = (bankroll - trough, troughPos, pos)
+            # Kadane's maximum subarray
+            if local is None or local < 0:
+                local, localStart = x, pos - 1
+            else:
+                local += x
+            if best[0] is None or local > best[0]:
+                best = (local, localStart, pos - localStart)
+        self.count = pos
+        self._sign, self._length, self._start = sign, length, start
+        self._longestWin, self._longestLoss = longestWin, longestLoss
+        self.bankroll = bankroll
+        self._peak = (peak, peakPos)
+        self._trough = (trough, troughPos)
+        self.max_drawdown, self.max_runup = drawdown, runup
+        self._local, self._localStart = local, localStart
+        self._best = best
+
+    @property
+    def longest_win(self):
+        """Returns (length, start) of the longest winning streak,
+           start None if there was none"""
+        if self._sign > 0 and self._length > self._longestWin[0]:
+            return (self._length, self._start)
+        return self._longestWin
+
+    @property
+    def longest_loss(self):
+        """Returns (length, start) of the longest losing streak,
+           start None if there was none"""
+        if self._sign < 0 and self._length > self._longestLoss[0]:
+            return (self._length, self._start)
+        return self._longestLoss
+
+    def histogram(self):
+        """Returns ({length : number of winning streaks},
+           {length : number of losing streaks})"""
+        wins = dict(self._wins)
+        losses = dict(self._losses)
+        if self._sign > 0:
+            wins[self._length] = wins.get(self._length, 0) + 1
+        elif self._sign < 0:
+            losses[self._length] = losses.get(self._length, 0) + 1
+        return (wins, losses)
+
+    @property
+    def maximum_subarray(self):
+        """Returns (maximum sum, start, length) of the maximum subarray,
+           (None, 0, 0) if no outcome was added"""
+        return self._best
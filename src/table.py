@@ -10,27 +10,44 @@ from commands import (Command,
                       DoubleCommand,
                       SplitCommand,
                       SurrenderCommand)
-from cards import (BlackjackHand, Shoe, fisher_yates_shuffle)
+from cards import (BlackjackHand,
+                   ContinuousShuffler,
+                   Shoe,
+                   fisher_yates_shuffle)
 from config import cfg
 from game import (Dealer)
-from log import log
+from log import logger
+from view import ConsoleView
 
 class Table:
     """Representation of Blackjack Table"""
 
-    def __init__(self, num_slots=None):
-        """Initializes table members"""
+    def __init__(self, num_slots=None, view=None,
+                 algorithm=fisher_yates_shuffle, rand=None):
+        """Initializes table members,
+           view receives the table's events (console output by default),
+           algorithm shuffles the table's shoe drawing from rand
+           (a stream of the master seed by default)"""
         self.dealer_slot = TableSlot()
+        self.view = view if view is not None else ConsoleView()
         if num_slots is None:
             self.num_slots = cfg['NUM_SEATS']
         else:
             self.num_slots = num_slots
         # Index 0 is dealer's leftmost slot
         self.slots = [TableSlot() for _ in range(self.num_slots)]
-        self.shoe = Shoe(cfg['NUM_DECKS'],
-                         fisher_yates_shuffle,
-                         cfg['CUT_INDEX'])
+        if cfg['CONTINUOUS_SHUFFLE']:
+            self.shoe = ContinuousShuffler(cfg['NUM_DECKS'],
+                                           cfg['CSM_DELAY_ROUNDS'],
+                                           rand)
+        else:
+            self.shoe = Shoe(cfg['NUM_DECKS'],
+                             algorithm,
+                             cfg['CUT_INDEX'],
+                             rand)
         self.shoe.shuffle()
+        self.hole_revealed = False
+        logger.configure()
         self.dealer_slot.seatPlayer(Dealer())
         hitCmd = HitCommand(self.shoe)
         standCmd = StandCommand()
@@ -95,26 +112,26 @@ class Table:
 
     def beginRound(self):
         """Begins round of blackjack play"""
-        print('>' * 80)
+        self.view.beginRound(self)
         for slot in self.occupied_slots:
             slot.beginRound()
         self.dealer_slot.beginRound()
+        self.hole_revealed = False
         upcard = self.dealCards()
-        print('Dealer shows', upcard.rank)
-        log('Dealer shows %s\n' % upcard)
+        self.view.dealerShows(upcard)
+        logger.round('Dealer shows %s\n', upcard)
         return upcard
 
     def endRound(self):
         """Ends round of blackjack play"""
+        self.revealHoleCard()
         self.settle_bets()
         for slot in self.occupied_slots:
             slot.endRound()
         self.dealer_slot.endRound()
-        for slot in self.occupied_slots:
-            print(slot.player)
-        print(self.dealer_slot.player)
-        print('<' * 80)
-        log('\n')
+        self.shoe.collect()
+        self.view.endRound(self)
+        logger.round('\n')
 
     def play(self):
         """Plays one round of blackjack"""
@@ -122,84 +139,104 @@ class Table:
         upcard = self.beginRound()
         if cfg['EARLY_SURRENDER']:
             self.offer_early_surrender()
+        if cfg['OFFER_INSURANCE'] and upcard.isAce:
+            for slot in self.active_slots:
+                slot.promptInsurance()
         if self.dealer_slot.hand.isNaturalBlackjack:
             self.handle_dealer_blackjack(upcard)
         else:
             for slot in self.active_slots:
-                self.bank.deposit(slot.takeInsurance())
+                stake = slot.takeInsurance()
+                if stake > 0:
+                    self.bank.deposit(stake)
+                    self.view.insured(slot, -stake)
                 if slot.hand.isNaturalBlackjack:
-                    print('BLACKJACK!')
-                    log('%s has natural blackjack\n' % slot.player.name)
+                    self.view.playerBlackjack(slot)
                     amt = slot.first_bet * cfg['BLACKJACK_PAYOUT_RATIO']
-                    log('%s wins $%d\n' % (slot.player.name, amt))
-                    self.payout(slot, amt)
+                    if logger.handEnabled:
+                        logger.hand('%s has natural blackjack\n', slot.player.name)
+                        logger.hand('%s wins $%d\n', slot.player.name, amt)
+                    self.view.settle(slot, self.payout(slot, amt))
                     slot.settled = True
                 else:
                     dealerActs = True
-                    print('PLAYER: %s' % slot.player.name)
                     self.dealSlot(slot, upcard)
-                    print()
             if dealerActs:
-                print('DEALER')
+                self.revealHoleCard()
                 self.dealSlot(self.dealer_slot, upcard)
-                print()
 
         self.endRound()
 
     def payout(self, slot, amt):
-        """Pay floor of amt to slot"""
-        slot.payToPot(self.bank.withdraw(floor(amt)))
+        """Pay floor of amt to slot, returns amount paid"""
+        amt = self.bank.withdraw(floor(amt))
+        slot.payToPot(amt)
+        return amt
+
+    def collect(self, slot, amt):
+        """Deposit amt lost by slot into the bank"""
+        self.bank.deposit(amt)
+        if not slot.player.isDealer:
+            self.view.settle(slot, -amt)
 
     def dealHand(self, i, slot, upcard):
         """Deals a hand within a slot"""
         while True:
             hand = slot.hands[i]
             if hand.isBlackjackValued:
-                log('%s has blackjack\n' % slot.player.name)
+                if logger.handEnabled:
+                    logger.hand('%s has blackjack\n', slot.player.name)
                 break
             if hand.isBust:
-                log('%s busts on %s\n' % (slot.player.name,
-                                          slot.hand.description))
+                if logger.handEnabled:
+                    logger.hand('%s busts on %s\n', slot.player.name,
+                                slot.hand.description)
                 amt = slot.takePot()
-                if not slot.player.isDealer:
-                    log('%s loses $%d\n' % (slot.player.name, amt))
-                self.bank.deposit(amt)
+                if logger.handEnabled and not slot.player.isDealer:
+                    logger.hand('%s loses $%d\n', slot.player.name, amt)
+                self.collect(slot, amt)
                 slot.settled = True
                 break
             actions = [key for (key, cmd) in self.commands.items()
                        if cmd.isAvailable(slot)]
             response = slot.promptAction(upcard, actions)
-            log('%s %s on %s\n' % (slot.player.name,
-                                   Command.command_to_past_tense[response].lower(),
-                                   slot.hand.description))
+            self.view.decision(slot, upcard, actions, response)
+            if logger.decisionEnabled:
+                logger.decision('%s %s on %s\n', slot.player.name,
+                                Command.command_to_past_tense[response].lower(),
+                                slot.hand.description)
             if response == Command.SURRENDER:
                 slot.surrendered = True
                 slot.settled = True
                 amt = slot.takePot(cfg['LATE_SURRENDER_RATIO'])
-                log('%s loses $%d\n' % (slot.player.name, amt))
-                self.bank.deposit(amt)
+                if logger.handEnabled:
+                    logger.hand('%s loses $%d\n', slot.player.name, amt)
+                self.collect(slot, amt)
             if self.commands[response].execute(slot):
                 break
-        if not slot.settled:
-            log('%s hand ends at %d\n' % (slot.player.name, hand.value))
-        print('Hand ends at', hand.value)
+        if logger.handEnabled and not slot.settled:
+            logger.hand('%s hand ends at %d\n', slot.player.name, hand.value)
+        self.view.handEnd(slot, hand)
 
     def dealSlot(self, slot, upcard):
         """Manages turn for active slot"""
+        self.view.beginTurn(slot)
         i = 0
         while i < len(slot.hands):
             slot.index = i
             self.dealHand(i, slot, upcard)
             i += 1
+        self.view.endTurn(slot)
 
     def offer_early_surrender(self):
         """Offers early surrender to each active player"""
         for slot in self.active_slots:
             slot.promptEarlySurrender()
             if slot.surrendered:
-                log('%s surrenders early\n' % slot.player.name)
-                self.bank.deposit(
-                    slot.takePot(cfg['EARLY_SURRENDER_RATIO']))
+                if logger.decisionEnabled:
+                    logger.decision('%s surrenders early\n', slot.player.name)
+                self.collect(slot,
+                             slot.takePot(cfg['EARLY_SURRENDER_RATIO']))
 
     def settle_bets(self):
         """Settles each active player's bet(s)
@@ -214,27 +251,37 @@ class Table:
                     value = slot.hand.value
                     if value > dealer_value or self.dealer_slot.hand.isBust:
                         amt = slot.pot * cfg['PAYOUT_RATIO']
-                        log('%s wins $%d\n' % (slot.player.name, amt))
-                        self.payout(slot, amt)
+                        if logger.handEnabled:
+                            logger.hand('%s wins $%d\n', slot.player.name, amt)
+                        self.view.settle(slot, self.payout(slot, amt))
                     elif value < dealer_value:
                         amt = slot.takePot()
-                        log('%s loses $%d\n' % (slot.player.name, amt))
-                        self.bank.deposit(amt)
+                        if logger.handEnabled:
+                            logger.hand('%s loses $%d\n', slot.player.name, amt)
+                        self.collect(slot, amt)
                     else:
-                        log('%s pushes\n' % slot.player.name)
+                        if logger.handEnabled:
+                            logger.hand('%s pushes\n', slot.player.name)
+                        self.view.settle(slot, 0)
 
     def dealCards(self):
         """Deals hands to all active players
            Returns dealer's up card"""
         for slot in self.active_slots:
             slot.addCards(self.shoe.dealOneCard())
-        self.dealer_slot.addCards(self.shoe.dealOneCard(False))
+        self.dealer_slot.addCards(self.shoe.dealHoleCard())
         for slot in self.active_slots:
             slot.addCards(self.shoe.dealOneCard())
         upcard = self.shoe.dealOneCard()
         self.dealer_slot.addCards(upcard)
         return upcard
 
+    def revealHoleCard(self):
+        """Turns over dealer's hole card, if not yet turned this round"""
+        if not self.hole_revealed:
+            self.hole_revealed = True
+            self.shoe.revealHoleCard(self.dealer_slot.hand.cards[0])
+
     def unregister_player(self, player):
         """Unregister player from table"""
         for pos, slot in self.occupied_slots:
@@ -245,26 +292,27 @@ class Table:
         """Unregister player from slot, if present"""
         if self.slots[pos].isOccupied:
             self.slots[pos].unseatPlayer()
-        log('%s left table\n' % self.slots[pos].player)
+        logger.round('%s left table\n', self.slots[pos].player)
 
     def handle_dealer_blackjack(self, upcard):
         """Handles the event dealer is dealt a natural blackjack"""
-        if cfg['OFFER_INSURANCE'] and upcard.isAce:
-            for slot in self.active_slots:
-                slot.promptInsurance()
-        log('Dealer has natural blackjack\n')
-        print('Dealer has blackjack')
+        self.revealHoleCard()
+        logger.round('Dealer has natural blackjack\n')
+        self.view.dealerBlackjack()
         for slot in self.active_slots:
             if not slot.hand.isNaturalBlackjack:
                 amt = slot.takePot()
-                log('%s loses $%d\n' % (slot.player.name, amt))
-                self.bank.deposit(amt)
+                if logger.handEnabled:
+                    logger.hand('%s loses $%d\n', slot.player.name, amt)
+                self.collect(slot, amt)
+            else:
+                self.view.settle(slot, 0)
             if slot.insured:
-                print("You're insured though")
                 amt = slot.insurance * cfg['INSURANCE_PAYOUT_RATIO']
-                log('%s is insured\n' % slot.player.name)
-                log('%s wins $%d\n' % (slot.player.name, amt))
-                self.payout(slot, amt)
+                if logger.handEnabled:
+                    logger.hand('%s is insured\n', slot.player.name)
+                    logger.hand('%s wins $%d\n', slot.player.name, amt)
+                self.view.insured(slot, self.payout(slot, amt))
             slot.settled = True
 
 class TableSlot:
@@ -330,7 +378,7 @@ class TableSlot:
         """Seats player at table slot"""
         self.player = player
         if not player.isDealer:
-            log('%s sat down\n' % player)
+            logger.round('%s sat down\n', player)
 
     def unseatPlayer(self):
         """Removes player from table slot"""
@@ -371,7 +419,8 @@ class TableSlot:
         """Prompts player for insurance"""
         if ( self.playerCanAffordInsurance and
              self.player.insure(self.hand,**kwargs) ):
-            log('%s takes insurance\n' % self.player.name)
+            if logger.decisionEnabled:
+                logger.decision('%s takes insurance\n', self.player.name)
             self.insured = True
             self.insurance = self.player.wager(
                 self.first_bet * cfg['INSURANCE_RATIO'])
@@ -379,8 +428,8 @@ class TableSlot:
     def promptBet(self, **kwargs):
         """Prompts player to bet"""
         amt = self.player.amountToBet(**kwargs)
-        if not self.player.isDealer:
-            log('%s bets $%d\n' % (self.player, amt))
+        if logger.decisionEnabled and not self.player.isDealer:
+            logger.decision('%s bets $%d\n', self.player, amt)
         self.pots[self.index] += self.player.wager(amt)
         if self.first_bet == 0:
             self.first_bet = amt
@@ -0,0 +1,232 @@
+"""
+Provides views rendering the events emitted by a blackjack table
+"""
+
+from abc import ABCMeta, abstractmethod
+
+class TableView(metaclass=ABCMeta):
+    """Base class for sinks of table events"""
+
+    @abstractmethod
+    def beginRound(self, table):
+        """Called at the start of each round, before bets are placed"""
+        raise NotImplementedError(
+            'TableView implementations must implement the beginRound method')
+
+    @abstractmethod
+    def dealerShows(self, upcard):
+        """Called once the dealer's up card is dealt"""
+        raise NotImplementedError(
+            'TableView implementations must implement the dealerShows method')
+
+    @abstractmethod
+    def dealerBlackjack(self):
+        """Called when the dealer is dealt a natural blackjack"""
+        raise NotImplementedError(
+            'TableView implementations must implement the dealerBlackjack method')
+
+    @abstractmethod
+    def playerBlackjack(self, slot):
+        """Called when slot's player is dealt a natural blackjack"""
+        raise NotImplementedError(
+            'TableView implementations must implement the playerBlackjack method')
+
+    @abstractmethod
+    def insured(self, slot, amount):
+        """Called when slot's insurance settles, paying amount against dealer
+           blackjack or losing its stake (amount negative) otherwise"""
+        raise NotImplementedError(
+            'TableView implementations must implement the insured method')
+
+    @abstractmethod
+    def beginTurn(self, slot):
+        """Called before slot's player (or the dealer) acts"""
+        raise NotImplementedError(
+            'TableView implementations must implement the beginTurn method')
+
+    @abstractmethod
+    def decision(self, slot, upcard, availableCommands, command):
+        """Called after slot's player chooses command"""
+        raise NotImplementedError(
+            'TableView implementations must implement the decision method')
+
+    @abstractmethod
+    def handEnd(self, slot, hand):
+        """Called once slot's player is done acting on hand"""
+        raise NotImplementedError(
+            'TableView implementations must implement the handEnd method')
+
+    @abstractmethod
+    def endTurn(self, slot):
+        """Called once slot's player (or the dealer) is done acting"""
+        raise NotImplementedError(
+            'TableView implementations must implement the endTurn method')
+
+    @abstractmethod
+    def settle(self, slot, amount):
+        """Called when a hand of slot's player is settled,
+           amount is positive for a win, negative for a loss, 0 for a push"""
+        raise NotImplementedError(
+            'TableView implementations must implement the settle method')
+
+    @abstractmethod
+    def endRound(self, table):
+        """Called once all bets of the round are settled"""
+        raise NotImplementedError(
+            'TableView implementations must implement the endRound method')
+
+class NullView(TableView):
+    """View that discards every event, for headless play"""
+
+    def beginRound(self, table):
+        """Does nothing"""
+        pass
+
+    def dealerShows(self, upcard):
+        """Does nothing"""
+        pass
+
+    def dealerBlackjack(self):
+        """Does nothing"""
+        pass
+
+    def playerBlackjack(self, slot):
+        """Does nothing"""
+        pass
+
+    def insured(self, slot, amount):
+        """Does nothing"""
+        pass
+
+    def beginTurn(self, slot):
+        """Does nothing"""
+        pass
+
+    def decision(self, slot, upcard, availableCommands, command):
+        """Does nothing"""
+        pass
+
+    def handEnd(self, slot, hand):
+        """Does nothing"""
+        pass
+
+    def endTurn(self, slot):
+        """Does nothing"""
+        pass
+
+    def settle(self, slot, amount):
+        """Does nothing"""
+        pass
+
+    def endRound(self, table):
+        """Does nothing"""
+        pass
+
+class ConsoleView(NullView):
+    """View that prints the table's progress to standard output"""
+
+    def beginRound(self, table):
+        """Prints round delimiter"""
+        print('>' * 80)
+
+    def dealerShows(self, upcard):
+        """Prints dealer's up card"""
+        print('Dealer shows', upcard.rank)
+
+    def dealerBlackjack(self):
+        """Prints dealer's blackjack"""
+        print('Dealer has blackjack')
+
+    def playerBlackjack(self, slot):
+        """Prints player's blackjack"""
+        print('BLACKJACK!')
+
+    def insured(self, slot, amount):
+        """Prints that player's insurance pays"""
+        if amount > 0:
+            print("You're insured though")
+
+    def beginTurn(self, slot):
+        """Prints whose turn it is"""
+        if slot.player.isDealer:
+            print('DEALER')
+        else:
+            print('PLAYER: %s' % slot.player.name)
+
+    def handEnd(self, slot, hand):
+        """Prints final value of hand"""
+        print('Hand ends at', hand.value)
+
+    def endTurn(self, slot):
+        """Prints turn delimiter"""
+        print()
+
+    def endRound(self, table):
+        """Prints each player's stack"""
+        for slot in table.occupied_slots:
+            print(slot.player)
+        print(table.dealer_slot.player)
+        print('<' * 80)
+
+class CompositeView(TableView):
+    """View forwarding every event to each of views in turn, so a table
+       can be watched by several views at once"""
+
+    def __init__(self, *views):
+        """Initializes members"""
+        self.views = list(views)
+
+    def beginRound(self, table):
+        """Forwards to every view"""
+        for view in self.views:
+            view.beginRound(table)
+
+    def dealerShows(self, upcard):
+        """Forwards to every view"""
+        for view in self.views:
+            view.dealerShows(upcard)
+
+    def dealerBlackjack(self):
+        """Forwards to every view"""
+        for view in self.views:
+            view.dealerBlackjack()
+
+    def playerBlackjack(self, slot):
+        """Forwards to every view"""
+        for view in self.views:
+            view.playerBlackjack(slot)
+
+    def insured(self, slot, amount):
+        """Forwards to every view"""
+        for view in self.views:
+            view.insured(slot, amount)
+
+    def beginTurn(self, slot):
+        """Forwards to every view"""
+        for view in self.views:
+            view.beginTurn(slot)
+
+    def decision(self, slot, upcard, availableCommands, command):
+        """Forwards to every view"""
+        for view in self.views:
+            view.decision(slot, upcard, availableCommands, command)
+
+    def handEnd(self, slot, hand):
+        """Forwards to every view"""
+        for view in self.views:
+            view.handEnd(slot, hand)
+
+    def endTurn(self, slot):
+        """Forwards to every view"""
+        for view in self.views:
+            view.endTurn(slot)
+
+    def settle(self, slot, amount):
+        """Forwards to every view"""
+        for view in self.views:
+            view.settle(slot, amount)
+
+    def endRound(self, table):
+        """Forwards to every view"""
+        for view in self.views:
+            view.endRound(table)
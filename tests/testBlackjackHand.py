@@ -167,6 +167,27 @@ class testBlackjackHand(unittest.TestCase):
         h.addCards(Card('A','S'), Card(4,'D'))
         h.reset()
         self.assertEqual(h.numCards,0,'testBlackjackHand:testReset:Reset hand should have no cards')
+        self.assertEqual(h.value,0,'testBlackjackHand:testReset:Reset hand should have value 0')
+        self.assertFalse(h.hasAce,'testBlackjackHand:testReset:Reset hand should have no aces')
+
+    def testHardValue(self):
+        h = BlackjackHand()
+        h.addCards(Card('A','S'), Card('A','D'), Card(6,'D'))
+        self.assertEqual(h.hardValue,8,'testBlackjackHand:testHardValue:Aces should count as one')
+        self.assertEqual(h.value,18,'testBlackjackHand:testHardValue:One ace should count as eleven')
+
+    def testSetCards(self):
+        h = BlackjackHand()
+        h.addCards(Card('A','S'), Card(4,'D'))
+        h.cards = [Card(10,'S'), Card(7,'D')]
+        self.assertEqual(h.value,17,'testBlackjackHand:testSetCards:Value should follow assigned cards')
+        self.assertFalse(h.isSoft,'testBlackjackHand:testSetCards:Softness should follow assigned cards')
+        h.cards = []
+        self.assertEqual(h.numCards,0,'testBlackjackHand:testSetCards:Assigned empty hand should have no cards')
+
+    def testSlots(self):
+        h = BlackjackHand()
+        self.assertRaises(AttributeError, setattr, h, 'extra', 1)
 
     def testStr(self):
         h = BlackjackHand()
@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from cards import Card
@@ -84,5 +85,25 @@ class testCard(unittest.TestCase):
         self.assertEqual(len(list(filter(lambda c:c.suit=='H',d))),13,'testCard:testMakeDeck:Deck should have 13 cards of hearts suit')
         self.assertEqual(len(list(filter(lambda c:c.rank=='A',d))),4,'testCard:testMakeDeck:Deck should have 4 aces')
 
+    def testInterned(self):
+        self.assertIs(Card(4,'H'),Card(4,'hearts'),'testCard:testInterned:Equal cards should be the same instance')
+        self.assertIs(Card.makeDeck()[0],Card(2,'S'),'testCard:testInterned:Deck should hold interned cards')
+        self.assertIs(pickle.loads(pickle.dumps(Card('A','S'))),Card('A','S'),'testCard:testInterned:Unpickled card should be interned')
+        self.assertRaises(AttributeError,setattr,Card(4,'H'),'extra',1)
+
+    def testCode(self):
+        codes = [c.code for c in Card.makeDeck()]
+        self.assertEqual(codes,list(range(52)),'testCard:testCode:Deck should be ordered by code')
+        for c in Card.makeDeck():
+            self.assertIs(Card.fromCode(c.code),c,'testCard:testCode:Code should map back to card')
+        self.assertEqual(Card('K','D').index,11,'testCard:testCode:King should have rank index 11')
+
+    def testValue(self):
+        self.assertEqual(Card('A','S').value,11,'testCard:testValue:Ace should be valued 11')
+        self.assertEqual(Card('Q','S').value,10,'testCard:testValue:Queen should be valued 10')
+        self.assertEqual(Card(7,'S').value,7,'testCard:testValue:7 should be valued 7')
+        self.assertEqual(Card('A','S').valueIndex,9,'testCard:testValue:Ace should be last value')
+        self.assertEqual(Card('J','S').valueIndex,Card(10,'S').valueIndex,'testCard:testValue:Tens should share value index')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from cards import BlackjackHand
+from chartgen import (action, generateChart, hardHand, twoCardHand, writeChart)
+from commands import Command
+from config import cfg
+from expectation import expectedValues
+from policies import StrategyChart
+
+class testChartGenerator(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        cfg.reset()
+
+    def testAction(self):
+        self.assertEqual(action({Command.HIT: 0.1, Command.STAND: 0.0, Command.DOUBLE: 0.2}), 'Dh', 'testChartGenerator:testAction:Double should fall back to hit')
+        self.assertEqual(action({Command.HIT: -0.1, Command.STAND: 0.0, Command.DOUBLE: 0.2}), 'Ds', 'testChartGenerator:testAction:Double should fall back to stand')
+        self.assertEqual(action({Command.HIT: -0.6, Command.STAND: -0.6, Command.SURRENDER: -0.5}), 'Su', 'testChartGenerator:testAction:Surrender should be Su')
+        self.assertEqual(action({Command.HIT: -0.6, Command.STAND: -0.6, Command.SPLIT: 0.1}), 'Sp', 'testChartGenerator:testAction:Split should be Sp')
+        self.assertEqual(action({Command.HIT: -0.7, Command.STAND: -0.6, Command.SURRENDER: -0.5}), 'Rs', 'testChartGenerator:testAction:Surrender should fall back to stand')
+        self.assertEqual(action({Command.HIT: -0.7, Command.STAND: -0.7, Command.SPLIT: -0.6, Command.SURRENDER: -0.5}), 'Rp', 'testChartGenerator:testAction:Surrender should fall back to split')
+
+    def testSurrenderFallback(self):
+        hand = hardHand(17)
+        evs = expectedValues(hand, 'A')
+        self.assertEqual(action(evs), 'Rs', 'testChartGenerator:testSurrenderFallback:Hard 17 vs A should surrender, else stand')
+        pair = twoCardHand(8, 8)
+        evs = expectedValues(pair, 'A')
+        self.assertEqual(action(evs), 'Rp', 'testChartGenerator:testSurrenderFallback:8,8 vs A should surrender, else split')
+        chart = StrategyChart(StrategyChart.Chart({(17, 'A'): 'Rs', (16, 'A'): 'Su'}), None,
+                              StrategyChart.Chart({(8, 'A'): 'Rp'}))
+        self.assertEqual(chart.advise(hand, 'A', [Command.HIT, Command.STAND, Command.SURRENDER]), Command.SURRENDER, 'testChartGenerator:testSurrenderFallback:Hard 17 vs A should surrender if allowed')
+        self.assertEqual(chart.advise(hand, 'A', [Command.HIT, Command.STAND]), Command.STAND, 'testChartGenerator:testSurrenderFallback:Hard 17 vs A should stand if surrender unavailable')
+        self.assertEqual(chart.advise(pair, 'A', [Command.HIT, Command.STAND, Command.SPLIT]), Command.SPLIT, 'testChartGenerator:testSurrenderFallback:8,8 vs A should split if surrender unavailable')
+        self.assertEqual(chart.advise(pair, 'A', [Command.HIT, Command.STAND]), Command.HIT, 'testChartGenerator:testSurrenderFallback:8,8 vs A should play as hard 16 if neither is available')
+
+    def testMatchesHandWrittenChart(self):
+        cfg.mergeFile('cfg/S17_false.ini')
+        expected = StrategyChart.fromFile('cfg/three_chart.txt')
+        chart = generateChart()
+        for up in BlackjackHand.VALUES:
+            for total in range(4, 21):
+                self.assertEqual(chart.hard_chart.access(total, up), expected.hard_chart.access(total, up), 'testChartGenerator:testMatchesHandWrittenChart:Hard %d vs %s' % (total, up))
+            for total in range(13, 21):
+                self.assertEqual(chart.soft_chart.access(total, up), expected.soft_chart.access(total, up), 'testChartGenerator:testMatchesHandWrittenChart:Soft %d vs %s' % (total, up))
+            for pair in BlackjackHand.VALUES:
+                self.assertEqual(chart.pair_chart.access(pair, up), expected.pair_chart.access(pair, up), 'testChartGenerator:testMatchesHandWrittenChart:Pair of %s vs %s' % (pair, up))
+
+    def testRoundTrip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'chart.txt')
+            writeChart(['cfg/S17_false.ini'], filename)
+            chart = StrategyChart.fromFile(filename)
+            self.assertEqual(repr(chart), repr(generateChart()), 'testChartGenerator:testRoundTrip:Written chart should parse back identically')
+        self.assertEqual(repr(StrategyChart(None, None, None)), '', 'testChartGenerator:testRoundTrip:Missing charts should be omitted')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from random import Random
+
+from game import Player
+from policies import (BasicStrategyPolicy,
+                      DeclineInsurancePolicy,
+                      MinBettingPolicy)
+from table import Table
+from view import (CompositeView, ConsoleView, NullView)
+
+class Recorder(NullView):
+    def __init__(self):
+        self.calls = []
+
+    def beginRound(self, table):
+        self.calls.append('beginRound')
+
+    def settle(self, slot, amount):
+        self.calls.append('settle')
+
+    def endRound(self, table):
+        self.calls.append('endRound')
+
+class testCompositeView(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def testPlay(self):
+        first, second = Recorder(), Recorder()
+        table = Table(1, CompositeView(first, ConsoleView(), second), rand=Random(2))
+        player = Player('Bot',
+                        BasicStrategyPolicy('cfg/three_chart.txt'),
+                        DeclineInsurancePolicy(),
+                        MinBettingPolicy())
+        player.receive_payment(100000)
+        table.register_player(player)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            for _ in range(10):
+                table.play()
+        self.assertEqual(first.calls.count('endRound'), 10, 'testCompositeView:testPlay:Every view should see every round')
+        self.assertIn('settle', first.calls, 'testCompositeView:testPlay:Every view should see settlements')
+        self.assertEqual(first.calls, second.calls, 'testCompositeView:testPlay:Views should see the same events')
+        self.assertIn('PLAYER: Bot', out.getvalue(), 'testCompositeView:testPlay:Console view should still print')
+
+if __name__ == '__main__':
+    unittest.main()
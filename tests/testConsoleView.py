@@ -0,0 +1,38 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from game import Player
+from policies import (BasicStrategyPolicy,
+                      DeclineInsurancePolicy,
+                      MinBettingPolicy)
+from table import Table
+from view import ConsoleView
+
+class testConsoleView(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def testPlay(self):
+        table = Table(view=ConsoleView())
+        player = Player('Bot',
+                        BasicStrategyPolicy('cfg/three_chart.txt'),
+                        DeclineInsurancePolicy(),
+                        MinBettingPolicy())
+        player.receive_payment(100000)
+        table.register_player(player)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            table.play()
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], '>' * 80, 'testConsoleView:testPlay:Round should begin with delimiter')
+        self.assertTrue(lines[1].startswith('Dealer shows'), 'testConsoleView:testPlay:Dealer up card should be shown')
+        self.assertEqual(lines[-1], '<' * 80, 'testConsoleView:testPlay:Round should end with delimiter')
+        self.assertEqual(lines[-2], str(table.dealer_slot.player), 'testConsoleView:testPlay:Dealer should be shown at end of round')
+        self.assertEqual(lines[-3], str(player), 'testConsoleView:testPlay:Players should be shown at end of round')
+
+if __name__ == '__main__':
+    unittest.main()
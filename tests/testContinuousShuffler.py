@@ -0,0 +1,68 @@
+from random import Random
+import unittest
+
+from cards import ContinuousShuffler
+from config import cfg
+from table import Table
+from view import NullView
+
+class Observer:
+    def __init__(self):
+        self.events = []
+
+    def update(self, card):
+        self.events.append(card)
+
+class testContinuousShuffler(unittest.TestCase):
+    def setUp(self):
+        self.csm = ContinuousShuffler(1, delay=1, rand=Random(2))
+        self.csm.shuffle()
+
+    def tearDown(self):
+        cfg.reset()
+
+    def testDeal(self):
+        self.assertEqual(self.csm.numCardsRemainingInShoe, 52, 'testContinuousShuffler:testDeal:Loaded machine should hold every card without burning')
+        cards = self.csm.deal(52)
+        self.assertEqual(sorted(c.code for c in cards), list(range(52)), 'testContinuousShuffler:testDeal:Machine should deal every card once')
+        self.assertNotEqual([c.code for c in cards], list(range(52)), 'testContinuousShuffler:testDeal:Machine should draw at random')
+        self.assertTrue(self.csm.isEmpty, 'testContinuousShuffler:testDeal:Dealt machine should be empty')
+        self.assertFalse(self.csm.isExhausted, 'testContinuousShuffler:testDeal:Machine should never need a shuffle')
+        self.assertRaises(ValueError, self.csm.dealOneCard)
+
+    def testCollect(self):
+        first = self.csm.deal(5)
+        self.csm.collect()
+        self.assertEqual(self.csm.numCardsRemainingInShoe, 47, 'testContinuousShuffler:testCollect:Discards should be held for delay rounds')
+        self.csm.deal(3)
+        self.csm.collect()
+        self.assertEqual(self.csm.numCardsRemainingInShoe, 49, 'testContinuousShuffler:testCollect:Discards should return after delay rounds')
+        self.assertEqual(sum(self.csm.composition), 49, 'testContinuousShuffler:testCollect:Composition should count cards in machine')
+        for card in first:
+            self.assertIn(card.code, self.csm.codes, 'testContinuousShuffler:testCollect:Returned discards should be in machine')
+
+    def testEmptyReleasesDiscards(self):
+        self.csm.deal(50)
+        self.csm.collect()
+        cards = self.csm.deal(10)
+        self.assertEqual(len(cards), 10, 'testContinuousShuffler:testEmptyReleasesDiscards:Empty machine should take back held discards')
+
+    def testObservers(self):
+        observer = Observer()
+        self.csm.registerObserver(observer)
+        self.csm.shuffle()
+        card = self.csm.dealOneCard()
+        self.csm.dealOneCard(False)
+        self.assertEqual(observer.events, [None, card], 'testContinuousShuffler:testObservers:Observers should see load and visible cards')
+
+    def testTable(self):
+        cfg.mergeFile('cfg/csm.ini')
+        table = Table(1, NullView(), rand=Random(4))
+        self.assertTrue(isinstance(table.shoe, ContinuousShuffler), 'testContinuousShuffler:testTable:Table should deal from a machine')
+        for _ in range(20):
+            table.play()
+            held = sum(len(d) for d in table.shoe.held)
+            self.assertEqual(table.shoe.numCardsRemainingInShoe + held, cfg['NUM_DECKS'] * 52, 'testContinuousShuffler:testTable:Cards should be in machine or held after each round')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import io
+import os
+from random import Random
+import shutil
+import tempfile
+import unittest
+
+from commands import Command
+from config import cfg
+from events import (BinaryEncoding,
+                    Event,
+                    EventStream,
+                    EventView,
+                    JsonLinesEncoding,
+                    readEvents)
+from policies import InsurancePolicy
+from simulation import (PlayerSpec, ResultView, SimulationResult, TableSpec)
+from view import CompositeView
+
+class AlwaysInsure(InsurancePolicy):
+    def insure(self, hand, **kwargs):
+        return True
+
+class FailingEncoding(BinaryEncoding):
+    def encode(self, event):
+        raise ValueError('Unencodable event')
+
+class testEvents(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.spec = TableSpec([PlayerSpec('Bot', 'cfg/three_chart.txt')] * 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+        cfg.reset()
+
+    def play(self, filename, rounds=50):
+        with EventStream(os.path.join(self.dir, filename), maxsize=2) as stream:
+            table = self.spec.build(EventView(stream), Random(8))
+            for _ in range(rounds):
+                table.play()
+        return list(readEvents(os.path.join(self.dir, filename)))
+
+    def testStream(self):
+        events = self.play('events.jsonl')
+        self.assertEqual(events, self.play('events.bin'), 'testEvents:testStream:Encodings should record the same events')
+        ends = [e for e in events if e['event'] == Event.ROUND_END]
+        self.assertEqual([e['round'] for e in ends], list(range(50)), 'testEvents:testStream:Every round should end')
+        deals = [e for e in events if e['event'] == Event.DEAL]
+        self.assertEqual(len(deals), 100, 'testEvents:testStream:Each player should be dealt every round')
+        for e in events:
+            if e['event'] == Event.DECISION:
+                self.assertIn(e['command'], e['available'], 'testEvents:testStream:Command chosen should be available')
+                self.assertIn(e['seat'], (-1, 0, 1), 'testEvents:testStream:Decisions should be made at seats')
+
+    def testInsurance(self):
+        filename = os.path.join(self.dir, 'events.bin')
+        result = SimulationResult()
+        with EventStream(filename) as stream:
+            table = self.spec.build(CompositeView(ResultView(result), EventView(stream)), Random(4))
+            players = [slot.player for slot in table.occupied_slots]
+            stacks = [p.stack.amount for p in players]
+            for player in players:
+                player.insurance_policy = AlwaysInsure()
+            for _ in range(300):
+                table.play()
+        events = list(readEvents(filename))
+        insurance = [e['amount'] for e in events if e['event'] == Event.INSURANCE]
+        self.assertTrue(any(a < 0 for a in insurance), 'testEvents:testInsurance:Lost insurance should be recorded')
+        self.assertTrue(any(a > 0 for a in insurance), 'testEvents:testInsurance:Paid insurance should be recorded')
+        settled = sum(e['amount'] for e in events if e['event'] in (Event.SETTLE, Event.INSURANCE))
+        self.assertEqual(settled, sum(p.stack.amount for p in players) - sum(stacks), 'testEvents:testInsurance:Events should account for every dollar won or lost')
+        self.assertEqual(result.rounds, 300, 'testEvents:testInsurance:Composite view should feed every view')
+
+    def testWriteError(self):
+        stream = EventStream(os.path.join(self.dir, 'events.bin'), FailingEncoding(), maxsize=1)
+        with self.assertRaises(ValueError, msg='testEvents:testWriteError:Write should raise the writer\'s error'):
+            for _ in range(10):
+                stream.write([{'event' : Event.ROUND_END, 'round' : 0, 'seat' : -1}])
+        with self.assertRaises(ValueError, msg='testEvents:testWriteError:Close should raise the writer\'s error'):
+            stream.close()
+        self.assertIsNone(stream.file, 'testEvents:testWriteError:Close should close the file')
+
+    def testEncodings(self):
+        event = {'event' : Event.DECISION, 'round' : 7, 'seat' : 2, 'hand' : 1,
+                 'upcard' : 51, 'cards' : [0, 47], 'available' : [Command.HIT, Command.STAND],
+                 'command' : Command.STAND}
+        settle = {'event' : Event.SETTLE, 'round' : 7, 'seat' : -1, 'hand' : 0, 'amount' : -7.5}
+        for encoding in (JsonLinesEncoding(), BinaryEncoding()):
+            data = encoding.encode(event) + encoding.encode(settle)
+            self.assertEqual(list(encoding.decode(io.BytesIO(data))), [event, settle], 'testEvents:testEncodings:Events should survive encoding')
+        self.assertLess(len(BinaryEncoding().encode(event)), len(JsonLinesEncoding().encode(event)) / 5, 'testEvents:testEncodings:Binary encoding should be compact')
+
+if __name__ == '__main__':
+    unittest.main()
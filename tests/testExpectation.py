@@ -0,0 +1,90 @@
+import unittest
+
+from cards import (BlackjackHand, Card)
+from commands import Command
+from config import cfg
+from expectation import (bestCommand, expectedValues, splitEV)
+
+def hand(*ranks):
+    h = BlackjackHand()
+    h.addCards(*(Card(r, 'S') for r in ranks))
+    return h
+
+class testExpectation(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        cfg.reset()
+
+    def testBasicStrategy(self):
+        self.assertEqual(bestCommand(expectedValues(hand(10, 6), 10)), Command.SURRENDER, 'testExpectation:testBasicStrategy:16 vs 10 should surrender')
+        self.assertEqual(bestCommand(expectedValues(hand(5, 6), 6)), Command.DOUBLE, 'testExpectation:testBasicStrategy:11 vs 6 should double')
+        self.assertEqual(bestCommand(expectedValues(hand(10, 2), 4)), Command.STAND, 'testExpectation:testBasicStrategy:12 vs 4 should stand')
+        self.assertEqual(bestCommand(expectedValues(hand(10, 2), 2)), Command.HIT, 'testExpectation:testBasicStrategy:12 vs 2 should hit')
+        self.assertEqual(bestCommand(expectedValues(hand('A', 7), 9)), Command.HIT, 'testExpectation:testBasicStrategy:Soft 18 vs 9 should hit')
+        self.assertEqual(bestCommand(expectedValues(hand(10, 8, 2), 'A')), Command.STAND, 'testExpectation:testBasicStrategy:20 vs A should stand')
+
+    def testKnownValues(self):
+        evs = expectedValues(hand(10, 6), 10)
+        self.assertAlmostEqual(evs[Command.STAND], -0.541, 3, 'testExpectation:testKnownValues:Stand EV of 16 vs 10 is about -0.541')
+        self.assertAlmostEqual(evs[Command.HIT], -0.534, 2, 'testExpectation:testKnownValues:Hit EV of 16 vs 10 is about -0.534')
+        self.assertEqual(evs[Command.SURRENDER], -0.5, 'testExpectation:testKnownValues:Surrender EV should be the surrender ratio')
+        exact = expectedValues(hand(10, 6), 10, exact=True)
+        self.assertAlmostEqual(evs[Command.HIT], exact[Command.HIT], 2, 'testExpectation:testKnownValues:Exact dealer outcomes should barely move the EV')
+
+    def testComposition(self):
+        tens = (0, 0, 0, 0, 0, 0, 0, 0, 20, 0)
+        evs = expectedValues(hand(10, 9), 7, tens)
+        self.assertEqual(evs[Command.STAND], 1.0, 'testExpectation:testComposition:19 vs 7 should win when dealer can only make 17')
+        self.assertEqual(evs[Command.HIT], -1.0, 'testExpectation:testComposition:19 should bust drawing a ten')
+        self.assertEqual(evs[Command.DOUBLE], -2.0, 'testExpectation:testComposition:Doubling 19 should lose double when drawing a ten')
+
+    def testAvailability(self):
+        self.assertEqual(list(expectedValues(hand(10, 5, 6), 7)), [Command.STAND], 'testExpectation:testAvailability:21 should only stand')
+        self.assertNotIn(Command.DOUBLE, expectedValues(hand(10, 3, 2), 7), 'testExpectation:testAvailability:Double should require two cards')
+        cfg.mergeFile('cfg/no_surrender.ini')
+        self.assertNotIn(Command.SURRENDER, expectedValues(hand(10, 6), 10), 'testExpectation:testAvailability:Surrender should follow configuration')
+        cfg.mergeFile('cfg/double_totals.ini')
+        self.assertNotIn(Command.DOUBLE, expectedValues(hand(10, 2), 6), 'testExpectation:testAvailability:Double should follow allowed totals')
+        self.assertIn(Command.DOUBLE, expectedValues(hand(5, 6), 6), 'testExpectation:testAvailability:Double should follow allowed totals')
+        cfg.mergeFile('cfg/DAS_false.ini')
+        split = hand(5, 6)
+        split.wasSplit = True
+        self.assertNotIn(Command.DOUBLE, expectedValues(split, 6), 'testExpectation:testAvailability:Double after split should follow configuration')
+
+    def testSplit(self):
+        self.assertEqual(bestCommand(expectedValues(hand(8, 8), 10)), Command.SPLIT, 'testExpectation:testSplit:8s vs 10 should split')
+        self.assertEqual(bestCommand(expectedValues(hand('A', 'A'), 6)), Command.SPLIT, 'testExpectation:testSplit:Aces vs 6 should split')
+        self.assertEqual(bestCommand(expectedValues(hand(10, 10), 6)), Command.STAND, 'testExpectation:testSplit:Tens vs 6 should stand')
+        self.assertAlmostEqual(splitEV(8, 10), -0.48, 1, 'testExpectation:testSplit:Split EV of 8s vs 10 is about -0.48')
+        self.assertAlmostEqual(splitEV('A', 6), expectedValues(hand('A', 'A'), 6)[Command.SPLIT], 10, 'testExpectation:testSplit:splitEV should match expectedValues')
+        self.assertNotIn(Command.SPLIT, expectedValues(hand(10, 'K'), 6), 'testExpectation:testSplit:Pairs should follow configuration')
+
+    def testResplitRules(self):
+        tens = splitEV(10, 6)
+        aces = splitEV('A', 6)
+        nines = splitEV(9, 6)
+        cfg.mergeFile('cfg/resplit_aces.ini')
+        self.assertLess(splitEV('A', 6), aces, 'testExpectation:testResplitRules:Resplitting aces should add value')
+        self.assertEqual(splitEV(9, 6), nines, 'testExpectation:testResplitRules:Resplitting aces should not affect other pairs')
+        cfg.mergeFile('cfg/DAS_false.ini')
+        self.assertLess(splitEV(9, 6), nines, 'testExpectation:testResplitRules:Doubling after split should add value')
+        cfg.mergeFile('cfg/resplit_upto.ini')
+        self.assertNotIn(Command.SPLIT, expectedValues(hand(8, 8), 10), 'testExpectation:testResplitRules:Splitting should follow configuration')
+        cfg.reset()
+        cfg.mergeFile('cfg/split_by_value.ini')
+        self.assertIn(Command.SPLIT, expectedValues(hand(10, 'K'), 6), 'testExpectation:testResplitRules:Pairs by value should split')
+        self.assertAlmostEqual(splitEV(10, 6), tens, 2, 'testExpectation:testResplitRules:Tens are best not resplit either way')
+
+    def testSplitComposition(self):
+        eights = (0, 0, 0, 0, 0, 0, 20, 0, 0, 0)
+        # Every hand draws an 8 to resplit until RESPLIT_UP_TO is reached,
+        # then each 16 stands against a dealer drawing to 7 + 8 + 8 = 23
+        self.assertAlmostEqual(splitEV(8, 7, eights), 5.0, 10, 'testExpectation:testSplitComposition:Every resplit hand should win')
+
+    def testBust(self):
+        self.assertRaises(ValueError, expectedValues, hand(10, 6, 8), 7)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,80 @@
 import unittest
 
+from cards import (Card, Shoe)
+from config import cfg
+from policies import CardCount
+
+def cards(*ranks):
+    return [Card(r, 'S') for r in ranks]
+
 class testHiLoCounting(unittest.TestCase):
     def setUp(self):
-        pass
+        self.systems = dict(CardCount.systems)
 
     def tearDown(self):
-        pass
+        CardCount.systems = self.systems
+        cfg.reset()
+
+    def testRunningCount(self):
+        counter = CardCount('HiLoCount')
+        for card in cards(2, 5, 'K', 7, 'A', 3, 4):
+            counter.update(card)
+        self.assertEqual(counter.count, 2, 'testHiLoCounting:testRunningCount:Hi-Lo count of 2,5,K,7,A,3,4 should be 2')
+        self.assertEqual(counter.counts, {'HiLoCount': 2}, 'testHiLoCounting:testRunningCount:Only requested systems should be counted')
+        counter.update(None)
+        self.assertEqual(counter.count, 0, 'testHiLoCounting:testRunningCount:Shuffle should reset count')
+
+    def testSelectedSystems(self):
+        counter = CardCount('ZenCount', 'HiLoCount')
+        for card in cards(4, 'A', 10):
+            counter.update(card)
+        self.assertEqual(counter.count, -1, 'testHiLoCounting:testSelectedSystems:First system should be the default count')
+        self.assertEqual(counter.runningCount('HiLoCount'), -1, 'testHiLoCounting:testSelectedSystems:Hi-Lo count of 4,A,10 should be -1')
+        self.assertEqual(len(CardCount().counts), len(CardCount.systems), 'testHiLoCounting:testSelectedSystems:Every system should be counted by default')
+        self.assertRaises(ValueError, CardCount, 'NoSuchCount')
+
+    def testVectorized(self):
+        plain = CardCount()
+        vector = CardCount(vectorized=True)
+        for card in Card.makeDeck()[:30]:
+            plain.update(card)
+            vector.update(card)
+        self.assertEqual(plain.counts, vector.counts, 'testHiLoCounting:testVectorized:Vectorized counts should match')
+
+    def testTrueCount(self):
+        shoe = Shoe(6, lambda codes: sorted(codes))
+        counter = CardCount('HiLoCount', shoe=shoe)
+        shoe.shuffle()
+        # A 2 is burned, then 104 cards from 2 to 6 are dealt
+        shoe.deal(104)
+        self.assertEqual(counter.count, 104, 'testHiLoCounting:testTrueCount:Running count should follow visible cards')
+        self.assertEqual(counter.decksRemaining(), 4.0, 'testHiLoCounting:testTrueCount:About four decks should remain')
+        self.assertEqual(counter.trueCount(), 26, 'testHiLoCounting:testTrueCount:True count should be per deck remaining')
+        shoe.deal(20)
+        self.assertEqual(counter.count, 119, 'testHiLoCounting:testTrueCount:Sevens should not count')
+        self.assertEqual(counter.decksRemaining(), 3.5, 'testHiLoCounting:testTrueCount:Estimate should round to half decks')
+        self.assertEqual(counter.decksRemaining(1), 4, 'testHiLoCounting:testTrueCount:Estimate should follow resolution')
+        self.assertRaises(ValueError, CardCount().trueCount)
+
+    def testBatched(self):
+        shoe = Shoe(1, lambda codes: sorted(codes))
+        counter = CardCount('HiLoCount', shoe=shoe, batched=True)
+        vector = CardCount('HiLoCount', shoe=shoe, batched=True, vectorized=True)
+        shoe.shuffle()
+        shoe.deal(6)
+        self.assertEqual(counter.count, 0, 'testHiLoCounting:testBatched:Batched count should wait for round end')
+        shoe.collect()
+        self.assertEqual(counter.count, 6, 'testHiLoCounting:testBatched:Round end should count the round')
+        self.assertEqual(vector.count, 6, 'testHiLoCounting:testBatched:Vectorized batches should match')
 
-    def test(self):
-        #self.fail('Implement test HiLoCounting')
-        pass
+    def testLoadSystems(self):
+        names = CardCount.loadSystems('cfg/count_systems.txt')
+        self.assertEqual(names, ['Halves', 'UstonAPC'], 'testHiLoCounting:testLoadSystems:Systems should be loaded in order')
+        self.assertEqual(CardCount.systems['Halves'][8:12], [-1] * 4, 'testHiLoCounting:testLoadSystems:Ten weight should apply to every ten rank')
+        counter = CardCount('Halves')
+        for card in cards(2, 5, 9):
+            counter.update(card)
+        self.assertEqual(counter.count, 1.5, 'testHiLoCounting:testLoadSystems:Halves count of 2,5,9 should be 1.5')
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,184 @@
+import os
+from random import Random
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from cards import Card
+from commands import Command
+from config import cfg
+from history import (Flag,
+                     HandClass,
+                     History,
+                     HistoryIndex,
+                     HistoryView,
+                     HistoryWriter,
+                     RECORD,
+                     actionsOf,
+                     cardsOf,
+                     decisionKeys,
+                     decisionResults,
+                     indexFilename)
+from policies import (CardCount, InsurancePolicy)
+from simulation import (PlayerSpec, TableSpec)
+
+class AlwaysInsure(InsurancePolicy):
+    def insure(self, hand, **kwargs):
+        return True
+
+class testHistory(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'history.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+        cfg.reset()
+
+    def testRecord(self):
+        self.assertLessEqual(RECORD.itemsize, 48, 'testHistory:testRecord:Records should take a few dozen bytes')
+
+    def testPlay(self):
+        spec = TableSpec([PlayerSpec('Bot', 'cfg/three_chart.txt')] * 2)
+        view = HistoryView(HistoryWriter(self.filename), flush=7)
+        table = spec.build(view, Random(3))
+        view.counter = CardCount('HiLoCount', shoe=table.shoe)
+        stacks = [s.player.stack.amount for s in table.occupied_slots]
+        next(table.occupied_slots).player.insurance_policy = AlwaysInsure()
+        for _ in range(300):
+            table.play()
+        view.close()
+        won = sum(s.player.stack.amount for s in table.occupied_slots) - sum(stacks)
+        with History(self.filename) as history:
+            self.assertGreaterEqual(len(history), 600, 'testHistory:testPlay:Every hand should be recorded')
+            self.assertEqual(history['round'][-1], 299, 'testHistory:testPlay:Rounds should be numbered')
+            self.assertAlmostEqual(float(history['result'].sum() + history['insurance'].sum()), won, msg='testHistory:testPlay:Results should sum to winnings')
+            self.assertFalse(np.isnan(history['true_count']).any(), 'testHistory:testPlay:True count should be recorded')
+            insured = history[(history['flags'] & Flag.INSURED) != 0]
+            self.assertTrue((insured['insurance'] < 0).any(), 'testHistory:testPlay:Lost insurance should be recorded')
+            self.assertTrue((insured['seat'] == 0).all(), 'testHistory:testPlay:Only the insuring seat should be insured')
+            for rnd in range(300):
+                totals = history['dealer_total'][history['round'] == rnd]
+                self.assertTrue((totals == totals[0]).all(), 'testHistory:testPlay:Every hand of round %d should have the final dealer total' % rnd)
+            busted = history[(history['flags'] & Flag.BUST) != 0]
+            self.assertTrue((busted['dealer_total'] >= 17).all(), 'testHistory:testPlay:Busted hands should record the total the dealer drew to')
+            for record in history[:50]:
+                cards = cardsOf(record)
+                self.assertEqual(len(cards), record['num_cards'], 'testHistory:testPlay:Cards should be kept')
+                if not record['flags'] & Flag.BUST and record['total'] <= 21:
+                    self.assertTrue(all(a in Command.commands for a in actionsOf(record)), 'testHistory:testPlay:Actions should be commands')
+            doubled = history[(history['flags'] & Flag.DOUBLED) != 0]
+            self.assertTrue((doubled['num_cards'] == 3).all() or (doubled['flags'] & Flag.SPLIT).any(), 'testHistory:testPlay:Doubled hands should draw one card')
+            chunks = list(history.chunks('result', 100))
+            self.assertTrue(all(len(c) == 100 for c in chunks[:-1]), 'testHistory:testPlay:Columns should be read in chunks')
+            self.assertTrue((np.concatenate(chunks) == history['result']).all(), 'testHistory:testPlay:Chunks should cover the column')
+
+    def record(self, ranks, actions, upcard=10, count=0.0, result=-1):
+        record = np.zeros(1, dtype=RECORD)
+        codes = [Card(r, 'S').code for r in ranks]
+        record['cards'][0, :len(codes)] = codes
+        record['num_cards'] = len(codes)
+        record['actions'][0, :len(actions)] = actions
+        record['num_actions'] = len(actions)
+        record['upcard'] = Card(upcard, 'H').code
+        record['true_count'] = count
+        record['result'] = result
+        return record
+
+    def testDecisionKeys(self):
+        records = np.concatenate([self.record([10, 6, 5], [Command.HIT, Command.STAND]),
+                                  self.record(['A', 5, 2], [Command.DOUBLE], upcard=6),
+                                  self.record([8, 8], [Command.SPLIT, Command.SURRENDER], count=3.7)])
+        keys, rows, steps = decisionKeys(records)
+        parts = list(zip(*[p.tolist() for p in HistoryIndex.unpack(keys)]))
+        self.assertEqual(sorted(zip(rows.tolist(), steps.tolist(), parts)), [
+            (0, 0, (HandClass.HARD, 16, 8, Command.HIT, 0)),
+            (0, 1, (HandClass.HARD, 21, 8, Command.STAND, 0)),
+            (1, 0, (HandClass.SOFT, 16, 4, Command.DOUBLE, 0)),
+            (2, 0, (HandClass.PAIR, 16, 8, Command.SPLIT, 3)),
+            (2, 1, (HandClass.PAIR, 16, 8, Command.SURRENDER, 3))], 'testHistory:testDecisionKeys:Decisions should be keyed by the hand they are taken on')
+
+    def testPairs(self):
+        records = np.concatenate([self.record(['K', 'Q'], [Command.STAND]),
+                                  self.record(['K', 'K'], [Command.STAND])])
+        classes = HistoryIndex.unpack(decisionKeys(records)[0])[0].tolist()
+        self.assertEqual(classes, [HandClass.HARD, HandClass.PAIR], 'testHistory:testPairs:Different ten-cards should not pair by rank')
+        cfg.mergeFile('cfg/split_by_value.ini')
+        classes = HistoryIndex.unpack(decisionKeys(records)[0])[0].tolist()
+        self.assertEqual(classes, [HandClass.PAIR, HandClass.PAIR], 'testHistory:testPairs:Ten-cards should pair by value')
+
+    def testSplitResults(self):
+        S, H, P = Command.STAND, Command.HIT, Command.SPLIT
+        hands = [
+            # Round 0: split, resplit of hand 0, hands ordered as dealt
+            (0, 0, [8, 8], [P, P, S], 1), (0, 1, [8, 2], [S], 2), (0, 2, [8, 3], [H, S], 4),
+            # Round 1: split, then the second hand splits again
+            (1, 0, [8, 8], [P, S], 8), (1, 1, [8, 8], [P, S], 16), (1, 2, [8, 5], [S], 32),
+            # Round 2: no split
+            (2, 0, [10, 6], [S], -1)]
+        records = []
+        for (rnd, hand, ranks, actions, result) in hands:
+            record = self.record(ranks, actions, result=result)
+            record['round'] = rnd
+            record['hand'] = hand
+            records.append(record)
+        records = np.concatenate(records)[::-1]
+        keys, rows, steps = decisionKeys(records)
+        results = decisionResults(records, rows, steps)
+        byDecision = {(int(records['round'][r]), int(records['hand'][r]), int(j)) : res
+                      for (r, j, res) in zip(rows, steps, results)}
+        self.assertEqual(byDecision[(0, 0, 0)], 7, 'testHistory:testSplitResults:First split should sum every hand')
+        self.assertEqual(byDecision[(0, 0, 1)], 3, 'testHistory:testSplitResults:Resplit should sum the hand and the hand it produced')
+        self.assertEqual(byDecision[(1, 0, 0)], 56, 'testHistory:testSplitResults:Split should include hands split from its hands')
+        self.assertEqual(byDecision[(1, 1, 0)], 48, 'testHistory:testSplitResults:Later split should sum its own hands')
+        self.assertEqual(byDecision[(0, 2, 0)], 4, 'testHistory:testSplitResults:Other decisions should keep their hand result')
+        self.assertEqual(byDecision[(2, 0, 0)], -1, 'testHistory:testSplitResults:Rounds without splits should be unchanged')
+
+    def testIndex(self):
+        spec = TableSpec([PlayerSpec('Bot', 'cfg/three_chart.txt')] * 3)
+        view = HistoryView(HistoryWriter(self.filename, index=True), flush=50)
+        table = spec.build(view, Random(11))
+        view.counter = CardCount('HiLoCount', shoe=table.shoe)
+        for _ in range(500):
+            table.play()
+        view.close()
+        self.assertTrue(os.path.exists(indexFilename(self.filename)), 'testHistory:testIndex:Index should be written beside history')
+        with History(self.filename) as history:
+            keys, rows, steps = decisionKeys(history.records)
+            parts = HistoryIndex.unpack(keys)
+            for query in ({'handClass' : HandClass.HARD, 'total' : 16, 'upcard' : 8},
+                          {'command' : Command.DOUBLE},
+                          {'minBucket' : 2},
+                          {'handClass' : HandClass.SOFT, 'command' : Command.STAND, 'maxBucket' : -1},
+                          {'command' : Command.SPLIT}):
+                mask = np.ones(len(keys), dtype=bool)
+                for (i, name) in enumerate(('handClass', 'total', 'upcard', 'command')):
+                    if name in query:
+                        mask &= parts[i] == query[name]
+                if 'minBucket' in query:
+                    mask &= parts[4] >= query['minBucket']
+                if 'maxBucket' in query:
+                    mask &= (parts[4] <= query['maxBucket']) & (parts[4] != -128)
+                expected = np.unique(rows[mask])
+                self.assertEqual(history.index.lookup(**query).tolist(), expected.tolist(), 'testHistory:testIndex:Lookup should find matching records for %s' % query)
+                self.assertGreater(len(expected), 0, 'testHistory:testIndex:Query %s should match records' % query)
+                n, mean, _ = history.index.aggregate(**query)
+                results = decisionResults(history.records, rows, steps)[mask]
+                self.assertEqual(n, mask.sum(), 'testHistory:testIndex:Aggregate should count matching decisions')
+                self.assertAlmostEqual(mean, float(results.astype(float).mean()), msg='testHistory:testIndex:Aggregate should average results')
+            surrendered = history.query(handClass=HandClass.HARD, total=16, upcard=8, command=Command.SURRENDER)
+            self.assertTrue(((surrendered['flags'] & Flag.SURRENDERED) != 0).all(), 'testHistory:testIndex:Query should return matching records')
+
+    def testInvalid(self):
+        with open(self.filename, 'wb') as fp:
+            fp.write(b'hand history')
+        self.assertRaises(ValueError, History, self.filename)
+        writer = HistoryWriter(self.filename)
+        writer.close()
+        with History(self.filename) as history:
+            self.assertEqual(len(history), 0, 'testHistory:testInvalid:Empty history should have no records')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from random import Random
+
+from cards import (Card, Shoe)
+from commands import Command
+from config import cfg
+from game import Player
+from lockstep import (CompiledStrategy, LockstepEngine)
+from policies import (BasicStrategyPolicy,
+                      DeclineInsurancePolicy,
+                      MinBettingPolicy,
+                      StrategyChart)
+import rng
+from table import Table
+from view import NullView
+
+class testLockstepEngine(unittest.TestCase):
+    def setUp(self):
+        self.chart = StrategyChart.fromFile('cfg/no_pair.txt')
+
+    def tearDown(self):
+        cfg.reset()
+        rng.seed()
+
+    def testCompile(self):
+        compiled = CompiledStrategy(self.chart)
+        self.assertEqual(compiled.first[8, 4, 8], Command.SURRENDER, 'testLockstepEngine:testCompile:Hard 16 vs 10 should surrender')
+        self.assertEqual(compiled.first[7, 0, 5], Command.DOUBLE, 'testLockstepEngine:testCompile:Hard 11 vs 7 should double')
+        self.assertEqual(compiled.later[0, 16, 8], Command.HIT, 'testLockstepEngine:testCompile:Hard 16 vs 10 should hit after first action')
+        self.assertEqual(compiled.later[1, 18, 1], Command.STAND, 'testLockstepEngine:testCompile:Soft 18 vs 3 should stand after first action')
+
+    def testMatchesTable(self):
+        order = Card.makeDeck() * cfg['NUM_DECKS']
+        Random(3).shuffle(order)
+        table = Table(1, NullView(), lambda cards: list(order))
+        player = Player('Bot',
+                        BasicStrategyPolicy('cfg/no_pair.txt'),
+                        DeclineInsurancePolicy(),
+                        MinBettingPolicy())
+        player.receive_payment(100000)
+        table.register_player(player)
+        engine = LockstepEngine(self.chart, 1, seed=0)
+        engine.loadShoe(0, [c.index for c in order], table.shoe.index)
+        for i in range(30):
+            before = player.stack.amount
+            table.play()
+            engine.playRound()
+            self.assertEqual(engine.lastNet[0], player.stack.amount - before, 'testLockstepEngine:testMatchesTable:Round %d should match Table' % i)
+            self.assertEqual(engine.positions[0], table.shoe.index, 'testLockstepEngine:testMatchesTable:Round %d should deal same cards as Table' % i)
+
+    def testCutIndex(self):
+        for cut in (0, -30, 200):
+            cfg['CUT_INDEX'] = cut
+            shoe = Shoe(cfg['NUM_DECKS'], None, cfg['CUT_INDEX'])
+            self.assertEqual(LockstepEngine(self.chart, 1, seed=0).cutIndex, shoe.cutIndex, 'testLockstepEngine:testCutIndex:Cut index %d should be placed as in Shoe' % cut)
+
+    def testPlay(self):
+        engine = LockstepEngine(self.chart, 500, seed=1)
+        result = engine.play(20)
+        self.assertEqual(result.rounds, 10000, 'testLockstepEngine:testPlay:Every table should play every round')
+        self.assertEqual(result.hands, result.wins + result.losses + result.pushes, 'testLockstepEngine:testPlay:Every hand should be won, lost or pushed')
+        self.assertLess(abs(result.unitsPerHand), 0.1, 'testLockstepEngine:testPlay:Result should be near even')
+        again = LockstepEngine(self.chart, 500, seed=1).play(20)
+        self.assertEqual(result, again, 'testLockstepEngine:testPlay:Seeded engines should agree')
+
+    def testMasterSeed(self):
+        rng.seed(5)
+        result = LockstepEngine(self.chart, 50).play(10)
+        self.assertEqual(result.seed, 5, 'testLockstepEngine:testMasterSeed:Engine should report the master seed')
+        rng.seed(5)
+        self.assertEqual(LockstepEngine(self.chart, 50).play(10), result, 'testLockstepEngine:testMasterSeed:Master seed should reproduce the engine')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from config import (cfg, SemanticConfigError)
+import log
+from log import (Logger, LogWriter)
+
+class Unprintable:
+    def __str__(self):
+        raise AssertionError('formatted')
+
+class testLog(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'log.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+        cfg.reset()
+
+    def read(self, filename):
+        opener = gzip.open if filename.endswith('.gz') else open
+        with opener(filename, 'rt') as fp:
+            return fp.read()
+
+    def testWrite(self):
+        writer = LogWriter(self.filename, interval=60)
+        for i in range(100):
+            writer.write('%d\n' % i)
+        writer.flush()
+        self.assertEqual(self.read(self.filename), ''.join('%d\n' % i for i in range(100)), 'testLog:testWrite:Flush should write queued messages in order')
+        writer.write('end\n')
+        writer.close()
+        self.assertTrue(self.read(self.filename).endswith('99\nend\n'), 'testLog:testWrite:Close should write queued messages')
+        self.assertFalse(writer.thread.is_alive(), 'testLog:testWrite:Close should stop thread')
+
+    def testReopen(self):
+        writer = LogWriter(self.filename, interval=60)
+        writer.write('first run\n')
+        writer.close()
+        writer = LogWriter(self.filename, interval=60)
+        writer.write('after shutdown\n')
+        writer.close()
+        self.assertEqual(self.read(self.filename), 'first run\nafter shutdown\n', 'testLog:testReopen:Reopened writer should append to the log')
+
+    def testRotate(self):
+        for compress in (False, True):
+            ext = '.gz' if compress else ''
+            writer = LogWriter(self.filename, max_bytes=10, backups=2, compress=compress, interval=60)
+            for msg in ('first line\n', 'second line\n', 'third line\n', 'last\n'):
+                writer.write(msg)
+                writer.flush()
+            writer.close()
+            self.assertEqual(self.read(self.filename), 'last\n', 'testLog:testRotate:Current file should hold messages since rotation')
+            self.assertEqual(self.read(self.filename + '.1' + ext), 'third line\n', 'testLog:testRotate:Newest backup should be first')
+            self.assertEqual(self.read(self.filename + '.2' + ext), 'second line\n', 'testLog:testRotate:Older backups should be shifted')
+            self.assertFalse(os.path.exists(self.filename + '.3' + ext), 'testLog:testRotate:Only backups files should be kept')
+
+    def testLevels(self):
+        logger = Logger('hand')
+        self.assertTrue(logger.isEnabled('round'), 'testLog:testLevels:Levels before level should be enabled')
+        self.assertTrue(logger.isEnabled('hand'), 'testLog:testLevels:Level should be enabled')
+        self.assertFalse(logger.isEnabled('decision'), 'testLog:testLevels:Levels after level should be disabled')
+        self.assertFalse(logger.isEnabled('off'), 'testLog:testLevels:Nothing should be logged at off')
+        self.assertRaises(ValueError, logger.isEnabled, 'verbose')
+        self.assertEqual((logger.roundEnabled, logger.handEnabled, logger.decisionEnabled, logger.debugEnabled),
+                         (True, True, False, False), 'testLog:testLevels:Enabled attributes should follow level')
+        logger.decision('%s', Unprintable())
+        logger.debug('%s', Unprintable())
+        writer = log._writer
+        log._writer = LogWriter(self.filename, interval=60)
+        try:
+            logger.round('%s wins $%d\n', 'Bot', 15.0)
+            logger.hand('100%\n')
+            log._writer.close()
+        finally:
+            log._writer = writer
+        self.assertEqual(self.read(self.filename), 'Bot wins $15\n100%\n', 'testLog:testLevels:Enabled levels should format lazily')
+
+    def testConfigure(self):
+        logger = Logger()
+        self.assertTrue(logger.isEnabled('decision'), 'testLog:testConfigure:Default should log decisions')
+        self.assertFalse(logger.isEnabled('debug'), 'testLog:testConfigure:Default should not log debug messages')
+        cfg['LOG_LEVEL'] = 'OFF'
+        logger.configure()
+        self.assertFalse(logger.isEnabled('round'), 'testLog:testConfigure:Off should disable every level')
+        with self.assertRaises(SemanticConfigError):
+            cfg['LOG_LEVEL'] = 'verbose'
+
+    def testFilename(self):
+        self.assertEqual(log.logFilename(), log.FNAME, 'testLog:testFilename:Main process should log to FNAME')
+
+    def testFork(self):
+        if not hasattr(os, 'fork'):
+            return
+        log.log('parent\n')
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.chdir(self.dir)
+                log.log('child\n')
+                log.shutdown()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        child = os.path.join(self.dir, 'log.%d.txt' % pid)
+        self.assertEqual(self.read(child), 'child\n', 'testLog:testFork:Child should log to its own file without parent messages')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from game import Player
+from policies import (BasicStrategyPolicy,
+                      DeclineInsurancePolicy,
+                      MinBettingPolicy)
+from table import Table
+from view import NullView
+
+class testNullView(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def testPlay(self):
+        table = Table(view=NullView())
+        player = Player('Bot',
+                        BasicStrategyPolicy('cfg/three_chart.txt'),
+                        DeclineInsurancePolicy(),
+                        MinBettingPolicy())
+        player.receive_payment(100000)
+        table.register_player(player)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            for _ in range(50):
+                table.play()
+        self.assertEqual(out.getvalue(), '', 'testNullView:testPlay:Headless table should not print')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+from random import Random
+import unittest
+
+from cards import (ContinuousShuffler, Shoe, fisher_yates_shuffle)
+from config import cfg
+from policies import CardCount
+from prefix import PrefixTables
+
+class testPrefixTables(unittest.TestCase):
+    def setUp(self):
+        self.systems = dict(CardCount.systems)
+        self.shoe = Shoe(2, fisher_yates_shuffle, rand=Random(5))
+        self.tables = PrefixTables('HiLoCount', 'ZenCount')
+        self.tables.attach(self.shoe)
+        self.counter = CardCount('HiLoCount', 'ZenCount', shoe=self.shoe)
+
+    def tearDown(self):
+        CardCount.systems = self.systems
+        cfg.reset()
+
+    def testCounts(self):
+        for _ in range(2):
+            self.shoe.shuffle()
+            while not self.shoe.isExhausted:
+                self.assertEqual(self.tables.runningCount(), self.counter.count, 'testPrefixTables:testCounts:Count should match counting visible cards')
+                self.assertEqual(self.tables.runningCount('ZenCount'), self.counter.runningCount('ZenCount'), 'testPrefixTables:testCounts:Every system should match')
+                self.shoe.dealOneCard()
+        self.assertEqual(self.tables.runningCount(index=0), 0, 'testPrefixTables:testCounts:Count should start at zero')
+
+    def testFractional(self):
+        CardCount.loadSystems('cfg/count_systems.txt')
+        tables = PrefixTables('Halves')
+        tables.attach(self.shoe)
+        counter = CardCount('Halves', shoe=self.shoe)
+        self.shoe.shuffle()
+        self.shoe.deal(61)
+        self.assertEqual(tables.runningCount(), counter.count, 'testPrefixTables:testFractional:Fractional counts should match')
+
+    def testComposition(self):
+        self.shoe.shuffle()
+        for n in (0, 7, 40):
+            self.shoe.deal(n)
+            self.assertEqual(self.tables.composition(), self.shoe.composition, 'testPrefixTables:testComposition:Composition should match shoe')
+            self.assertEqual(self.tables.tensRemaining(), self.shoe.composition[8], 'testPrefixTables:testComposition:Tens should match shoe')
+            self.assertEqual(list(self.tables.rankCounts()), self.shoe.rankCounts, 'testPrefixTables:testComposition:Rank counts should match shoe')
+        self.assertEqual(sum(self.tables.composition(index=0)), 104, 'testPrefixTables:testComposition:Full shoe should remain before dealing')
+
+    def testHoleCard(self):
+        self.shoe.shuffle()
+        self.shoe.deal(5)
+        before = self.tables.composition()
+        start = self.shoe.index
+        hole = self.shoe.dealHoleCard()
+        self.shoe.deal(3)
+        self.assertEqual(self.tables.runningCount(), self.counter.count, 'testPrefixTables:testHoleCard:Hole card should not be counted before it is shown')
+        self.assertEqual(self.tables.runningCount('ZenCount'), self.counter.runningCount('ZenCount'), 'testPrefixTables:testHoleCard:Every system should ignore the hole card')
+        self.assertEqual(sum(self.tables.composition()), sum(before) - 3, 'testPrefixTables:testHoleCard:Hole card should remain in the composition')
+        self.assertEqual(sum(self.tables.rankCounts()), sum(before) - 3, 'testPrefixTables:testHoleCard:Hole card should remain in the rank counts')
+        self.assertEqual(self.tables.tensRemaining(), self.tables.composition()[8], 'testPrefixTables:testHoleCard:Tens should include the hole card')
+        self.assertEqual(self.tables.composition(index=start), before, 'testPrefixTables:testHoleCard:Earlier indices should be unaffected')
+        self.shoe.revealHoleCard(hole)
+        self.assertEqual(self.tables.runningCount(), self.counter.count, 'testPrefixTables:testHoleCard:Revealed hole card should be counted')
+        self.assertEqual(self.tables.composition(), self.shoe.composition, 'testPrefixTables:testHoleCard:Revealed hole card should leave the composition')
+
+    def testInvalid(self):
+        self.assertRaises(ValueError, PrefixTables, 'NoSuchCount')
+        self.assertRaises(ValueError, self.tables.attach, ContinuousShuffler(1))
+
+if __name__ == '__main__':
+    unittest.main()
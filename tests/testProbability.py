@@ -0,0 +1,60 @@
+import unittest
+
+from cards import Card
+from config import cfg
+from probability import (BUST,
+                         NATURAL,
+                         compositionOf,
+                         dealerDistribution,
+                         dealerTable,
+                         fullComposition,
+                         removeCards)
+
+class testProbability(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        cfg.reset()
+
+    def testFullComposition(self):
+        self.assertEqual(fullComposition(1), (4, 4, 4, 4, 4, 4, 4, 4, 16, 4), 'testProbability:testFullComposition:Deck should have 16 ten-valued cards and 4 of the rest')
+        self.assertEqual(sum(fullComposition()), cfg['NUM_DECKS'] * 52, 'testProbability:testFullComposition:Shoe should have every card of every deck')
+
+    def testCompositionOf(self):
+        comp = compositionOf([Card('A', 'S'), Card('K', 'H'), Card(10, 'D'), Card(2, 'C')])
+        self.assertEqual(comp, (1, 0, 0, 0, 0, 0, 0, 0, 2, 1), 'testProbability:testCompositionOf:Cards should be counted by value')
+        self.assertRaises(ValueError, removeCards, comp, 1)
+
+    def testDealerTable(self):
+        table = dealerTable()
+        for up, dist in table.items():
+            self.assertAlmostEqual(sum(dist.values()), 1.0, msg='testProbability:testDealerTable:Distribution vs %s should sum to 1' % up)
+        self.assertEqual(table[6][NATURAL], 0.0, 'testProbability:testDealerTable:Dealer showing 6 cannot have natural')
+        self.assertAlmostEqual(table['A'][NATURAL], 96/311, msg='testProbability:testDealerTable:Dealer showing ace has natural iff hole card is ten-valued')
+        cfg.mergeFile('cfg/S17_false.ini')
+        self.assertAlmostEqual(dealerTable()[6][BUST], 0.42284, 4, 'testProbability:testDealerTable:S17 dealer showing 6 should bust about 42.28% of the time')
+
+    def testArbitraryComposition(self):
+        tens = (0, 0, 0, 0, 0, 0, 0, 0, 5, 0)
+        dist = dealerDistribution(7, tens)
+        self.assertEqual(dist[17], 1.0, 'testProbability:testArbitraryComposition:Dealer showing 7 over only tens should make 17')
+        dist = dealerDistribution(6, tens)
+        self.assertEqual(dist[BUST], 1.0, 'testProbability:testArbitraryComposition:Dealer showing 6 over only tens should bust')
+        dist = dealerDistribution('A', (0, 0, 0, 0, 1, 0, 0, 0, 1, 0))
+        self.assertAlmostEqual(dist[NATURAL], 0.5, msg='testProbability:testArbitraryComposition:Dealer showing ace should have natural half the time')
+        self.assertAlmostEqual(dist[17], 0.5, msg='testProbability:testArbitraryComposition:Dealer showing ace should stand on soft 17 by drawing the 6')
+
+    def testSoft17(self):
+        cfg.mergeFile('cfg/S17_false.ini')
+        self.assertEqual(dealerDistribution(6, (0, 0, 0, 0, 0, 0, 0, 0, 0, 1))[17], 1.0, 'testProbability:testSoft17:S17 dealer should stand on soft 17')
+        cfg.reset()
+        self.assertEqual(dealerDistribution(6, (0, 0, 0, 0, 0, 0, 0, 0, 1, 1))[17], 1.0, 'testProbability:testSoft17:H17 dealer should hit soft 17 to hard 17')
+
+    def testPeek(self):
+        dist = dealerDistribution(10, peek=True)
+        self.assertEqual(dist[NATURAL], 0.0, 'testProbability:testPeek:Peeked distribution should exclude natural')
+        self.assertAlmostEqual(sum(dist.values()), 1.0, msg='testProbability:testPeek:Peeked distribution should sum to 1')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+from random import Random
+import shutil
+import tempfile
+import unittest
+
+from commands import Command
+from config import cfg
+from policies import CardCount
+from replay import (DivergenceError,
+                    Replayer,
+                    Session,
+                    SessionRecorder,
+                    benchmark)
+from simulation import (PlayerSpec, TableSpec)
+from view import NullView
+
+class testReplay(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.spec = TableSpec([PlayerSpec('Bot %d' % i, 'cfg/three_chart.txt', 10**6)
+                               for i in range(3)])
+        self.table = self.spec.build(NullView(), Random(5))
+        self.recorder = SessionRecorder(self.table)
+        self.stacks = []
+        for _ in range(200):
+            self.recorder.play()
+            self.stacks.append([s.player.stack.amount for s in self.table.occupied_slots])
+        self.session = self.recorder.session
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+        cfg.reset()
+
+    def replayer(self, verify=False):
+        table = self.spec.build(NullView(), Random(99))
+        return Replayer(self.session, table, verify)
+
+    def stacksOf(self, replayer):
+        return [s.player.stack.amount for s in replayer.table.occupied_slots]
+
+    def testReplay(self):
+        filename = os.path.join(self.dir, 'session.pkl')
+        self.session.save(filename)
+        self.session = Session.load(filename)
+        replayer = self.replayer(verify=True)
+        self.assertEqual(replayer.play(), [], 'testReplay:testReplay:Replay should not diverge')
+        self.assertEqual(self.stacksOf(replayer), self.stacks[-1], 'testReplay:testReplay:Replay should reproduce stacks')
+        self.assertGreater(len(self.session.orders), 1, 'testReplay:testReplay:Session should span shuffles')
+
+    def testSeek(self):
+        replayer = self.replayer()
+        replayer.seek(150)
+        self.assertEqual(replayer.play(1), [], 'testReplay:testSeek:Replay from checkpoint should not diverge')
+        self.assertEqual(self.stacksOf(replayer), self.stacks[150], 'testReplay:testSeek:Seek should fast-forward to round')
+        replayer.seek(20)
+        replayer.play(30)
+        self.assertEqual(self.stacksOf(replayer), self.stacks[49], 'testReplay:testSeek:Seek should rewind to round')
+
+    def testSeekCounts(self):
+        replayer = self.replayer()
+        shoe = replayer.table.shoe
+        counters = [CardCount('HiLoCount', shoe=shoe),
+                    CardCount('HiLoCount', shoe=shoe, batched=True)]
+        replayer.play(40)
+        for n in (150, 20, 41):
+            replayer.seek(n)
+            fresh = CardCount('HiLoCount')
+            fresh.updateCards([shoe.cards[i] for i in range(cfg['NUM_CARDS_BURN_ON_SHUFFLE'], shoe.index)])
+            for counter in counters:
+                self.assertEqual(counter.count, fresh.count, 'testReplay:testSeekCounts:Count should follow seek to round %d' % n)
+            replayer.play(1)
+            self.assertEqual(counters[0].count, counters[1].count, 'testReplay:testSeekCounts:Counts should agree after replaying round %d' % n)
+
+    def testDivergence(self):
+        replayer = self.replayer()
+        actions = [d for d in self.session.decisions[3] if d[3] is not None and d[3][2] is not None]
+        seat, kind, value, ctx = actions[0]
+        index = self.session.decisions[3].index(actions[0])
+        other = Command.HIT if value == Command.STAND else Command.STAND
+        self.session.decisions[3][index] = (seat, kind, other, ctx)
+        divergences = []
+        try:
+            divergences = replayer.play(10)
+        except DivergenceError as e:
+            divergences = [e.divergence]
+        self.assertTrue(divergences, 'testReplay:testDivergence:Changed decision should diverge')
+        self.assertEqual(divergences[0].round, 3, 'testReplay:testDivergence:Divergence should be reported in its round')
+
+    def testBenchmark(self):
+        self.assertGreater(benchmark(self.session, self.spec.build(NullView(), Random(1)), repeat=1), 0, 'testReplay:testBenchmark:Benchmark should report a rate')
+
+if __name__ == '__main__':
+    unittest.main()
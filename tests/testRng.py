@@ -0,0 +1,57 @@
+import unittest
+
+from cards import (Shoe, faro_shuffle, fisher_yates_shuffle)
+from config import (cfg, Config)
+import rng
+from rng import SeedSequence
+
+class testRng(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        cfg.reset()
+        rng.seed()
+
+    def testSeedSequence(self):
+        self.assertEqual(SeedSequence(5).state(), SeedSequence(5).state(), 'testRng:testSeedSequence:Equal seeds should give equal states')
+        self.assertNotEqual(SeedSequence(5).state(), SeedSequence(6).state(), 'testRng:testSeedSequence:Different seeds should give different states')
+        self.assertEqual(SeedSequence(5).state(64).bit_length() <= 64, True, 'testRng:testSeedSequence:State should have requested bits')
+        self.assertEqual(SeedSequence(5).state(300).bit_length() <= 300, True, 'testRng:testSeedSequence:State should have requested bits')
+
+    def testSpawn(self):
+        seq = SeedSequence(5)
+        children = seq.spawn(2) + seq.spawn(1)
+        self.assertEqual([c.spawn_key for c in children], [(0,), (1,), (2,)], 'testRng:testSpawn:Children should be spawned in sequence')
+        self.assertEqual(children[2].state(), SeedSequence(5).child(2).state(), 'testRng:testSpawn:Spawned child should match child at key')
+        states = set(c.state() for c in children)
+        states.add(seq.state())
+        self.assertEqual(len(states), 4, 'testRng:testSpawn:Children should have distinct states')
+        self.assertNotEqual(seq.child(0, 1).state(), seq.child(1, 0).state(), 'testRng:testSpawn:Spawn keys should be ordered')
+
+    def testMasterSeed(self):
+        cfg['RANDOM_SEED'] = 42
+        rng.seed()
+        first = [Shoe(1, fisher_yates_shuffle) for _ in range(2)]
+        rng.seed()
+        second = [Shoe(1, fisher_yates_shuffle) for _ in range(2)]
+        for shoe in first + second:
+            shoe.shuffle()
+        self.assertEqual([s.codes for s in first], [s.codes for s in second], 'testRng:testMasterSeed:Master seed should reproduce shoes')
+        self.assertNotEqual(first[0].codes, first[1].codes, 'testRng:testMasterSeed:Shoes should draw from distinct streams')
+        cfg['RANDOM_SEED'] = '*'
+        self.assertEqual(cfg['RANDOM_SEED'], Config.UNRESTRICTED, "testRng:testMasterSeed:'*' should be an unrestricted seed")
+        self.assertNotEqual(rng.seed().entropy, rng.seed().entropy, "testRng:testMasterSeed:'*' should draw fresh entropy")
+
+    def testInjectedRandom(self):
+        one = Shoe(1, fisher_yates_shuffle, rand=SeedSequence(1).random())
+        two = Shoe(1, fisher_yates_shuffle, rand=SeedSequence(1).random())
+        one.shuffle()
+        two.shuffle()
+        self.assertEqual(one.codes, two.codes, 'testRng:testInjectedRandom:Equal streams should shuffle alike')
+        shoe = Shoe(1, faro_shuffle, rand=SeedSequence(1).random())
+        shoe.shuffle()
+        self.assertEqual(shoe.codes[:2].tolist(), [0, 26], 'testRng:testInjectedRandom:Algorithms without rand should still shuffle')
+
+if __name__ == '__main__':
+    unittest.main()
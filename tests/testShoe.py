@@ -1,6 +1,7 @@
 import unittest
 
-from cards import (Card, Shoe)
+from cards import (Card, Shoe, ShoeEvent)
+from config import cfg
 
 def alg(cards):
     cards.reverse()
@@ -95,5 +96,97 @@ class testShoe(unittest.TestCase):
         s.dealOneCard()
         self.assertFalse(s.isEmpty,'testShoe:testIsEmpty:New deck should not be empty')
 
+    def testComposition(self):
+        s = Shoe(2,alg)
+        self.assertEqual(s.composition,(8,8,8,8,8,8,8,8,32,8),'testShoe:testComposition:Full shoe should have 8 of each value and 32 tens')
+        s.shuffle()
+        self.assertEqual(s.rankCounts[12],7,'testShoe:testComposition:Burned ace should not remain')
+        c = s.deal(3)
+        self.assertEqual(c,[Card('A','D'),Card('A','H'),Card('A','S')],'testShoe:testComposition:Reversed shoe should deal aces')
+        self.assertEqual(s.composition,(8,8,8,8,8,8,8,8,32,4),'testShoe:testComposition:Dealt cards should not remain')
+        self.assertEqual(sum(s.composition),s.numCardsRemainingInShoe,'testShoe:testComposition:Composition should count cards remaining in shoe')
+        s.dealOneCard()
+        self.assertEqual(s.composition[8],31,'testShoe:testComposition:Dealt ten should not remain')
+
+    def testDealCodes(self):
+        s = Shoe(1,alg)
+        codes = s.dealCodes(5)
+        self.assertEqual(list(codes),[0,1,2,3,4],'testShoe:testDealCodes:Unshuffled shoe should deal codes in order')
+        self.assertEqual(s.rankCounts[0],0,'testShoe:testDealCodes:Dealt twos should not remain')
+        s.deal(20)
+        c = s.deal(3)
+        self.assertEqual(c[1:],[Card('A','D'),Card('A','H')],'testShoe:testDealCodes:Deal across cut card should prompt shuffle')
+        self.assertEqual(sum(s.composition),49,'testShoe:testDealCodes:Composition should restart on shuffle')
+
+    def testAlgorithmMayReturnCards(self):
+        s = Shoe(1,lambda codes: [Card(2,'S')] * 52)
+        s.shuffle()
+        self.assertEqual(s.dealOneCard(),Card(2,'S'),'testShoe:testAlgorithmMayReturnCards:Shuffled cards should be dealt')
+
+    def testEvents(self):
+        s = Shoe(1,alg)
+        events = []
+        for event in ShoeEvent.events:
+            s.subscribe(event, lambda arg, event=event: events.append((event, arg)))
+        s.shuffle()
+        self.assertEqual(events,[(ShoeEvent.SHUFFLE,None),(ShoeEvent.BURN,[Card('A','C')])],'testShoe:testEvents:Shuffle should be followed by burn')
+        del events[:]
+        c = s.deal(2)
+        s.dealOneCard(False)
+        s.revealHoleCard(Card('K','S'))
+        self.assertEqual(events,[(ShoeEvent.CARD_DEALT,c[0]),(ShoeEvent.CARD_DEALT,c[1]),(ShoeEvent.HOLE_CARD_REVEALED,Card('K','S'))],'testShoe:testEvents:Only visible and revealed cards should be published')
+        del events[:]
+        s.collect()
+        self.assertEqual(events,[(ShoeEvent.ROUND_END,c + [Card('K','S')])],'testShoe:testEvents:Round end should deliver cards seen this round')
+        del events[:]
+        s.collect()
+        self.assertEqual(events,[(ShoeEvent.ROUND_END,[])],'testShoe:testEvents:Round batch should restart each round')
+
+    def testHoleCardAcrossShuffle(self):
+        s = Shoe(1,alg)
+        s.shuffle()
+        events = []
+        s.subscribe(ShoeEvent.HOLE_CARD_REVEALED, events.append)
+        hole = s.dealHoleCard()
+        s.shuffle()
+        s.revealHoleCard(hole)
+        self.assertEqual(events,[],'testShoe:testHoleCardAcrossShuffle:Hole card dealt before a shuffle should not be revealed into the new count')
+        hole = s.dealHoleCard()
+        s.revealHoleCard(hole)
+        self.assertEqual(events,[hole],'testShoe:testHoleCardAcrossShuffle:Hole card of the current order should be revealed')
+
+    def testRestore(self):
+        s = Shoe(1,alg)
+        s.shuffle()
+        s.deal(10)
+        codes = s.codes[:]
+        s.shuffle()
+        s.dealHoleCard()
+        dealt, rounds, shuffles = [], [], []
+        s.subscribe(ShoeEvent.CARD_DEALT, dealt.append)
+        s.subscribe(ShoeEvent.ROUND_END, rounds.append)
+        s.subscribe(ShoeEvent.SHUFFLE, shuffles.append)
+        s.restore(codes, 8)
+        seen = [Card.fromCode(code) for code in codes[cfg['NUM_CARDS_BURN_ON_SHUFFLE']:8]]
+        self.assertEqual((shuffles, dealt, rounds), ([None], seen, [seen]), 'testShoe:testRestore:Subscribers should be resynced to the restored position')
+        self.assertEqual(sum(s.rankCounts), len(codes) - 8, 'testShoe:testRestore:Rank counts should describe cards left')
+        self.assertIsNone(s.hole, 'testShoe:testRestore:Hole card should be forgotten')
+
+    def testObservers(self):
+        s = Shoe(1,alg)
+        seen = []
+        class Observer:
+            def update(self, card):
+                seen.append(card)
+        o = Observer()
+        s.registerObserver(o)
+        s.shuffle()
+        c = s.dealOneCard()
+        s.revealHoleCard(Card('K','S'))
+        self.assertEqual(seen,[None,c,Card('K','S')],'testShoe:testObservers:Observers should see shuffles, dealt and revealed cards')
+        s.unregisterObserver(o)
+        s.dealOneCard()
+        self.assertEqual(len(seen),3,'testShoe:testObservers:Unregistered observers should not be notified')
+
 if __name__ == '__main__':
     unittest.main()
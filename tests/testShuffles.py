@@ -0,0 +1,73 @@
+from array import array
+from random import Random
+import unittest
+
+from cards import (Card, Shoe, fisher_yates_shuffle)
+from shuffles import (NumpyShuffler,
+                      casino_shuffle,
+                      cut,
+                      plug,
+                      riffle_shuffle,
+                      strip_cut)
+
+def risingSequences(deck):
+    """Returns number of rising sequences of permutation deck"""
+    position = {card : i for (i, card) in enumerate(deck)}
+    return 1 + sum(1 for card in range(1, len(deck))
+                   if position[card] < position[card - 1])
+
+class testShuffles(unittest.TestCase):
+    def setUp(self):
+        self.deck = array('B', range(52)) * 2
+        self.rand = Random(3)
+
+    def tearDown(self):
+        pass
+
+    def assertPermutation(self, shuffled, name):
+        self.assertEqual(sorted(shuffled), sorted(self.deck), 'testShuffles:%s:Shuffle should permute the deck' % name)
+        self.assertTrue(isinstance(shuffled, array), 'testShuffles:%s:Shuffle should preserve sequence type' % name)
+
+    def testFisherYates(self):
+        firsts = set(fisher_yates_shuffle([0, 1, 2], rand=self.rand)[0] for _ in range(100))
+        self.assertEqual(firsts, {0, 1, 2}, 'testShuffles:testFisherYates:Every card should reach the top')
+
+    def testNumpyShuffler(self):
+        shuffler = NumpyShuffler(batch=4)
+        orders = [shuffler(array('B', self.deck), rand=self.rand) for _ in range(6)]
+        for order in orders:
+            self.assertPermutation(order, 'testNumpyShuffler')
+        self.assertEqual(len(set(o.tobytes() for o in orders)), 6, 'testShuffles:testNumpyShuffler:Every shuffle should differ')
+        again = NumpyShuffler(batch=4)
+        self.assertEqual(again(array('B', self.deck), rand=Random(3)), orders[0], 'testShuffles:testNumpyShuffler:Equal streams should shuffle alike')
+        cards = NumpyShuffler()(Card.makeDeck(), rand=self.rand)
+        self.assertEqual(sorted(c.code for c in cards), list(range(52)), 'testShuffles:testNumpyShuffler:Shuffler should permute lists of cards')
+
+    def testRiffle(self):
+        deck = array('B', range(104))
+        for clumping in (1, 3):
+            riffled = riffle_shuffle(deck, rand=self.rand, clumping=clumping)
+            self.assertEqual(sorted(riffled), list(deck), 'testShuffles:testRiffle:Riffle should permute the deck')
+            self.assertLessEqual(risingSequences(riffled), 2, 'testShuffles:testRiffle:One riffle should leave at most two rising sequences')
+        self.assertGreater(risingSequences(casino_shuffle(deck, rand=self.rand)), 2, 'testShuffles:testRiffle:Casino shuffle should riffle repeatedly')
+
+    def testStripCut(self):
+        self.assertEqual(list(strip_cut(self.deck, rand=self.rand, packets=(1, 1))), list(reversed(self.deck)), 'testShuffles:testStripCut:Single card packets should reverse the deck')
+        self.assertPermutation(strip_cut(self.deck, rand=self.rand), 'testStripCut')
+
+    def testCut(self):
+        cutDeck = cut(array('B', range(10)), rand=self.rand, low=0.3, high=0.3)
+        self.assertEqual(list(cutDeck), [3, 4, 5, 6, 7, 8, 9, 0, 1, 2], 'testShuffles:testCut:Cut should move top cards to bottom')
+        self.assertPermutation(plug(self.deck, rand=self.rand), 'testCut')
+        self.assertPermutation(casino_shuffle(self.deck, rand=self.rand), 'testCut')
+
+    def testShoe(self):
+        for algorithm in (NumpyShuffler(), casino_shuffle):
+            shoe = Shoe(2, algorithm, rand=Random(1))
+            shoe.shuffle()
+            cards = shoe.deal(50)
+            self.assertTrue(all(isinstance(c, Card) for c in cards), 'testShuffles:testShoe:Shoe should deal cards')
+            self.assertEqual(sum(shoe.composition), 2 * 52 - 51, 'testShuffles:testShoe:Shoe should count dealt cards')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import glob
+import unittest
+
+from commands import Command
+from config import cfg
+from simulation import (PlayerSpec,
+                        SimulationResult,
+                        Simulator,
+                        TableSpec)
+
+class testSimulator(unittest.TestCase):
+    def setUp(self):
+        self.spec = TableSpec([PlayerSpec('Bot', 'cfg/three_chart.txt')])
+
+    def tearDown(self):
+        cfg.reset()
+
+    def testRun(self):
+        sim = Simulator(self.spec, workers=2, seed=7, rounds_per_block=40)
+        result = sim.run(100)
+        self.assertEqual(result.rounds, 100, 'testSimulator:testRun:Simulation should play requested number of rounds')
+        self.assertEqual(result.hands, result.wins + result.losses + result.pushes, 'testSimulator:testRun:Every hand should be won, lost or pushed')
+        self.assertGreater(result.decisions[Command.STAND], 0, 'testSimulator:testRun:Decisions should be tallied')
+        self.assertEqual(result.outcomes.count, result.hands, 'testSimulator:testRun:Every hand outcome should be summarized across workers')
+
+    def testReproducible(self):
+        one = Simulator(self.spec, workers=1, seed=11, rounds_per_block=30).run(90)
+        two = Simulator(self.spec, workers=3, seed=11, rounds_per_block=30,
+                        chunk_seconds=0).run(90)
+        self.assertEqual(one, two, 'testSimulator:testReproducible:Results should depend only on the seed')
+
+    def testLogLevel(self):
+        logs = set(glob.glob('log.*.txt'))
+        Simulator(self.spec, workers=2, seed=3, rounds_per_block=20).run(60)
+        self.assertEqual(set(glob.glob('log.*.txt')), logs, 'testSimulator:testLogLevel:Workers should not log by default')
+        self.spec.configure()
+        self.assertEqual(cfg['LOG_LEVEL'], 'off', 'testSimulator:testLogLevel:Headless tables should not log')
+        TableSpec(self.spec.players, log_level=None).configure()
+        self.assertEqual(cfg['LOG_LEVEL'], 'decision', 'testSimulator:testLogLevel:Configured level should be kept on request')
+
+    def testMerge(self):
+        a = SimulationResult()
+        a.rounds, a.net, a.hands = 3, -15, 4
+        a.decisions[Command.HIT] = 2
+        b = SimulationResult()
+        b.rounds, b.net, b.hands = 2, 30, 2
+        b.decisions[Command.HIT] = 1
+        a.merge(b)
+        self.assertEqual((a.rounds, a.net, a.hands), (5, 15, 6), 'testSimulator:testMerge:Totals should add')
+        self.assertEqual(a.decisions[Command.HIT], 3, 'testSimulator:testMerge:Decisions should add')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,11 @@
+import os
+import shutil
+import tempfile
 import unittest
 
+import numpy as np
+
+import stats
 from stats import *
 
 class testStatistics(unittest.TestCase):
@@ -12,9 +18,12 @@ class testStatistics(unittest.TestCase):
         self.array5 = [1, 0, -1, 0, 0, 1, 1, -1, 2, -1]
         self.array6 = [40, 20, 1, -10, -15, 0, 30, -31, 23]
         self.array7 = [10, 10, 10, 10, 10, 10]
+        self.chunk_size = stats.CHUNK_SIZE
+        self.max_distinct_values = stats.MAX_DISTINCT_VALUES
 
     def tearDown(self):
-        pass
+        stats.CHUNK_SIZE = self.chunk_size
+        stats.MAX_DISTINCT_VALUES = self.max_distinct_values
 
     def testmean(self):
         self.assertIs(mean(self.empty),  None)
@@ -144,5 +153,149 @@ class testStatistics(unittest.TestCase):
         self.assertEqual(maximum_subarray(self.array6), (66,7))
         self.assertEqual(maximum_subarray(self.array7), (60,6))
 
+    def testMoments(self):
+        for array in (self.array1, self.array3, self.array6):
+            moments = Moments(array)
+            self.assertAlmostEqual(moments.mean, mean(array), msg='testStatistics:testMoments:Mean should match mean')
+            self.assertAlmostEqual(moments.variance, variance(array), msg='testStatistics:testMoments:Variance should match variance')
+        self.assertIs(Moments().variance, None, 'testStatistics:testMoments:Empty moments should have no variance')
+        merged = Moments(self.array3).merge(Moments(self.array6)).merge(Moments())
+        self.assertEqual(merged.count, len(self.array3) + len(self.array6), 'testStatistics:testMoments:Counts should add')
+        self.assertAlmostEqual(merged.variance, variance(self.array3 + self.array6), msg='testStatistics:testMoments:Merged variance should be that of both sequences')
+        self.assertAlmostEqual(Moments().merge(Moments(self.array4)).mean, mean(self.array4), msg='testStatistics:testMoments:Merging into empty moments should copy')
+
+    def testStableVariance(self):
+        shifted = [1e9 + x for x in self.array3]
+        self.assertAlmostEqual(variance(shifted), 7.35802469136, msg='testStatistics:testStableVariance:Variance should not depend on offset')
+
+    def testQuantileSketch(self):
+        values = list(range(-500, 1500))
+        sketch = QuantileSketch(values)
+        for q in (0.1, 0.25, 0.5, 0.9):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), 0.01 * abs(exact), 'testStatistics:testQuantileSketch:Quantile should be within relative accuracy')
+        self.assertEqual(sketch.quantile(0), -500, 'testStatistics:testQuantileSketch:Minimum should be exact')
+        self.assertEqual(sketch.quantile(1), 1499, 'testStatistics:testQuantileSketch:Maximum should be exact')
+        self.assertEqual(QuantileSketch(self.array7).median, 10, 'testStatistics:testQuantileSketch:Median of constant values should be exact')
+        self.assertEqual(QuantileSketch(self.array5).median, 0, 'testStatistics:testQuantileSketch:Zeros should be counted exactly')
+        self.assertIs(QuantileSketch().median, None, 'testStatistics:testQuantileSketch:Empty sketch should have no median')
+        merged = QuantileSketch(values[::2]).merge(QuantileSketch(values[1::2]))
+        self.assertEqual((merged.positive, merged.negative, merged.zeros, merged.count),
+                         (sketch.positive, sketch.negative, sketch.zeros, sketch.count),
+                         'testStatistics:testQuantileSketch:Merged sketch should equal sketch of both')
+        self.assertRaises(ValueError, sketch.merge, QuantileSketch(relative_accuracy=0.05))
+        self.assertRaises(ValueError, sketch.quantile, 2)
+        small = QuantileSketch(values, max_buckets=16)
+        self.assertLessEqual(len(small.positive), 16, 'testStatistics:testQuantileSketch:Buckets should be bounded')
+        self.assertAlmostEqual(small.quantile(0.99), 1479, delta=15, msg='testStatistics:testQuantileSketch:Upper quantiles should survive collapsing')
+
+    def testFrequencyCounter(self):
+        for array in (self.array1, self.array3, self.array5, self.array7):
+            counter = FrequencyCounter(array)
+            self.assertEqual(counter.frequency_dict(), frequency_dict(array), 'testStatistics:testFrequencyCounter:Counts within capacity should be exact')
+            if isinstance(mode(array), list):
+                self.assertCountEqual(counter.mode, mode(array), 'testStatistics:testFrequencyCounter:Ties should be listed')
+            else:
+                self.assertEqual(counter.mode, mode(array), 'testStatistics:testFrequencyCounter:Mode should match mode')
+        self.assertIs(FrequencyCounter().mode, None, 'testStatistics:testFrequencyCounter:Empty counter should have no mode')
+        merged = FrequencyCounter(self.array3).merge(FrequencyCounter(self.array5))
+        self.assertEqual(merged.frequency_dict(), frequency_dict(self.array3 + self.array5), 'testStatistics:testFrequencyCounter:Merged counts should add')
+        self.assertTrue(merged.isExact, 'testStatistics:testFrequencyCounter:Merge within capacity should be exact')
+        stream = [0] * 50 + list(range(1, 200))
+        counter = FrequencyCounter(stream, capacity=8)
+        self.assertLessEqual(len(counter.counts), 8, 'testStatistics:testFrequencyCounter:Counters should be bounded')
+        self.assertFalse(counter.isExact, 'testStatistics:testFrequencyCounter:Evicting should make counts inexact')
+        self.assertEqual(counter.mode, 0, 'testStatistics:testFrequencyCounter:Heavy value should be kept')
+        self.assertGreaterEqual(counter.counts[0] + counter.error, 50, 'testStatistics:testFrequencyCounter:Count should be short by at most error')
+
+    def testSummary(self):
+        summary = Summary(self.array3).merge(Summary(self.array4))
+        both = self.array3 + self.array4
+        self.assertEqual(summary.count, len(both), 'testStatistics:testSummary:Counts should add')
+        self.assertAlmostEqual(summary.stddev, stddev(both), msg='testStatistics:testSummary:Stddev should match stddev')
+        self.assertAlmostEqual(summary.median, median(both), delta=0.01 * abs(median(both)), msg='testStatistics:testSummary:Median should be within relative accuracy')
+        self.assertEqual(summary.mode, mode(both), 'testStatistics:testSummary:Mode should match mode')
+
+    def testStreakAnalyzer(self):
+        outcomes = [1, 1, -1, 0, -1, -1, -1, 2, 1, 1, -2, 1]
+        analyzer = StreakAnalyzer()
+        for chunk in (outcomes[:5], outcomes[5:9], outcomes[9:]):
+            analyzer.update(chunk)
+        self.assertEqual(analyzer.count, len(outcomes), 'testStatistics:testStreakAnalyzer:Every outcome should be counted')
+        self.assertEqual(analyzer.longest_win, (3, 7), 'testStatistics:testStreakAnalyzer:Longest winning streak should span chunks')
+        self.assertEqual(analyzer.longest_loss, (3, 4), 'testStatistics:testStreakAnalyzer:Pushes should end streaks')
+        self.assertEqual(analyzer.histogram(), ({2:1, 3:1, 1:1}, {1:2, 3:1}), 'testStatistics:testStreakAnalyzer:Streaks should be histogrammed')
+        self.assertEqual(analyzer.bankroll, sum(outcomes), 'testStatistics:testStreakAnalyzer:Bankroll should follow outcomes')
+        self.assertEqual(analyzer.max_drawdown, (4, 2, 7), 'testStatistics:testStreakAnalyzer:Drawdown should run from peak to trough')
+        self.assertEqual(analyzer.max_runup, (4, 7, 10), 'testStatistics:testStreakAnalyzer:Run-up should run from trough to peak')
+        self.assertEqual(analyzer.maximum_subarray, (4, 7, 3), 'testStatistics:testStreakAnalyzer:Maximum subarray should be found')
+        for array in (self.array1, self.array3, self.array5, self.array6):
+            (total, start, length) = StreakAnalyzer(array).maximum_subarray
+            self.assertEqual((total, length), maximum_subarray(array), 'testStatistics:testStreakAnalyzer:Maximum subarray should match maximum_subarray')
+            self.assertEqual(sum(array[start:start + length]), total, 'testStatistics:testStreakAnalyzer:Maximum subarray should start at start')
+        stats.CHUNK_SIZE = 5
+        chunked = StreakAnalyzer(np.array(outcomes))
+        self.assertEqual((chunked.count, chunked.longest_win, chunked.longest_loss, chunked.histogram(), chunked.max_drawdown, chunked.max_runup, chunked.maximum_subarray),
+                         (analyzer.count, analyzer.longest_win, analyzer.longest_loss, analyzer.histogram(), analyzer.max_drawdown, analyzer.max_runup, analyzer.maximum_subarray), 'testStatistics:testStreakAnalyzer:Arrays should be analyzed a chunk at a time')
+        empty = StreakAnalyzer()
+        self.assertEqual((empty.longest_win, empty.max_drawdown, empty.maximum_subarray),
+                         ((0, None), (0, 0, 0), (None, 0, 0)), 'testStatistics:testStreakAnalyzer:Empty series should have no streaks')
+
+    def testLinearRuns(self):
+        sequence = list(range(100000))
+        self.assertEqual(length_longest_increasing_run(sequence), 100000, 'testStatistics:testLinearRuns:Runs should be found in one pass')
+        self.assertEqual(length_longest_increasing_run(iter(self.array3)), 3, 'testStatistics:testLinearRuns:Runs should accept iterators')
+
+    def testArrays(self):
+        stats.CHUNK_SIZE = 4
+        self.assertEqual(len(list(stats._chunks(np.array(self.array3)))), 3, 'testStatistics:testArrays:Arrays should be scanned CHUNK_SIZE items at a time')
+        arrays = [self.array1, self.array2, self.array3, self.array4,
+                  self.array5, self.array6, self.array7]
+        for array in arrays:
+            values = np.array(array)
+            for function in (mean, variance, stddev, median):
+                self.assertAlmostEqual(function(values), function(array), msg='testStatistics:testArrays:%s should match on arrays' % function.__name__)
+            for function in (frequency_dict, delta, maximum_subarray,
+                             length_longest_non_decreasing_run,
+                             length_longest_increasing_run,
+                             length_longest_non_increasing_run,
+                             length_longest_decreasing_run):
+                self.assertEqual(function(values), function(array), 'testStatistics:testArrays:%s should match on arrays' % function.__name__)
+            if isinstance(mode(array), list):
+                self.assertCountEqual(mode(values), mode(array), 'testStatistics:testArrays:Mode ties should match on arrays')
+            else:
+                self.assertEqual(mode(values), mode(array), 'testStatistics:testArrays:Mode should match on arrays')
+            self.assertAlmostEqual(quantile(values, 0.3), np.quantile(values, 0.3), msg='testStatistics:testArrays:Quantile should interpolate')
+        self.assertIs(mean(np.zeros(0)), None, 'testStatistics:testArrays:Empty array should have no mean')
+        self.assertIs(maximum_subarray(np.zeros(0))[0], None, 'testStatistics:testArrays:Empty array should have no maximum subarray')
+        values = np.array(self.array6, dtype=np.float32)
+        self.assertEqual(Moments(values).count, len(values), 'testStatistics:testArrays:Moments should count arrays')
+        self.assertEqual(FrequencyCounter(values).frequency_dict(), frequency_dict(values), 'testStatistics:testArrays:Counter should count arrays')
+        stats.MAX_DISTINCT_VALUES = 8
+        with self.assertRaises(ValueError, msg='testStatistics:testArrays:Counting too many distinct values should fail'):
+            median(values)
+        self.assertCountEqual(mode(np.array(self.array5)), mode(self.array5), 'testStatistics:testArrays:Few distinct values should be counted')
+        sketch = QuantileSketch(self.array6)
+        chunked = QuantileSketch(values)
+        self.assertEqual((chunked.positive, chunked.negative, chunked.count), (sketch.positive, sketch.negative, sketch.count), 'testStatistics:testArrays:Sketch should bucket arrays alike')
+
+    def testMemmap(self):
+        stats.CHUNK_SIZE = 1000
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, 'outcomes.f4')
+            outcomes = np.random.default_rng(5).choice(np.array([-2, -1, 0, 1, 1.5], dtype=np.float32), 10007)
+            outcomes.tofile(filename)
+            column = np.memmap(filename, dtype=np.float32, mode='r')
+            self.assertEqual(len(list(stats._chunks(column))), 11, 'testStatistics:testMemmap:Column should span chunks')
+            self.assertAlmostEqual(mean(column), float(outcomes.mean(dtype=np.float64)), msg='testStatistics:testMemmap:Mean should be computed in chunks')
+            self.assertAlmostEqual(variance(column), float(outcomes.var(dtype=np.float64)), msg='testStatistics:testMemmap:Variance should be computed in chunks')
+            self.assertEqual(median(column), float(np.median(outcomes)), 'testStatistics:testMemmap:Median should be exact')
+            self.assertEqual(sum(frequency_dict(column).values()), len(outcomes), 'testStatistics:testMemmap:Frequencies should count every outcome')
+            self.assertEqual(length_longest_non_decreasing_run(column), length_longest_non_decreasing_run(outcomes.tolist()), 'testStatistics:testMemmap:Runs should span chunks')
+            del column
+        finally:
+            shutil.rmtree(directory)
+
 if __name__ == '__main__':
     unittest.main()
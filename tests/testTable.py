@@ -1,14 +1,72 @@
+from random import Random
 import unittest
 
+from cards import (Card, ShoeEvent)
+from config import cfg
+from game import Player
+from policies import (BasicStrategyPolicy,
+                      InsurancePolicy,
+                      MinBettingPolicy)
+from table import Table
+from view import NullView
+
+class AlwaysInsure(InsurancePolicy):
+    def insure(self, hand, **kwargs):
+        return True
+
+class InsuranceView(NullView):
+    def __init__(self):
+        self.amounts = []
+
+    def insured(self, slot, amount):
+        self.amounts.append(amount)
+
 class testTable(unittest.TestCase):
     def setUp(self):
         pass
 
     def tearDown(self):
-        pass
+        cfg.reset()
 
     def test(self):
         pass # self.fail('Implement test Table')
 
+    def testHoleCardRevealed(self):
+        table = Table(1, NullView(), rand=Random(6))
+        revealed = []
+        table.shoe.subscribe(ShoeEvent.HOLE_CARD_REVEALED, revealed.append)
+        for n in range(1, 6):
+            table.beginRound()
+            hole = table.dealer_slot.hand.cards[0]
+            table.endRound()
+            self.assertEqual(len(revealed), n, 'testTable:testHoleCardRevealed:Hole card should be revealed once a round')
+            self.assertIs(revealed[-1], hole, 'testTable:testHoleCardRevealed:Dealer hole card should be revealed')
+
+    def playInsured(self, hole):
+        """Plays a round of 20 against an ace upcard over hole, insuring,
+           Returns (amounts insured, player's net)"""
+        # Burned card, player, hole card, player, upcard
+        order = [Card(2, 'S'), Card('K', 'S'), hole, Card('Q', 'S'), Card('A', 'H')]
+        order += Card.makeDeck() * cfg['NUM_DECKS']
+        view = InsuranceView()
+        table = Table(1, view, lambda cards: list(order))
+        player = Player('Bot',
+                        BasicStrategyPolicy('cfg/three_chart.txt'),
+                        AlwaysInsure(),
+                        MinBettingPolicy())
+        player.receive_payment(1000)
+        table.register_player(player)
+        table.play()
+        return (view.amounts, player.stack.amount - 1000)
+
+    def testInsurance(self):
+        stake = cfg['MINIMUM_BET'] * cfg['INSURANCE_RATIO']
+        amounts, net = self.playInsured(Card(9, 'H'))
+        self.assertEqual(amounts, [-stake], 'testTable:testInsurance:Insurance should be offered on an ace and lost without a dealer natural')
+        self.assertEqual(net, -stake, 'testTable:testInsurance:Push should cost only the insurance stake')
+        amounts, net = self.playInsured(Card('K', 'H'))
+        self.assertEqual(amounts, [stake * cfg['INSURANCE_PAYOUT_RATIO']], 'testTable:testInsurance:Insurance should pay on a dealer natural')
+        self.assertEqual(net, 0, 'testTable:testInsurance:Insurance should cover the hand lost to a natural')
+
 if __name__ == '__main__':
     unittest.main()